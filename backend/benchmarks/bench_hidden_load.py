@@ -0,0 +1,86 @@
+"""Benchmark do estagio DataFrame de calculate_hidden_load por tamanho de janela.
+
+Compara a correcao solar linha a linha (df.apply) com os kernels vetorizados
+de load_calc. Uso:
+
+    python benchmarks/bench_hidden_load.py [--repeticoes 5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.services.load_calc import compute_hidden_load
+
+JANELAS_HORAS = {
+    "1 dia": 24,
+    "1 semana": 24 * 7,
+    "1 mes": 24 * 30,
+    "3 meses": 24 * 90,
+    "1 ano": 24 * 365,
+}
+CAPACIDADE_MW = 15000.0
+
+
+def gerar_janela(horas: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    hora = pd.date_range("2024-01-01", periods=horas, freq="h")
+    hour = hora.hour.to_numpy()
+    sol = np.clip(np.sin(np.pi * (hour - 6) / 12), 0, None) * 900
+    sol[rng.random(horas) < 0.1] = 0.0
+    carga = 35000 + 5000 * np.sin(np.pi * hour / 24) + rng.uniform(-500, 500, horas)
+    return pd.DataFrame({"hora": hora, "carga_ons": carga, "sol_wm2": sol})
+
+
+def _corrigir_sol_linha(row: pd.Series) -> float:
+    hora = row["hora"].hour
+    if 6 <= hora <= 18 and row["sol_wm2"] < 10:
+        return np.sin(np.pi * (hora - 6) / 12) * 800
+    return row["sol_wm2"]
+
+
+def calcular_linha_a_linha(df: pd.DataFrame, cap_solar_mw: float) -> pd.DataFrame:
+    df["sol_wm2_final"] = df.apply(_corrigir_sol_linha, axis=1)
+    df["estimativa_solar_mw"] = (cap_solar_mw * (df["sol_wm2_final"] / 1000) * 0.85).clip(lower=0)
+    df["carga_real_estimada"] = df["carga_ons"] + df["estimativa_solar_mw"]
+    return df
+
+
+def _medir(func, df: pd.DataFrame, repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        entrada = df.copy()
+        inicio = time.perf_counter()
+        func(entrada, CAPACIDADE_MW)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'janela':>10} {'linhas':>8} {'apply (ms)':>12} {'vetorizado (ms)':>16} {'ganho':>8}")
+    for nome, horas in JANELAS_HORAS.items():
+        df = gerar_janela(horas)
+        pd.testing.assert_frame_equal(
+            calcular_linha_a_linha(df.copy(), CAPACIDADE_MW),
+            compute_hidden_load(df.copy(), CAPACIDADE_MW),
+        )
+        t_apply = _medir(calcular_linha_a_linha, df, args.repeticoes)
+        t_vetor = _medir(compute_hidden_load, df, args.repeticoes)
+        print(
+            f"{nome:>10} {horas:>8} {t_apply * 1000:>12.2f} {t_vetor * 1000:>16.3f} "
+            f"{t_apply / t_vetor:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,18 @@
-from fastapi import APIRouter
+from datetime import datetime
 
-from ..core.database import get_engine
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from ..core.cache import cached_response
+from ..core.database import get_async_engine
+from ..core.responses import frame_response
+from ..core.timing import timed
+from ..services.downsampling import downsample_frame
+from ..services.live_stream import netload_events
 from ..services.load_calc import (
+    LIMITE_PADRAO_LOTE,
     calculate_hidden_load,
+    calculate_hidden_load_batch,
     fetch_classes_consumption,
     fetch_fraud_alert,
 )
@@ -11,18 +21,123 @@ router = APIRouter(prefix="/analise")
 
 
 @router.get("/carga-oculta")
-def calcular_carga_oculta(subsistema: str = "SUDESTE", distribuidora: str | None = None):
-    engine = get_engine()
-    return calculate_hidden_load(engine, subsistema, distribuidora)
+async def calcular_carga_oculta(
+    request: Request,
+    subsistema: str = "SUDESTE",
+    distribuidora: str | None = None,
+    inicio: datetime | None = None,
+    fim: datetime | None = None,
+    max_pontos: int | None = Query(None, ge=10),
+    distribuidora_id: int | None = None,
+):
+    if inicio is not None and fim is not None and inicio >= fim:
+        raise HTTPException(status_code=400, detail="'inicio' deve ser anterior a 'fim'.")
+    engine = get_async_engine()
+    df = await cached_response(
+        engine,
+        "carga-oculta",
+        {
+            "subsistema": subsistema,
+            "distribuidora": distribuidora,
+            "distribuidora_id": distribuidora_id,
+            "inicio": inicio,
+            "fim": fim,
+        },
+        ("carga_ons", "clima_real", "gd_detalhada"),
+        lambda: calculate_hidden_load(engine, subsistema, distribuidora, inicio, fim, distribuidora_id),
+        keep=lambda frame: not frame.empty,
+    )
+    if max_pontos is not None:
+        # O cache guarda a serie completa; cada grafico pede a resolucao da sua largura.
+        with timed("compute"):
+            df = downsample_frame(
+                df,
+                max_pontos,
+                x_col="hora",
+                y_col="carga_ons",
+                preservar=("carga_real_estimada", "estimativa_solar_mw"),
+            )
+    return frame_response(request, df)
+
+
+@router.get("/carga-oculta/lote")
+async def calcular_carga_oculta_lote(
+    request: Request,
+    subsistema: str = "SUDESTE",
+    inicio: datetime | None = None,
+    fim: datetime | None = None,
+    distribuidora_id: list[int] | None = Query(None),
+    limite: int = Query(LIMITE_PADRAO_LOTE, ge=1, le=500),
+):
+    """Carga oculta de varias distribuidoras numa resposta (uma linha por distribuidora e hora)."""
+    if inicio is not None and fim is not None and inicio >= fim:
+        raise HTTPException(status_code=400, detail="'inicio' deve ser anterior a 'fim'.")
+    engine = get_async_engine()
+    ids = sorted(set(distribuidora_id or []))
+    df = await cached_response(
+        engine,
+        "carga-oculta-lote",
+        {"subsistema": subsistema, "inicio": inicio, "fim": fim, "ids": tuple(ids), "limite": limite},
+        ("carga_ons", "clima_real", "gd_detalhada"),
+        lambda: calculate_hidden_load_batch(engine, subsistema, inicio, fim, ids or None, limite),
+        keep=lambda frame: not frame.empty,
+    )
+    return frame_response(request, df)
+
+
+@router.get("/carga-oculta/stream")
+async def stream_carga_oculta(
+    request: Request,
+    subsistema: str = "SUDESTE",
+    distribuidora: str | None = None,
+    distribuidora_id: int | None = None,
+    desde: datetime | None = None,
+    last_event_id: str | None = Header(None),
+):
+    """Server-Sent Events com as horas novas ou revisadas de /analise/carga-oculta.
+
+    Sem ``desde`` o stream comeca no estado atual; ao reconectar, o cabecalho
+    ``Last-Event-ID`` (o cursor do ultimo evento recebido) tem precedencia.
+    """
+    if last_event_id:
+        try:
+            desde = datetime.fromisoformat(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="'Last-Event-ID' invalido.")
+    events = netload_events(
+        get_async_engine(),
+        subsistema,
+        distribuidora,
+        distribuidora_id,
+        desde,
+        is_disconnected=request.is_disconnected,
+    )
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/classes-consumo")
-def get_classes_consumo(distribuidora: str | None = None):
-    engine = get_engine()
-    return fetch_classes_consumption(engine, distribuidora)
+async def get_classes_consumo(distribuidora: str | None = None, distribuidora_id: int | None = None):
+    engine = get_async_engine()
+    return await cached_response(
+        engine,
+        "classes-consumo",
+        {"distribuidora": distribuidora, "distribuidora_id": distribuidora_id},
+        ("gd_detalhada",),
+        lambda: fetch_classes_consumption(engine, distribuidora, distribuidora_id),
+    )
 
 
 @router.get("/alertas-fraude")
-def get_alertas_fraude(distribuidora: str | None = None):
-    engine = get_engine()
-    return fetch_fraud_alert(engine, distribuidora)
\ No newline at end of file
+async def get_alertas_fraude(distribuidora: str | None = None, distribuidora_id: int | None = None):
+    engine = get_async_engine()
+    return await cached_response(
+        engine,
+        "alertas-fraude",
+        {"distribuidora": distribuidora, "distribuidora_id": distribuidora_id},
+        ("auditoria_visual", "gd_detalhada"),
+        lambda: fetch_fraud_alert(engine, distribuidora, distribuidora_id),
+    )
\ No newline at end of file
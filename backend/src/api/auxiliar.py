@@ -1,12 +1,32 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 
-from ..core.database import get_engine
-from ..services.load_calc import list_distribuidoras
+from ..core.cache import cached_response
+from ..core.database import get_async_engine
+from ..services.load_calc import list_distribuidoras, search_distribuidoras
 
 router = APIRouter(prefix="/auxiliar")
 
 
 @router.get("/distribuidoras")
-def get_lista_distribuidoras():
-    engine = get_engine()
-    return list_distribuidoras(engine)
\ No newline at end of file
+async def get_lista_distribuidoras():
+    engine = get_async_engine()
+    return await cached_response(
+        engine,
+        "distribuidoras",
+        {},
+        ("gd_detalhada",),
+        lambda: list_distribuidoras(engine),
+    )
+
+
+@router.get("/distribuidoras/busca")
+async def buscar_distribuidoras(termo: str = Query(..., min_length=2), limite: int = Query(10, ge=1, le=50)):
+    """Ids das distribuidoras que casam com o termo, para usar em ``distribuidora_id``."""
+    engine = get_async_engine()
+    return await cached_response(
+        engine,
+        "distribuidoras-busca",
+        {"termo": termo.strip().upper(), "limite": limite},
+        ("gd_detalhada",),
+        lambda: search_distribuidoras(engine, termo, limite),
+    )
\ No newline at end of file
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Query
+
+from ..core.database import get_async_engine
+from ..services.etl_runs import LIMITE_PADRAO_EXECUCOES, list_etl_runs
+
+router = APIRouter(prefix="/etl")
+
+
+@router.get("/runs")
+async def get_etl_runs(
+    extrator: str | None = None,
+    status: str | None = None,
+    limite: int = Query(LIMITE_PADRAO_EXECUCOES, ge=1, le=1000),
+):
+    # Sem cache: o ledger muda a cada execucao e a consulta e pequena.
+    return await list_etl_runs(get_async_engine(), extrator, status, limite)
\ No newline at end of file
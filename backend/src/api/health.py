@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 from sqlalchemy import text
 
-from ..core.database import get_engine
+from ..core.cache import cache_stats, tile_cache_stats
+from ..core.database import get_async_engine, get_engine, pool_stats
 
 router = APIRouter()
 
@@ -21,6 +22,15 @@ def health_check():
     try:
         with engine.connect() as connection:
             result = connection.execute(text("SELECT 1")).scalar()
-        return {"status": "ok", "db_response": result}
+        return {
+            "status": "ok",
+            "db_response": result,
+            "cache": cache_stats(),
+            "tile_cache": tile_cache_stats(),
+            "pool": {
+                "sync": pool_stats(engine),
+                "async": pool_stats(get_async_engine()),
+            },
+        }
     except Exception as exc:
         return {"status": "error", "detail": str(exc)}
\ No newline at end of file
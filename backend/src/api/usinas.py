@@ -1,16 +1,67 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response, StreamingResponse
 
-from ..core.database import get_engine
-from ..services.geospatial import fetch_usinas_geojson
+from ..core.cache import cached_tile
+from ..core.database import get_async_engine
+from ..services.geospatial import (
+    MVT_LAYER,
+    fetch_usinas_tile,
+    is_valid_tile,
+    parse_bbox,
+    stream_usinas_geojson,
+)
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
 
 router = APIRouter(prefix="/usinas")
 
 
 @router.get("/geo")
-def get_usinas_geojson(limite: int = 100):
+async def get_usinas_geojson(
+    bbox: str | None = None,
+    fonte: str | None = None,
+    potencia_min: float | None = None,
+    limite: int | None = None,
+):
+    """Usinas do SIGA como GeoJSON; ``bbox`` = min_lon,min_lat,max_lon,max_lat (EPSG:4326)."""
+    try:
+        envelope = parse_bbox(bbox) if bbox else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if limite is not None and limite <= 0:
+        raise HTTPException(status_code=400, detail="'limite' deve ser positivo.")
+
+    stream = stream_usinas_geojson(get_async_engine(), envelope, fonte, potencia_min, limite)
     try:
-        engine = get_engine()
-        return fetch_usinas_geojson(engine, limite)
+        head = await stream.__anext__()
     except Exception as exc:
         print(f"Erro no GeoJSON: {exc}")
-        return {}
\ No newline at end of file
+        await stream.aclose()
+        return {}
+
+    async def body():
+        yield head
+        async for chunk in stream:
+            yield chunk
+
+    return StreamingResponse(body(), media_type="application/geo+json")
+
+
+@router.get("/tiles/{z}/{x}/{y}.mvt")
+async def get_usinas_tile(z: int, x: int, y: int):
+    """Tile vetorial (MVT) das usinas; o cache e invalidado a cada carga de usinas_siga."""
+    if not is_valid_tile(z, x, y):
+        raise HTTPException(status_code=400, detail="Tile fora da grade z/x/y.")
+    engine = get_async_engine()
+    tile = await cached_tile(
+        engine,
+        MVT_LAYER,
+        z,
+        x,
+        y,
+        ("usinas_siga",),
+        lambda: fetch_usinas_tile(engine, z, x, y),
+    )
+    if tile is None:
+        return Response(status_code=503)
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE)
\ No newline at end of file
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .timing import timed
+
+CACHE_MAX_ENTRIES = int(os.getenv("API_CACHE_MAX_ENTRIES", "256"))
+CACHE_TTL_S = float(os.getenv("API_CACHE_TTL_S", "300"))
+CACHE_VERSION_POLL_S = float(os.getenv("API_CACHE_VERSION_POLL_S", "5"))
+TILE_CACHE_MAX_ENTRIES = int(os.getenv("API_TILE_CACHE_MAX_ENTRIES", "4096"))
+TILE_CACHE_TTL_S = float(os.getenv("API_TILE_CACHE_TTL_S", "86400"))
+
+
+class LRUCache:
+    """Cache em memoria limitado por numero de entradas (LRU) e idade (TTL)."""
+
+    def __init__(self, max_entries: int, ttl_s: float, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            stored_at, value = entry
+            if self._clock() - stored_at > self.ttl_s:
+                del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class DataVersions:
+    """Carimbos de versao por dataset publicados pelo ETL em etl_data_version.
+
+    A tabela e consultada no maximo uma vez a cada ``poll_s`` segundos; entre
+    consultas a ultima leitura e reaproveitada.
+    """
+
+    def __init__(self, poll_s: float, clock: Callable[[], float] = time.monotonic):
+        self.poll_s = poll_s
+        self._clock = clock
+        self._versions: dict[str, int] = {}
+        self._checked_at: float | None = None
+        self._lock = threading.Lock()
+
+    async def get(self, engine: AsyncEngine) -> dict[str, int]:
+        with self._lock:
+            now = self._clock()
+            if self._checked_at is not None and now - self._checked_at < self.poll_s:
+                return self._versions
+            self._checked_at = now
+
+        try:
+            with timed("db"):
+                async with engine.connect() as conn:
+                    result = await conn.execute(text("SELECT dataset, versao FROM etl_data_version"))
+                    rows = result.fetchall()
+            versions = {row.dataset: int(row.versao) for row in rows}
+        except Exception as exc:
+            print(f"Erro ao ler versao dos dados: {exc}")
+            return self._versions
+
+        with self._lock:
+            self._versions = versions
+        return versions
+
+    async def stamp(self, engine: AsyncEngine, datasets: Iterable[str]) -> tuple[int, ...]:
+        versions = await self.get(engine)
+        return tuple(versions.get(dataset, 0) for dataset in datasets)
+
+
+_response_cache = LRUCache(CACHE_MAX_ENTRIES, CACHE_TTL_S)
+_tile_cache = LRUCache(TILE_CACHE_MAX_ENTRIES, TILE_CACHE_TTL_S)
+_data_versions = DataVersions(CACHE_VERSION_POLL_S)
+
+
+async def cached_response(
+    engine: AsyncEngine,
+    endpoint: str,
+    params: dict,
+    datasets: Iterable[str],
+    compute: Callable[[], Awaitable[Any]],
+    *,
+    cache: LRUCache | None = None,
+    keep: Callable[[Any], bool] = bool,
+) -> Any:
+    """Serve ``compute()`` do cache enquanto os datasets de origem nao mudarem.
+
+    A chave combina endpoint, parametros e a versao atual de cada dataset, entao
+    uma carga do ETL torna as entradas antigas inalcancaveis (e o LRU as descarta).
+    So sao guardados valores aceitos por ``keep``; por padrao os vazios ficam de
+    fora, pois os servicos devolvem vazio em erro.
+    """
+    cache = _response_cache if cache is None else cache
+    stamp = await _data_versions.stamp(engine, datasets)
+    key = (endpoint, tuple(sorted(params.items())), stamp)
+    hit, value = cache.get(key)
+    if hit:
+        return value
+
+    value = await compute()
+    if keep(value):
+        cache.set(key, value)
+    return value
+
+
+async def cached_tile(
+    engine: AsyncEngine,
+    layer: str,
+    z: int,
+    x: int,
+    y: int,
+    datasets: Iterable[str],
+    compute: Callable[[], Awaitable[bytes | None]],
+) -> bytes | None:
+    """Cache LRU proprio para tiles vetoriais; tiles vazios (b"") tambem sao guardados."""
+    return await cached_response(
+        engine,
+        layer,
+        {"z": z, "x": x, "y": y},
+        datasets,
+        compute,
+        cache=_tile_cache,
+        keep=lambda tile: tile is not None,
+    )
+
+
+async def data_version_stamp(engine: AsyncEngine, datasets: Iterable[str]) -> tuple[int, ...]:
+    """Versao atual dos datasets, para caches fora do LRU (ex.: snapshots em memoria)."""
+    return await _data_versions.stamp(engine, datasets)
+
+
+def cache_stats() -> dict:
+    return _response_cache.stats()
+
+
+def tile_cache_stats() -> dict:
+    return _tile_cache.stats()
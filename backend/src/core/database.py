@@ -1,21 +1,162 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import threading
+import time
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_S = float(os.getenv("DB_POOL_TIMEOUT_S", "30"))
+DB_POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_WARMUP = os.getenv("DB_POOL_WARMUP", "true").lower() in ("1", "true", "yes")
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
 _engine: Engine | None = None
+_async_engine: AsyncEngine | None = None
+
+
+class PoolWaitStats:
+    """Acumula o tempo gasto esperando uma conexao livre no pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def record(self, elapsed_s: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_s += elapsed_s
+            self.max_s = max(self.max_s, elapsed_s)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_ms = self.total_s / self.count * 1000 if self.count else 0.0
+            return {
+                "checkouts": self.count,
+                "wait_ms_avg": round(avg_ms, 3),
+                "wait_ms_max": round(self.max_s * 1000, 3),
+            }
+
+
+class _WaitTimingMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.wait_stats.record(time.perf_counter() - inicio)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
 
 def get_engine() -> Engine:
     global _engine
     if _engine is None:
         if not DATABASE_URL:
             raise RuntimeError("DATABASE_URL não configurada")
-        _engine = create_engine(DATABASE_URL)
+        _engine = create_engine(DATABASE_URL, **_pool_options(InstrumentedQueuePool))
     return _engine
 
+def get_async_engine() -> AsyncEngine:
+    global _async_engine
+    if _async_engine is None:
+        if not DATABASE_URL:
+            raise RuntimeError("DATABASE_URL não configurada")
+        _async_engine = create_async_engine(
+            to_async_url(DATABASE_URL), **_pool_options(InstrumentedAsyncQueuePool)
+        )
+    return _async_engine
+
+def to_async_url(url: str) -> URL:
+    parsed = make_url(url)
+    return parsed.set(drivername=_ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername))
+
 def get_db_connection():
-    return get_engine().connect()
\ No newline at end of file
+    return get_engine().connect()
+
+def pool_stats(engine: Engine | AsyncEngine) -> dict:
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"status": pool.status()}
+    stats = {
+        "size": pool.size(),
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update(wait_stats.snapshot())
+    return stats
+
+async def warmup_pools() -> None:
+    """Abre o pool_size de conexoes de cada engine antes do primeiro request."""
+    if not DATABASE_URL or not DB_POOL_WARMUP:
+        return
+    try:
+        await asyncio.gather(
+            asyncio.to_thread(_warmup_sync, get_engine()),
+            _warmup_async(get_async_engine()),
+        )
+    except Exception as exc:
+        print(f"Erro no aquecimento do pool: {exc}")
+
+async def dispose_engines() -> None:
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+
+def _pool_options(poolclass: type) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT_S,
+        "pool_recycle": DB_POOL_RECYCLE_S,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+def _warmup_size(engine: Engine | AsyncEngine) -> int:
+    pool = engine.pool
+    return pool.size() if isinstance(pool, QueuePool) else 1
+
+def _warmup_sync(engine: Engine) -> None:
+    connections = [engine.connect() for _ in range(_warmup_size(engine))]
+    for connection in connections:
+        connection.execute(text("SELECT 1"))
+        connection.close()
+
+async def _warmup_async(engine: AsyncEngine) -> None:
+    connections = await asyncio.gather(
+        *(engine.connect().start() for _ in range(_warmup_size(engine)))
+    )
+    for connection in connections:
+        await connection.execute(text("SELECT 1"))
+        await connection.close()
\ No newline at end of file
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Sem token o profiler fica desligado; com token, a requisicao pede o perfil com
+# o cabecalho X-Profile: <token> ou ?profile=<token>.
+PROFILER_TOKEN = os.getenv("API_PROFILER_TOKEN", "")
+PROFILER_DIR = Path(os.getenv("API_PROFILER_DIR", "/tmp/api-profiles"))
+PROFILER_INTERVAL_MS = float(os.getenv("API_PROFILER_INTERVAL_MS", "5"))
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "profile"
+
+
+def fold_stack(frame) -> str:
+    """Pilha da raiz ate a folha no formato dobrado (funcao (arquivo:linha);...)."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Amostra a pilha de uma thread a cada ``interval_s`` e conta as pilhas dobradas.
+
+    A saida e o formato "folded" (pilha;pilha;folha contagem), aceito pelo
+    flamegraph.pl, speedscope e inferno. Como a thread amostrada e a do event
+    loop, outras requisicoes atendidas no mesmo intervalo tambem aparecem.
+    """
+
+    def __init__(self, thread_id: int, interval_s: float):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="api-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[fold_stack(frame)] += 1
+                self.samples += 1
+            del frame
+
+
+def write_folded(stacks: Counter[str], path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = [f"{stack} {count}" for stack, count in stacks.most_common()]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def profile_requested(scope: Scope, token: str = PROFILER_TOKEN) -> bool:
+    if not token:
+        return False
+    for name, value in scope.get("headers", []):
+        if name == PROFILE_HEADER and value.decode("latin-1") == token:
+            return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return token in query.get(PROFILE_QUERY, [])
+
+
+def _profile_path(scope: Scope, directory: Path) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", scope.get("path", "")).strip("-") or "root"
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    return directory / f"{stamp}-{slug}.folded"
+
+
+class ProfilerMiddleware:
+    """Perfil por amostragem sob demanda: grava um .folded por requisicao marcada.
+
+    Um perfil por vez por processo; pedidos enquanto outro roda seguem sem perfil.
+    O caminho do arquivo volta no cabecalho ``X-Profile-File``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str = PROFILER_TOKEN,
+        interval_ms: float = PROFILER_INTERVAL_MS,
+        directory: Path = PROFILER_DIR,
+    ):
+        self.app = app
+        self.token = token
+        self.interval_s = interval_ms / 1000
+        self.directory = Path(directory)
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not profile_requested(scope, self.token):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        path = _profile_path(scope, self.directory)
+
+        async def send_with_path(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile-File", str(path))
+            await send(message)
+
+        profiler = SamplingProfiler(threading.get_ident(), self.interval_s)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_path)
+        finally:
+            stacks = profiler.stop()
+            self._busy.release()
+            try:
+                write_folded(stacks, path)
+            except OSError as exc:
+                print(f"Erro ao gravar perfil: {exc}")
\ No newline at end of file
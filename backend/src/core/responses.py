@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pandas as pd
+import pyarrow as pa
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from .timing import timed
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def accepts_arrow(request: Request) -> bool:
+    return ARROW_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def frame_to_arrow(df: pd.DataFrame) -> bytes:
+    """Serializa o DataFrame em Arrow IPC (formato stream), preservando tipos e fuso."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def frame_response(request: Request, df: pd.DataFrame):
+    """Negociacao de conteudo para series temporais: Arrow se o cliente pedir, senao JSON (records).
+
+    A resposta ja sai serializada para o tempo entrar na metrica ``serialize`` do Server-Timing.
+    """
+    with timed("serialize"):
+        if accepts_arrow(request):
+            return Response(content=frame_to_arrow(df), media_type=ARROW_MEDIA_TYPE)
+        return JSONResponse(content=jsonable_encoder(df.to_dict(orient="records")))
\ No newline at end of file
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Metricas por requisicao: db (consultas), compute (pandas/numpy) e serialize (JSON/Arrow).
+_timings: ContextVar[dict[str, float] | None] = ContextVar("server_timing", default=None)
+
+
+@contextmanager
+def timed(metric: str) -> Iterator[None]:
+    """Soma o tempo do bloco na metrica da requisicao corrente; fora de uma requisicao nao faz nada.
+
+    Tarefas criadas com asyncio.gather herdam o mesmo dicionario, entao blocos
+    concorrentes somam seus tempos (a metrica pode passar do tempo de parede).
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[metric] = timings.get(metric, 0.0) + time.perf_counter() - started
+
+
+def format_server_timing(timings: dict[str, float], total_s: float) -> str:
+    parts = [f"{metric};dur={seconds * 1000:.1f}" for metric, seconds in timings.items()]
+    parts.append(f"total;dur={total_s * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """Middleware ASGI que devolve o cabecalho ``Server-Timing`` com db, compute, serialize e total.
+
+    O cabecalho sai junto com o inicio da resposta: em respostas em streaming so
+    entra o que foi medido ate o primeiro byte.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: dict[str, float] = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", format_server_timing(timings, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _timings.reset(token)
\ No newline at end of file
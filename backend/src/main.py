@@ -1,13 +1,31 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from .api.analise import router as analise_router
 from .api.auxiliar import router as auxiliar_router
+from .api.etl import router as etl_router
 from .api.health import router as health_router
 from .api.usinas import router as usinas_router
+from .core.database import dispose_engines, warmup_pools
+from .core.profiler import ProfilerMiddleware
+from .core.timing import ServerTimingMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warmup_pools()
+    yield
+    await dispose_engines()
+
 
-app = FastAPI(title="Energy Netload Monitor API")
+app = FastAPI(title="Energy Netload Monitor API", lifespan=lifespan)
+# O ultimo adicionado e o mais externo: o total do Server-Timing nao inclui o profiler.
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(ProfilerMiddleware)
 
 app.include_router(health_router)
 app.include_router(usinas_router)
 app.include_router(analise_router)
 app.include_router(auxiliar_router)
+app.include_router(etl_router)
\ No newline at end of file
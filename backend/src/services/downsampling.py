@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+	"""Indices escolhidos pelo Largest-Triangle-Three-Buckets (Steinarsson, 2013).
+
+	O primeiro e o ultimo ponto sempre ficam. O miolo e dividido em ``n_out - 2``
+	baldes; em cada um fica o ponto que forma o maior triangulo com o ponto
+	escolhido no balde anterior e a media do balde seguinte. A dependencia entre
+	baldes exige o laco, mas medias e areas de cada balde saem em operacoes NumPy.
+	"""
+	n = len(y)
+	if n_out >= n or n_out < 3:
+		return np.arange(n)
+
+	x = np.asarray(x, dtype=float)
+	y = np.asarray(y, dtype=float)
+	edges = np.floor(np.linspace(1, n - 1, n_out - 1)).astype(int)
+	starts, ends = edges[:-1], edges[1:]
+
+	# Media de cada balde (e um ultimo "balde" so com o ponto final) via somas acumuladas.
+	cx = np.concatenate(([0.0], np.cumsum(x)))
+	cy = np.concatenate(([0.0], np.cumsum(y)))
+	sizes = ends - starts
+	avg_x = np.append((cx[ends] - cx[starts]) / sizes, x[-1])
+	avg_y = np.append((cy[ends] - cy[starts]) / sizes, y[-1])
+
+	selected = np.empty(n_out, dtype=int)
+	selected[0], selected[-1] = 0, n - 1
+	prev = 0
+	for bucket, (start, end) in enumerate(zip(starts, ends)):
+		bx, by = x[start:end], y[start:end]
+		nx, ny = avg_x[bucket + 1], avg_y[bucket + 1]
+		areas = np.abs((x[prev] - nx) * (by - y[prev]) - (x[prev] - bx) * (ny - y[prev]))
+		prev = start + int(np.argmax(areas))
+		selected[bucket + 1] = prev
+	return selected
+
+
+def downsample_frame(
+	df: pd.DataFrame,
+	max_pontos: int,
+	x_col: str,
+	y_col: str,
+	preservar: Sequence[str] = (),
+) -> pd.DataFrame:
+	"""Reduz ``df`` a no maximo ``max_pontos`` linhas com LTTB sobre ``y_col``.
+
+	O maximo e o minimo de ``y_col`` e de cada coluna em ``preservar`` entram
+	sempre (picos e o vale solar nao somem), descontados do orcamento do LTTB.
+	"""
+	if df.empty or len(df) <= max_pontos:
+		return df
+
+	extremos = set()
+	for col in (y_col, *preservar):
+		if col in df.columns:
+			valores = df[col].to_numpy(dtype=float)
+			extremos.update((int(np.nanargmax(valores)), int(np.nanargmin(valores))))
+
+	x = df[x_col]
+	x = x.astype("int64").to_numpy() if pd.api.types.is_datetime64_any_dtype(x) else x.to_numpy(dtype=float)
+	orcamento = max(3, max_pontos - len(extremos))
+	indices = np.union1d(lttb_indices(x, df[y_col].to_numpy(dtype=float), orcamento), sorted(extremos))
+	return df.iloc[indices].reset_index(drop=True)
\ No newline at end of file
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Media de vazao das execucoes anteriores do mesmo extrator, para comparar com a atual.
+JANELA_MEDIA_EXECUCOES = 10
+LIMITE_PADRAO_EXECUCOES = 50
+
+
+async def list_etl_runs(
+	engine: AsyncEngine,
+	extrator: str | None = None,
+	status: str | None = None,
+	limite: int = LIMITE_PADRAO_EXECUCOES,
+) -> list[dict]:
+	"""Ultimas execucoes do ledger etl_runs, da mais recente para a mais antiga."""
+	query, params = _build_runs_query(extrator, status, limite)
+	try:
+		async with engine.connect() as conn:
+			result = (await conn.execute(query, params)).mappings().all()
+	except Exception as exc:
+		print(f"Erro ao listar execucoes do ETL: {exc}")
+		return []
+	return [_format_run(dict(row)) for row in result]
+
+
+def _build_runs_query(extrator: str | None, status: str | None, limite: int):
+	params: dict = {"limite": limite}
+	inner_filter = ""
+	outer_filter = ""
+	if extrator:
+		inner_filter = "WHERE extrator = :extrator"
+		params["extrator"] = extrator.strip().lower()
+	if status:
+		outer_filter = "WHERE status = :status"
+		params["status"] = status.strip().lower()
+
+	# A janela roda antes do filtro de status para a media considerar todas as execucoes ok.
+	query = text(f"""
+		SELECT * FROM (
+			SELECT
+				id, execucao, extrator, status, inicio, fim,
+				extract_s, transform_s, load_s,
+				bytes_lidos, linhas_lidas, linhas_carregadas, pico_rss_processo_mb, erro,
+				vazao.linhas_por_s,
+				AVG(vazao.linhas_por_s) OVER (
+					PARTITION BY extrator ORDER BY inicio
+					ROWS BETWEEN {JANELA_MEDIA_EXECUCOES} PRECEDING AND 1 PRECEDING
+				) AS linhas_por_s_media_anterior
+			FROM etl_runs
+			CROSS JOIN LATERAL (
+				SELECT CASE
+					WHEN status = 'ok'
+						AND COALESCE(extract_s, 0) + COALESCE(transform_s, 0) + COALESCE(load_s, 0) > 0
+					THEN COALESCE(linhas_lidas, linhas_carregadas)
+						/ (COALESCE(extract_s, 0) + COALESCE(transform_s, 0) + COALESCE(load_s, 0))
+				END AS linhas_por_s
+			) vazao
+			{inner_filter}
+		) execucoes
+		{outer_filter}
+		ORDER BY inicio DESC
+		LIMIT :limite
+	""")
+	return query, params
+
+
+def _format_run(row: dict) -> dict:
+	atual = row.get("linhas_por_s")
+	anterior = row.get("linhas_por_s_media_anterior")
+	# < 1 indica execucao mais lenta que a media recente (regressao de vazao).
+	row["vazao_relativa"] = round(atual / anterior, 3) if atual and anterior else None
+	return row
\ No newline at end of file
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..core.cache import data_version_stamp
+from ..core.timing import timed
+
+GD_DATASETS = ("gd_detalhada",)
+
+
+@dataclass
+class GdResumo:
+	"""Totais de gd_resumo (MW) em dicionarios: as consultas viram lookups."""
+
+	total_mw: float = 0.0
+	nomes: dict[int, str] = field(default_factory=dict)
+	por_distribuidora: dict[int, float] = field(default_factory=dict)
+	por_classe: dict[str, float] = field(default_factory=dict)
+	por_uf: dict[str, float] = field(default_factory=dict)
+	classes_por_distribuidora: dict[int, dict[str, float]] = field(default_factory=dict)
+
+	def resolver(self, distribuidora: str | None, distribuidora_id: int | None = None) -> list[int] | None:
+		"""Ids do filtro (None = todas), com a mesma semantica do ILIKE '%nome%' de load_calc."""
+		if distribuidora_id is not None:
+			return [distribuidora_id]
+		if distribuidora and distribuidora.strip():
+			termo = distribuidora.strip().upper()
+			return [id_ for id_, nome in self.nomes.items() if termo in nome.upper()]
+		return None
+
+	def capacidade(self, ids: list[int] | None) -> float:
+		if ids is None:
+			return self.total_mw
+		return sum(self.por_distribuidora.get(id_, 0.0) for id_ in ids)
+
+	def classes(self, ids: list[int] | None) -> list[tuple[str, float]]:
+		if ids is None:
+			totais = self.por_classe
+		else:
+			totais = {}
+			for id_ in ids:
+				for classe, mw in self.classes_por_distribuidora.get(id_, {}).items():
+					totais[classe] = totais.get(classe, 0.0) + mw
+		return sorted(totais.items(), key=lambda item: item[1], reverse=True)
+
+	def ranking(self, limit: int) -> list[str]:
+		ordem = sorted(self.por_distribuidora.items(), key=lambda item: item[1], reverse=True)
+		return [self.nomes[id_] for id_, _ in ordem[:limit] if id_ in self.nomes]
+
+
+def build_gd_resumo(rows) -> GdResumo:
+	resumo = GdResumo()
+	for row in rows:
+		mw = float(row.potencia_mw or 0.0)
+		if row.nivel == "total":
+			resumo.total_mw = mw
+		elif row.nivel == "distribuidora" and row.distribuidora_id is not None:
+			resumo.por_distribuidora[row.distribuidora_id] = mw
+			if row.nome:
+				resumo.nomes[row.distribuidora_id] = row.nome
+		elif row.nivel == "classe" and row.classe is not None:
+			resumo.por_classe[row.classe] = mw
+		elif row.nivel == "uf" and row.sigla_uf is not None:
+			resumo.por_uf[row.sigla_uf] = mw
+		elif row.nivel == "distribuidora_classe" and row.distribuidora_id is not None and row.classe is not None:
+			resumo.classes_por_distribuidora.setdefault(row.distribuidora_id, {})[row.classe] = mw
+	return resumo
+
+
+class GdResumoSnapshot:
+	"""Copia em memoria de gd_resumo, recarregada quando a versao de gd_detalhada muda.
+
+	Sem lock: duas recargas simultaneas leem a mesma tabela pequena e a ultima vence.
+	"""
+
+	def __init__(self):
+		self._stamp: tuple[int, ...] | None = None
+		self._resumo: GdResumo | None = None
+
+	async def get(self, engine: AsyncEngine) -> GdResumo | None:
+		"""Snapshot atual; None se gd_resumo nao existe ou esta vazio (quem chama agrega na hora)."""
+		stamp = await data_version_stamp(engine, GD_DATASETS)
+		if self._resumo is not None and stamp == self._stamp:
+			return self._resumo
+
+		query = text("""
+			SELECT r.nivel, r.distribuidora_id, r.classe, r.sigla_uf, r.potencia_mw, d.nome
+			FROM gd_resumo r
+			LEFT JOIN distribuidoras d ON d.id = r.distribuidora_id
+		""")
+		try:
+			with timed("db"):
+				async with engine.connect() as conn:
+					rows = (await conn.execute(query)).fetchall()
+		except Exception as exc:
+			print(f"Erro ao carregar resumo de GD: {exc}")
+			return None
+
+		if not rows:
+			return None
+		self._resumo = build_gd_resumo(rows)
+		self._stamp = stamp
+		return self._resumo
+
+	def clear(self) -> None:
+		self._stamp = None
+		self._resumo = None
+
+
+_snapshot = GdResumoSnapshot()
+
+
+async def get_gd_resumo(engine: AsyncEngine) -> GdResumo | None:
+	return await _snapshot.get(engine)
\ No newline at end of file
@@ -1,11 +1,123 @@
 from __future__ import annotations
 
-import json
+from typing import AsyncIterator
 
-import geopandas as gpd
-from sqlalchemy.engine import Engine
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
 
-def fetch_usinas_geojson(engine: Engine, limit: int = 100) -> dict:
-	sql = f"SELECT nome, fonte, potencia_kw, geom FROM usinas_siga LIMIT {limit}"
-	gdf = gpd.read_postgis(sql, engine, geom_col="geom")
-	return json.loads(gdf.to_json())
+GEOJSON_BATCH_ROWS = 1000
+MVT_LAYER = "usinas"
+MVT_EXTENT = 4096
+MVT_BUFFER = 64
+MVT_MAX_ZOOM = 22
+
+_FEATURE_SQL = """
+	SELECT json_build_object(
+		'type', 'Feature',
+		'geometry', ST_AsGeoJSON(geom, 6)::json,
+		'properties', json_build_object('nome', nome, 'fonte', fonte, 'potencia_kw', potencia_kw)
+	)::text AS feature
+	FROM usinas_siga
+"""
+
+_TILE_SQL = """
+	WITH bounds AS (
+		SELECT ST_TileEnvelope(:z, :x, :y) AS geom_3857
+	),
+	mvtgeom AS (
+		SELECT
+			ST_AsMVTGeom(ST_Transform(u.geom, 3857), bounds.geom_3857, :extent, :buffer, true) AS geom,
+			u.nome,
+			u.fonte,
+			u.potencia_kw
+		FROM usinas_siga u, bounds
+		WHERE u.geom && ST_Transform(bounds.geom_3857, 4326)
+	)
+	SELECT ST_AsMVT(mvtgeom.*, :layer, :extent, 'geom') AS tile
+	FROM mvtgeom
+"""
+
+_COLLECTION_HEAD = '{"type":"FeatureCollection","features":['
+_COLLECTION_TAIL = "]}"
+
+
+def parse_bbox(bbox: str) -> tuple[float, float, float, float]:
+	"""Converte 'min_lon,min_lat,max_lon,max_lat' (EPSG:4326) em floats."""
+	partes = [p.strip() for p in bbox.split(",")]
+	if len(partes) != 4:
+		raise ValueError("bbox deve ter 4 valores: min_lon,min_lat,max_lon,max_lat")
+	min_lon, min_lat, max_lon, max_lat = (float(p) for p in partes)
+	if min_lon > max_lon or min_lat > max_lat:
+		raise ValueError("bbox com minimo maior que maximo")
+	return min_lon, min_lat, max_lon, max_lat
+
+
+def _build_usinas_query(
+	bbox: tuple[float, float, float, float] | None = None,
+	fonte: str | None = None,
+	potencia_min: float | None = None,
+	limite: int | None = None,
+) -> tuple[str, dict]:
+	conditions = ["geom IS NOT NULL"]
+	params: dict = {}
+	if bbox is not None:
+		# && usa o indice GiST (usinas_siga_geom_gist) para o recorte por envelope.
+		conditions.append("geom && ST_MakeEnvelope(:min_lon, :min_lat, :max_lon, :max_lat, 4326)")
+		params.update(zip(("min_lon", "min_lat", "max_lon", "max_lat"), bbox))
+	if fonte:
+		conditions.append("UPPER(fonte) = UPPER(:fonte)")
+		params["fonte"] = fonte
+	if potencia_min is not None:
+		conditions.append("potencia_kw >= :potencia_min")
+		params["potencia_min"] = potencia_min
+
+	query = _FEATURE_SQL + "WHERE " + " AND ".join(conditions)
+	if limite is not None:
+		query += " ORDER BY potencia_kw DESC NULLS LAST LIMIT :limite"
+		params["limite"] = limite
+	return query, params
+
+
+async def stream_usinas_geojson(
+	engine: AsyncEngine,
+	bbox: tuple[float, float, float, float] | None = None,
+	fonte: str | None = None,
+	potencia_min: float | None = None,
+	limite: int | None = None,
+) -> AsyncIterator[str]:
+	"""FeatureCollection montada no Postgres e enviada em lotes, sem passar por geopandas.
+
+	Cada linha ja chega como o texto JSON de uma Feature (ST_AsGeoJSON); aqui so
+	se concatenam os lotes entre cabecalho e rodape. A consulta roda antes do
+	primeiro yield, entao erros de banco aparecem na primeira iteracao.
+	"""
+	query, params = _build_usinas_query(bbox, fonte, potencia_min, limite)
+	async with engine.connect() as conn:
+		result = await conn.stream(text(query), params)
+		yield _COLLECTION_HEAD
+		first = True
+		async for rows in result.partitions(GEOJSON_BATCH_ROWS):
+			chunk = ",".join(row.feature for row in rows)
+			yield chunk if first else "," + chunk
+			first = False
+	yield _COLLECTION_TAIL
+
+
+def is_valid_tile(z: int, x: int, y: int) -> bool:
+	if not 0 <= z <= MVT_MAX_ZOOM:
+		return False
+	limite = 2 ** z
+	return 0 <= x < limite and 0 <= y < limite
+
+
+async def fetch_usinas_tile(engine: AsyncEngine, z: int, x: int, y: int) -> bytes | None:
+	"""Tile MVT (camada ``usinas``: nome, fonte, potencia_kw); None em erro, b"" se vazio."""
+	params = {"z": z, "x": x, "y": y, "extent": MVT_EXTENT, "buffer": MVT_BUFFER, "layer": MVT_LAYER}
+	try:
+		async with engine.connect() as conn:
+			result = await conn.execute(text(_TILE_SQL), params)
+			tile = result.scalar()
+		return bytes(tile) if tile else b""
+	except Exception as exc:
+		print(f"Erro ao gerar tile {z}/{x}/{y}: {exc}")
+		return None
\ No newline at end of file
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..core.cache import data_version_stamp
+from .load_calc import LIMITE_HORAS_STREAM, fetch_hidden_load_updates, fetch_netload_cursor
+
+STREAM_POLL_S = float(os.getenv("API_STREAM_POLL_S", "5"))
+# Folga do cursor: uma carga grava atualizado_em antes do commit; horas reenviadas sao idempotentes no cliente.
+STREAM_MARGEM_S = float(os.getenv("API_STREAM_MARGEM_S", "60"))
+STREAM_RETRY_MS = 5000
+
+# Novas horas chegam por carga_ons/clima_real; gd_detalhada muda a capacidade de toda a serie.
+HORAS_DATASETS = ("carga_ons", "clima_real")
+RECARGA_DATASETS = ("gd_detalhada",)
+
+
+def format_sse(event: str, data, event_id: str | None = None) -> str:
+	"""Um evento Server-Sent Events (``data`` vai como JSON numa linha)."""
+	lines = [f"event: {event}"]
+	if event_id is not None:
+		lines.append(f"id: {event_id}")
+	lines.append(f"data: {json.dumps(jsonable_encoder(data), separators=(',', ':'))}")
+	return "\n".join(lines) + "\n\n"
+
+
+async def netload_events(
+	engine: AsyncEngine,
+	subsistema: str = "SUDESTE",
+	distribuidora: str | None = None,
+	distribuidora_id: int | None = None,
+	desde: datetime | None = None,
+	*,
+	is_disconnected: Callable[[], Awaitable[bool]],
+	intervalo_s: float = STREAM_POLL_S,
+	margem: timedelta = timedelta(seconds=STREAM_MARGEM_S),
+	limite: int = LIMITE_HORAS_STREAM,
+) -> AsyncIterator[str]:
+	"""Eventos SSE com as horas de carga oculta regravadas pelo ETL.
+
+	A cada ``intervalo_s`` compara os carimbos de etl_data_version (a mesma leitura
+	compartilhada do cache de respostas); netload_horaria so e consultada quando
+	carga_ons ou clima_real mudam, e apenas as linhas com ``atualizado_em`` depois
+	do cursor. Eventos:
+
+	- ``horas``: lista de linhas (mesmas colunas de /analise/carga-oculta); ``id`` e o cursor.
+	- ``recarregar``: a serie inteira mudou (nova carga de GD ou mais de ``limite`` horas).
+	- comentario ``: ping`` quando nada mudou, para manter a conexao e detectar quedas.
+	"""
+	datasets = HORAS_DATASETS + RECARGA_DATASETS
+	stamp = await data_version_stamp(engine, datasets)
+	if desde is None:
+		desde = await fetch_netload_cursor(engine, subsistema)
+	yield f"retry: {STREAM_RETRY_MS}\n\n"
+
+	while not await is_disconnected():
+		await asyncio.sleep(intervalo_s)
+		atual = await data_version_stamp(engine, datasets)
+		if atual == stamp:
+			yield ": ping\n\n"
+			continue
+
+		if atual[len(HORAS_DATASETS):] != stamp[len(HORAS_DATASETS):]:
+			stamp = atual
+			desde = await fetch_netload_cursor(engine, subsistema) or desde
+			yield format_sse("recarregar", {"motivo": "gd_detalhada"})
+			continue
+
+		df, cursor = await fetch_hidden_load_updates(
+			engine,
+			subsistema,
+			distribuidora,
+			distribuidora_id,
+			desde - margem if desde is not None else None,
+			limite,
+		)
+		if cursor is None and desde is not None:
+			# Erro na consulta: o carimbo nao avanca e a proxima volta tenta de novo.
+			yield ": ping\n\n"
+			continue
+		stamp = atual
+
+		if len(df) > limite:
+			desde = await fetch_netload_cursor(engine, subsistema) or cursor
+			yield format_sse("recarregar", {"motivo": "horas"})
+			continue
+		if cursor is not None:
+			desde = cursor if desde is None else max(desde, cursor)
+		if not df.empty:
+			yield format_sse("horas", df.to_dict(orient="records"), event_id=desde.isoformat())
@@ -1,60 +1,184 @@
 from __future__ import annotations
 
+import asyncio
+from datetime import datetime
+
 import numpy as np
 import pandas as pd
 from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..core.timing import timed
+from .gd_resumo import get_gd_resumo
+
+FATOR_PERFORMANCE = 0.85
+LIMIAR_SOL_WM2 = 10.0
+PICO_SOL_SINTETICO_WM2 = 800.0
+HORA_NASCER_SOL = 6
+HORA_POR_SOL = 18
+LIMITE_PADRAO_HORAS = 24
+LIMITE_PADRAO_LOTE = 50
+LIMITE_HORAS_STREAM = 24 * 7
+CAPACIDADE_PADRAO_DISTRIBUIDORA_MW = 3000.0
 
 
-def calculate_hidden_load(
-	engine: Engine,
+async def calculate_hidden_load(
+	engine: AsyncEngine,
 	subsistema: str = "SUDESTE",
 	distribuidora: str | None = None,
-) -> list[dict]:
-	sub_upper = subsistema.upper()
-	sub_simple = "SUDESTE" if "SUDESTE" in sub_upper else sub_upper
-	sub_like = f"%{sub_simple}%"
-	filter_clause, params_cap = _build_distrib_filter(distribuidora)
+	inicio: datetime | None = None,
+	fim: datetime | None = None,
+	distribuidora_id: int | None = None,
+) -> pd.DataFrame:
+	"""Serie horaria com a estimativa solar; DataFrame vazio em erro ou sem dados."""
+	sub_simple = _canonical_subsistema(subsistema)
+	filter_clause, params_cap = _build_distrib_filter(distribuidora, distribuidora_id)
+	query, params = _build_series_query(sub_simple, inicio, fim)
 
 	try:
-		with engine.connect() as conn:
-			cap_solar_mw = _fetch_capacity(conn, filter_clause, params_cap)
-			if not cap_solar_mw or cap_solar_mw < 10:
-				cap_solar_mw = 3000.0 if distribuidora else 15000.0
-
-			query = text("""
-				SELECT 
-					ons.time as hora,
-					ons.carga_mw as carga_ons,
-					COALESCE(clima.irradiancia_wm2, 0) as sol_wm2
-				FROM carga_ons ons
-				LEFT JOIN clima_real clima 
-					ON date_trunc('hour', ons.time) = date_trunc('hour', clima.time)
-					AND clima.subsistema = :sub_simple
-				WHERE UPPER(ons.subsistema) LIKE :sub_like
-				ORDER BY ons.time DESC
-				LIMIT 24
-			""")
-
-			result = conn.execute(
-				query, {"sub_simple": sub_simple, "sub_like": sub_like}
-			).fetchall()
+		# Capacidade e serie horaria sao independentes: cada uma usa sua conexao.
+		cap_solar_mw, result = await asyncio.gather(
+			_resolve_capacity(engine, distribuidora, distribuidora_id, filter_clause, params_cap),
+			_fetch_all(engine, query, params),
+		)
 	except Exception as exc:
 		print(f"Erro ao calcular carga oculta: {exc}")
-		return []
+		return pd.DataFrame()
 
 	if not result:
-		return []
+		return pd.DataFrame()
+
+	with timed("compute"):
+		df = _build_hidden_load_dataframe(result)
+		return compute_hidden_load(df, _capacity_or_default(cap_solar_mw, bool(filter_clause)))
+
+
+async def calculate_hidden_load_batch(
+	engine: AsyncEngine,
+	subsistema: str = "SUDESTE",
+	inicio: datetime | None = None,
+	fim: datetime | None = None,
+	distribuidora_ids: list[int] | None = None,
+	limite: int = LIMITE_PADRAO_LOTE,
+) -> pd.DataFrame:
+	"""Carga oculta de varias distribuidoras numa passada, em formato longo (distribuidora x hora).
+
+	A serie do subsistema e lida uma vez e a capacidade de todas as distribuidoras
+	sai de um unico GROUP BY. Sem ``distribuidora_ids``, usa as ``limite`` maiores;
+	com ids, ``limite`` nao se aplica.
+	"""
+	sub_simple = _canonical_subsistema(subsistema)
+	query, params = _build_series_query(sub_simple, inicio, fim)
+	cap_query, cap_params = _build_capacity_by_distributor_query(distribuidora_ids, limite)
+
+	try:
+		capacidades, result = await asyncio.gather(
+			_fetch_all(engine, cap_query, cap_params),
+			_fetch_all(engine, query, params),
+		)
+	except Exception as exc:
+		print(f"Erro ao calcular carga oculta em lote: {exc}")
+		return pd.DataFrame()
+
+	if not result or not capacidades:
+		return pd.DataFrame()
+
+	with timed("compute"):
+		df = _build_hidden_load_dataframe(result)
+		return _build_batch_frame(df, capacidades)
+
+
+async def fetch_hidden_load_updates(
+	engine: AsyncEngine,
+	subsistema: str = "SUDESTE",
+	distribuidora: str | None = None,
+	distribuidora_id: int | None = None,
+	desde: datetime | None = None,
+	limite: int = LIMITE_HORAS_STREAM,
+) -> tuple[pd.DataFrame, datetime | None]:
+	"""Horas do subsistema regravadas em netload_horaria depois de ``desde``, ja com a estimativa solar.
+
+	Devolve no maximo ``limite`` + 1 horas (quem chama detecta recargas grandes pelo
+	excesso) e o maior ``atualizado_em`` lido, que e o proximo cursor. Em erro, o
+	cursor volta None.
+	"""
+	sub_simple = _canonical_subsistema(subsistema)
+	filter_clause, params_cap = _build_distrib_filter(distribuidora, distribuidora_id)
+	query, params = _build_updates_query(sub_simple, desde, limite + 1)
+
+	try:
+		result = await _fetch_all(engine, query, params)
+		if not result:
+			return pd.DataFrame(), desde
+		cap_solar_mw = await _resolve_capacity(engine, distribuidora, distribuidora_id, filter_clause, params_cap)
+	except Exception as exc:
+		print(f"Erro ao buscar horas novas: {exc}")
+		return pd.DataFrame(), None
+
+	cursor = max(row.atualizado_em for row in result)
+	with timed("compute"):
+		df = _build_hidden_load_dataframe([row[:3] for row in result])
+		return compute_hidden_load(df, _capacity_or_default(cap_solar_mw, bool(filter_clause))), cursor
+
+
+async def fetch_netload_cursor(engine: AsyncEngine, subsistema: str = "SUDESTE") -> datetime | None:
+	"""Maior ``atualizado_em`` do subsistema: o stream parte dele e so envia o que mudar depois."""
+	query = text("SELECT MAX(atualizado_em) FROM netload_horaria WHERE subsistema = :subsistema")
+	try:
+		with timed("db"):
+			async with engine.connect() as conn:
+				return (await conn.execute(query, {"subsistema": _canonical_subsistema(subsistema)})).scalar()
+	except Exception as exc:
+		print(f"Erro ao ler cursor de netload: {exc}")
+		return None
+
+
+def compute_hidden_load_matrix(
+	df: pd.DataFrame, capacidades_mw: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""Sol corrigido (horas) e matrizes distribuidoras x horas de estimativa solar e carga real.
+
+	Mesmas operacoes de compute_hidden_load, com a capacidade como vetor coluna.
+	"""
+	horas = df["hora"].dt.hour.to_numpy()
+	sol_final = corrigir_sol(horas, df["sol_wm2"].to_numpy(dtype=float))
+	estimativa = np.clip(
+		np.multiply.outer(np.asarray(capacidades_mw, dtype=float), sol_final / 1000) * FATOR_PERFORMANCE, 0, None
+	)
+	carga_real = df["carga_ons"].to_numpy(dtype=float)[np.newaxis, :] + estimativa
+	return sol_final, estimativa, carga_real
 
-	df = _build_hidden_load_dataframe(result)
-	df["sol_wm2_final"] = df.apply(_corrigir_sol, axis=1)
-	df["estimativa_solar_mw"] = (cap_solar_mw * (df["sol_wm2_final"] / 1000) * 0.85).clip(lower=0)
-	df["carga_real_estimada"] = df["carga_ons"] + df["estimativa_solar_mw"]
-	return df.to_dict(orient="records")
 
+def compute_hidden_load(df: pd.DataFrame, cap_solar_mw: float) -> pd.DataFrame:
+	"""Aplica correcao solar, escala pela capacidade e soma a carga em arrays inteiros."""
+	horas = df["hora"].dt.hour.to_numpy()
+	sol_final = corrigir_sol(horas, df["sol_wm2"].to_numpy(dtype=float))
+	estimativa = np.clip(cap_solar_mw * (sol_final / 1000) * FATOR_PERFORMANCE, 0, None)
 
-def fetch_classes_consumption(engine: Engine, distribuidora: str | None = None) -> list[dict]:
-	filter_clause, params = _build_distrib_filter(distribuidora)
+	df["sol_wm2_final"] = sol_final
+	df["estimativa_solar_mw"] = estimativa
+	df["carga_real_estimada"] = df["carga_ons"].to_numpy(dtype=float) + estimativa
+	return df
+
+
+def corrigir_sol(horas: np.ndarray, sol_wm2: np.ndarray) -> np.ndarray:
+	"""Preenche lacunas de irradiancia diurna com uma curva senoidal sintetica."""
+	diurno = (horas >= HORA_NASCER_SOL) & (horas <= HORA_POR_SOL)
+	curva = np.sin(np.pi * (horas - HORA_NASCER_SOL) / 12) * PICO_SOL_SINTETICO_WM2
+	return np.where(diurno & (sol_wm2 < LIMIAR_SOL_WM2), curva, sol_wm2)
+
+
+async def fetch_classes_consumption(
+	engine: AsyncEngine,
+	distribuidora: str | None = None,
+	distribuidora_id: int | None = None,
+) -> list[dict]:
+	resumo = await get_gd_resumo(engine)
+	if resumo is not None:
+		classes = resumo.classes(resumo.resolver(distribuidora, distribuidora_id))
+		return [{"classe": classe, "mw": round(mw, 2)} for classe, mw in classes]
+
+	filter_clause, params = _build_distrib_filter(distribuidora, distribuidora_id)
 	query = text(f"""
 		SELECT classe, SUM(potencia_mw) as total_mw
 		FROM gd_detalhada
@@ -64,8 +188,7 @@ def fetch_classes_consumption(engine: Engine, distribuidora: str | None = None)
 	""")
 
 	try:
-		with engine.connect() as conn:
-			result = conn.execute(query, params).fetchall()
+		result = await _fetch_all(engine, query, params)
 	except Exception as exc:
 		print(f"Erro ao buscar classes de consumo: {exc}")
 		return []
@@ -75,8 +198,12 @@ def fetch_classes_consumption(engine: Engine, distribuidora: str | None = None)
 	]
 
 
-def fetch_fraud_alert(engine: Engine, distribuidora: str | None = None) -> dict:
-	filter_clause, params = _build_distrib_filter(distribuidora)
+async def fetch_fraud_alert(
+	engine: AsyncEngine,
+	distribuidora: str | None = None,
+	distribuidora_id: int | None = None,
+) -> dict:
+	filter_clause, params = _build_audit_filter(distribuidora, distribuidora_id)
 	query = text(f"""
 		SELECT * FROM auditoria_visual 
 		{filter_clause}
@@ -85,8 +212,8 @@ def fetch_fraud_alert(engine: Engine, distribuidora: str | None = None) -> dict:
 	""")
 
 	try:
-		with engine.connect() as conn:
-			result = conn.execute(query, params).fetchone()
+		async with engine.connect() as conn:
+			result = (await conn.execute(query, params)).fetchone()
 	except Exception as exc:
 		print(f"Erro ao buscar alertas de fraude: {exc}")
 		return {}
@@ -105,7 +232,11 @@ def fetch_fraud_alert(engine: Engine, distribuidora: str | None = None) -> dict:
 	}
 
 
-def list_distribuidoras(engine: Engine, limit: int = 50) -> list[str]:
+async def list_distribuidoras(engine: AsyncEngine, limit: int = 50) -> list[str]:
+	resumo = await get_gd_resumo(engine)
+	if resumo is not None:
+		return [""] + resumo.ranking(limit)
+
 	query = text("""
 		SELECT distribuidora 
 		FROM gd_detalhada 
@@ -115,35 +246,202 @@ def list_distribuidoras(engine: Engine, limit: int = 50) -> list[str]:
 	""")
 
 	try:
-		with engine.connect() as conn:
-			result = conn.execute(query, {"limit": limit}).fetchall()
-			names = [row.distribuidora for row in result]
-			return [""] + names
+		result = await _fetch_all(engine, query, {"limit": limit})
+		names = [row.distribuidora for row in result]
+		return [""] + names
 	except Exception as exc:
 		print(f"Erro ao listar distribuidoras: {exc}")
 		return ["", "CEMIG DISTRIBUICAO S.A", "ENEL DISTRIBUICAO SAO PAULO"]
 
 
-def _build_distrib_filter(distribuidora: str | None) -> tuple[str, dict]:
+async def search_distribuidoras(engine: AsyncEngine, termo: str, limit: int = 10) -> list[dict]:
+	"""Resolve um nome aproximado para ids da dimensao (indice de trigramas em distribuidoras.nome)."""
+	clean = termo.strip().upper()
+	if not clean:
+		return []
+	query = text("""
+		SELECT id, nome, similarity(nome, :termo) AS score
+		FROM distribuidoras
+		WHERE nome ILIKE :padrao OR nome % :termo
+		ORDER BY nome = :termo DESC, score DESC, nome
+		LIMIT :limit
+	""")
+
+	try:
+		result = await _fetch_all(engine, query, {"termo": clean, "padrao": f"%{clean}%", "limit": limit})
+	except Exception as exc:
+		print(f"Erro ao buscar distribuidoras: {exc}")
+		return []
+	return [{"id": row.id, "nome": row.nome, "score": round(float(row.score or 0), 3)} for row in result]
+
+
+def _build_distrib_filter(distribuidora: str | None, distribuidora_id: int | None = None) -> tuple[str, dict]:
+	if distribuidora_id is not None:
+		return "WHERE distribuidora_id = :dist_id", {"dist_id": distribuidora_id}
 	if distribuidora and distribuidora.strip():
 		clean = distribuidora.strip()
-		return "WHERE distribuidora ILIKE :dist", {"dist": f"%{clean}%"}
+		# O ILIKE roda na dimensao (trigramas); nas tabelas de fatos o filtro e por id (btree).
+		return (
+			"WHERE distribuidora_id IN (SELECT id FROM distribuidoras WHERE nome ILIKE :dist)",
+			{"dist": f"%{clean}%"},
+		)
 	return "", {}
 
 
-def _fetch_capacity(conn, filter_clause: str, params: dict) -> float:
+def _build_audit_filter(distribuidora: str | None, distribuidora_id: int | None = None) -> tuple[str, dict]:
+	"""Filtro de auditoria_visual pelo nome gravado na tabela, sem depender de distribuidora_id.
+
+	A tabela e reescrita pelo notebook de treino (``to_sql`` com ``replace``), que
+	descarta a coluna de id; o id e resolvido na dimensao no momento da consulta.
+	"""
+	if distribuidora_id is not None:
+		return (
+			"WHERE UPPER(TRIM(distribuidora)) = (SELECT nome FROM distribuidoras WHERE id = :dist_id)",
+			{"dist_id": distribuidora_id},
+		)
+	if distribuidora and distribuidora.strip():
+		return "WHERE distribuidora ILIKE :dist", {"dist": f"%{distribuidora.strip()}%"}
+	return "", {}
+
+
+def _build_capacity_by_distributor_query(distribuidora_ids: list[int] | None, limite: int):
+	"""Capacidade por distribuidora: as pedidas em ``distribuidora_ids`` (todas) ou as ``limite`` maiores."""
+	params: dict = {}
+	if distribuidora_ids:
+		where_clause, limit_clause = "WHERE g.distribuidora_id = ANY(:ids)", ""
+		params["ids"] = list(distribuidora_ids)
+	else:
+		where_clause, limit_clause = "", "LIMIT :limite"
+		params["limite"] = limite
+	query = text(f"""
+		SELECT d.id, d.nome, SUM(g.potencia_mw) AS potencia_mw
+		FROM gd_detalhada g
+		JOIN distribuidoras d ON d.id = g.distribuidora_id
+		{where_clause}
+		GROUP BY d.id, d.nome
+		ORDER BY potencia_mw DESC
+		{limit_clause}
+	""")
+	return query, params
+
+
+def _build_batch_frame(df: pd.DataFrame, capacidades) -> pd.DataFrame:
+	ids = np.array([row.id for row in capacidades])
+	nomes = np.array([row.nome for row in capacidades], dtype=object)
+	cap = np.array([row.potencia_mw or 0.0 for row in capacidades], dtype=float)
+	cap = np.where(cap < 10, CAPACIDADE_PADRAO_DISTRIBUIDORA_MW, cap)
+
+	sol_final, estimativa, carga_real = compute_hidden_load_matrix(df, cap)
+	n_dist, n_horas = estimativa.shape
+	posicao_hora = np.tile(np.arange(n_horas), n_dist)
+	return pd.DataFrame(
+		{
+			"distribuidora_id": np.repeat(ids, n_horas),
+			"distribuidora": np.repeat(nomes, n_horas),
+			"capacidade_mw": np.repeat(cap, n_horas),
+			"hora": pd.DatetimeIndex(df["hora"]).take(posicao_hora),
+			"carga_ons": df["carga_ons"].to_numpy(dtype=float)[posicao_hora],
+			"sol_wm2_final": sol_final[posicao_hora],
+			"estimativa_solar_mw": estimativa.ravel(),
+			"carga_real_estimada": carga_real.ravel(),
+		}
+	)
+
+
+def _capacity_or_default(cap_solar_mw: float | None, filtrado: bool) -> float:
+	if not cap_solar_mw or cap_solar_mw < 10:
+		return CAPACIDADE_PADRAO_DISTRIBUIDORA_MW if filtrado else 15000.0
+	return cap_solar_mw
+
+
+async def _resolve_capacity(
+	engine: AsyncEngine,
+	distribuidora: str | None,
+	distribuidora_id: int | None,
+	filter_clause: str,
+	params: dict,
+) -> float:
+	"""Capacidade pelo snapshot de gd_resumo; sem resumo, agrega gd_detalhada."""
+	resumo = await get_gd_resumo(engine)
+	if resumo is not None:
+		return resumo.capacidade(resumo.resolver(distribuidora, distribuidora_id))
+	return await _fetch_capacity(engine, filter_clause, params)
+
+
+async def _fetch_capacity(engine: AsyncEngine, filter_clause: str, params: dict) -> float:
 	query = text(f"SELECT SUM(potencia_mw) FROM gd_detalhada {filter_clause}")
-	return conn.execute(query, params).scalar() or 0.0
+	with timed("db"):
+		async with engine.connect() as conn:
+			return (await conn.execute(query, params)).scalar() or 0.0
+
+
+async def _fetch_all(engine: AsyncEngine, query, params: dict) -> list:
+	with timed("db"):
+		async with engine.connect() as conn:
+			return (await conn.execute(query, params)).fetchall()
+
+
+def _canonical_subsistema(subsistema: str) -> str:
+	sub_upper = subsistema.strip().upper()
+	return "SUDESTE" if "SUDESTE" in sub_upper else sub_upper
+
+
+def _build_series_query(
+	subsistema: str,
+	inicio: datetime | None,
+	fim: datetime | None,
+):
+	params: dict = {"subsistema": subsistema}
+	conditions = ["subsistema = :subsistema"]
+	if inicio is not None:
+		conditions.append("hora >= :inicio")
+		params["inicio"] = inicio
+	if fim is not None:
+		conditions.append("hora < :fim")
+		params["fim"] = fim
+
+	if inicio is None and fim is None:
+		order_clause = "ORDER BY hora DESC LIMIT :limite"
+		params["limite"] = LIMITE_PADRAO_HORAS
+	else:
+		order_clause = "ORDER BY hora"
+
+	where_clause = " AND ".join(conditions)
+	query = text(f"""
+		SELECT 
+			hora,
+			carga_mw as carga_ons,
+			COALESCE(irradiancia_wm2, 0) as sol_wm2
+		FROM netload_horaria
+		WHERE {where_clause}
+		{order_clause}
+	""")
+	return query, params
+
+
+def _build_updates_query(subsistema: str, desde: datetime | None, limite: int):
+	params: dict = {"subsistema": subsistema, "limite": limite}
+	conditions = ["subsistema = :subsistema"]
+	if desde is not None:
+		conditions.append("atualizado_em > :desde")
+		params["desde"] = desde
+
+	where_clause = " AND ".join(conditions)
+	query = text(f"""
+		SELECT
+			hora,
+			carga_mw as carga_ons,
+			COALESCE(irradiancia_wm2, 0) as sol_wm2,
+			atualizado_em
+		FROM netload_horaria
+		WHERE {where_clause}
+		ORDER BY hora
+		LIMIT :limite
+	""")
+	return query, params
 
 
 def _build_hidden_load_dataframe(result) -> pd.DataFrame:
 	df = pd.DataFrame(result, columns=["hora", "carga_ons", "sol_wm2"])
 	df["hora"] = pd.to_datetime(df["hora"])
-	return df.sort_values("hora")
-
-
-def _corrigir_sol(row: pd.Series) -> float:
-	hora = row["hora"].hour
-	if 6 <= hora <= 18 and row["sol_wm2"] < 10:
-		return np.sin(np.pi * (hora - 6) / 12) * 800
-	return row["sol_wm2"]
+	return df.sort_values("hora", ignore_index=True)
@@ -0,0 +1,68 @@
+import pytest
+
+
+class FakeResult:
+    """Resultado de consulta com as formas de leitura usadas pelos services."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def scalar(self):
+        return self.rows[0][0] if self.rows else None
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    async def partitions(self, size):
+        for start in range(0, len(self.rows), size):
+            yield self.rows[start : start + size]
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        return self.engine.record(query, params)
+
+    async def stream(self, query, params=None):
+        return self.engine.record(query, params)
+
+
+class FakeEngine:
+    """AsyncEngine em memoria: toda consulta devolve ``rows`` e fica registrada em ``queries``."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.queries = []
+
+    def connect(self):
+        return FakeConnection(self)
+
+    def record(self, query, params):
+        self.queries.append((" ".join(str(query).split()), params))
+        return FakeResult(self.rows)
+
+    @property
+    def params(self):
+        return self.queries[-1][1] if self.queries else None
+
+
+@pytest.fixture
+def fake_engine():
+    return FakeEngine
@@ -0,0 +1,73 @@
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from src.core import cache as cache_module
+from src.core.cache import LRUCache, cached_tile
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl_s=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (True, 1)
+
+    cache.set("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_expires_by_ttl():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=10, ttl_s=5, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 4.0
+    assert cache.get("a") == (True, 1)
+    clock.now = 10.0
+    assert cache.get("a") == (False, None)
+    assert cache.stats()["entries"] == 0
+
+
+
+def test_cached_tile_keeps_empty_tiles_and_skips_errors(monkeypatch):
+    versions = {"usinas_siga": 1}
+
+    async def fake_stamp(engine, datasets):
+        return tuple(versions.get(d, 0) for d in datasets)
+
+    monkeypatch.setattr(cache_module._data_versions, "stamp", fake_stamp)
+    monkeypatch.setattr(cache_module, "_tile_cache", LRUCache(max_entries=10, ttl_s=60))
+    calls = []
+
+    def compute(value):
+        async def _compute():
+            calls.append(value)
+            return value
+
+        return _compute
+
+    def tile(z, value):
+        return asyncio.run(cached_tile(None, "usinas", z, 0, 0, ("usinas_siga",), compute(value)))
+
+    assert tile(0, b"") == b""
+    assert tile(0, b"novo") == b""
+    assert tile(1, None) is None
+    assert tile(1, b"ok") == b"ok"
+    assert calls == [b"", None, b"ok"]
+
+    versions["usinas_siga"] = 2
+    assert tile(0, b"recarregado") == b"recarregado"
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from src.core.database import InstrumentedQueuePool, pool_stats, to_async_url
+
+
+def test_to_async_url_maps_drivers():
+    url = to_async_url("postgresql://admin:admin123@db:5432/energy_monitor")
+    assert url.drivername == "postgresql+asyncpg"
+    assert url.database == "energy_monitor"
+
+
+def test_pool_stats_reports_checkouts_and_waits(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=0,
+    )
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        busy = pool_stats(engine)
+    idle = pool_stats(engine)
+
+    assert busy["checked_out"] == 1
+    assert idle["checked_out"] == 0
+    assert idle["idle"] == 1
+    assert idle["checkouts"] == 1
+    assert idle["wait_ms_max"] >= 0
@@ -0,0 +1,30 @@
+import asyncio
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from src.services.etl_runs import _build_runs_query, list_etl_runs
+
+
+def test_build_runs_query_filters_status_after_the_moving_average():
+    query, params = _build_runs_query(" ONS ", "ok", 20)
+    sql = str(query)
+
+    assert params == {"limite": 20, "extrator": "ons", "status": "ok"}
+    assert sql.index("WHERE extrator = :extrator") < sql.index("WHERE status = :status")
+    assert "PARTITION BY extrator" in sql
+
+
+def test_list_etl_runs_adds_relative_throughput(fake_engine):
+    rows = [
+        {"extrator": "ons", "linhas_por_s": 500.0, "linhas_por_s_media_anterior": 1000.0},
+        {"extrator": "gd", "linhas_por_s": None, "linhas_por_s_media_anterior": 1000.0},
+    ]
+    engine = fake_engine(rows)
+
+    runs = asyncio.run(list_etl_runs(engine, limite=5))
+
+    assert [run["vazao_relativa"] for run in runs] == [0.5, None]
+    assert engine.params == {"limite": 5}
@@ -0,0 +1,68 @@
+import asyncio
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from src.services import gd_resumo
+from src.services.gd_resumo import GdResumoSnapshot, build_gd_resumo
+
+Row = namedtuple("Row", ["nivel", "distribuidora_id", "classe", "sigla_uf", "potencia_mw", "nome"])
+
+ROWS = [
+    Row("total", None, None, None, 100.0, None),
+    Row("distribuidora", 1, None, None, 70.0, "CEMIG DISTRIBUICAO S.A"),
+    Row("distribuidora", 2, None, None, 30.0, "ENEL DISTRIBUICAO SAO PAULO"),
+    Row("classe", None, "RESIDENCIAL", None, 80.0, None),
+    Row("classe", None, "COMERCIAL", None, 20.0, None),
+    Row("uf", None, None, "MG", 70.0, None),
+    Row("distribuidora_classe", 1, "RESIDENCIAL", None, 60.0, "CEMIG DISTRIBUICAO S.A"),
+    Row("distribuidora_classe", 1, "COMERCIAL", None, 10.0, "CEMIG DISTRIBUICAO S.A"),
+    Row("distribuidora_classe", 2, "RESIDENCIAL", None, 20.0, "ENEL DISTRIBUICAO SAO PAULO"),
+    Row("distribuidora_classe", 2, "COMERCIAL", None, 10.0, "ENEL DISTRIBUICAO SAO PAULO"),
+]
+
+
+def test_gd_resumo_lookups_match_the_sql_aggregations():
+    resumo = build_gd_resumo(ROWS)
+
+    assert resumo.capacidade(resumo.resolver(None)) == 100.0
+    assert resumo.capacidade(resumo.resolver(" cemig ")) == 70.0
+    assert resumo.capacidade(resumo.resolver("distribuicao")) == 100.0
+    assert resumo.capacidade(resumo.resolver("nada")) == 0.0
+    assert resumo.capacidade(resumo.resolver("cemig", distribuidora_id=2)) == 30.0
+    assert resumo.classes(resumo.resolver("enel")) == [("RESIDENCIAL", 20.0), ("COMERCIAL", 10.0)]
+    assert resumo.classes(None) == [("RESIDENCIAL", 80.0), ("COMERCIAL", 20.0)]
+    assert resumo.ranking(1) == ["CEMIG DISTRIBUICAO S.A"]
+    assert resumo.por_uf == {"MG": 70.0}
+
+
+def test_snapshot_reloads_only_when_the_gd_version_changes(monkeypatch, fake_engine):
+    versions = {"stamp": (1,)}
+
+    async def fake_stamp(engine, datasets):
+        return versions["stamp"]
+
+    monkeypatch.setattr(gd_resumo, "data_version_stamp", fake_stamp)
+    engine = fake_engine(ROWS)
+    snapshot = GdResumoSnapshot()
+
+    async def scenario():
+        first = await snapshot.get(engine)
+        assert await snapshot.get(engine) is first
+        versions["stamp"] = (2,)
+        assert await snapshot.get(engine) is not first
+
+    asyncio.run(scenario())
+    assert len(engine.queries) == 2
+
+
+def test_snapshot_is_none_without_summary_rows(monkeypatch, fake_engine):
+    async def fake_stamp(engine, datasets):
+        return (0,)
+
+    monkeypatch.setattr(gd_resumo, "data_version_stamp", fake_stamp)
+
+    assert asyncio.run(GdResumoSnapshot().get(fake_engine([]))) is None
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from src.services import geospatial
+from src.services.geospatial import (
+    _build_usinas_query,
+    is_valid_tile,
+    parse_bbox,
+    stream_usinas_geojson,
+)
+
+
+class FakeRow:
+    def __init__(self, feature):
+        self.feature = feature
+
+
+async def _collect(stream):
+    return "".join([chunk async for chunk in stream])
+
+
+def test_parse_bbox_validates_order_and_size():
+    assert parse_bbox("-50, -25, -40,-20") == (-50.0, -25.0, -40.0, -20.0)
+    with pytest.raises(ValueError):
+        parse_bbox("-50,-25,-40")
+    with pytest.raises(ValueError):
+        parse_bbox("-40,-25,-50,-20")
+
+
+def test_build_usinas_query_binds_every_filter():
+    query, params = _build_usinas_query((-50.0, -25.0, -40.0, -20.0), "UFV", 1000.0, 10)
+
+    assert "geom && ST_MakeEnvelope(:min_lon, :min_lat, :max_lon, :max_lat, 4326)" in query
+    assert "LIMIT :limite" in query
+    assert params == {
+        "min_lon": -50.0,
+        "min_lat": -25.0,
+        "max_lon": -40.0,
+        "max_lat": -20.0,
+        "fonte": "UFV",
+        "potencia_min": 1000.0,
+        "limite": 10,
+    }
+    assert "LIMIT" not in _build_usinas_query()[0]
+
+
+def test_stream_usinas_geojson_builds_valid_collection(monkeypatch, fake_engine):
+    monkeypatch.setattr(geospatial, "GEOJSON_BATCH_ROWS", 2)
+    features = [
+        json.dumps({"type": "Feature", "geometry": None, "properties": {"nome": f"U{i}"}}) for i in range(5)
+    ]
+    engine = fake_engine([FakeRow(feature) for feature in features])
+
+    body = json.loads(asyncio.run(_collect(stream_usinas_geojson(engine))))
+    empty = json.loads(asyncio.run(_collect(stream_usinas_geojson(fake_engine([])))))
+
+    assert body["type"] == "FeatureCollection"
+    assert [f["properties"]["nome"] for f in body["features"]] == ["U0", "U1", "U2", "U3", "U4"]
+    assert empty == {"type": "FeatureCollection", "features": []}
+
+
+def test_is_valid_tile_checks_grid_bounds():
+    assert is_valid_tile(0, 0, 0)
+    assert is_valid_tile(3, 7, 7)
+    assert not is_valid_tile(3, 8, 0)
+    assert not is_valid_tile(-1, 0, 0)
+    assert not is_valid_tile(23, 0, 0)
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from src.services import live_stream
+from src.services.live_stream import format_sse, netload_events
+
+T0 = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def _horas(n: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "hora": pd.date_range("2024-01-01 12:00", periods=n, freq="h", tz="UTC"),
+            "carga_ons": [30000.0] * n,
+            "estimativa_solar_mw": [100.0] * n,
+        }
+    )
+
+
+def _collect(monkeypatch, stamps, updates, rounds):
+    """Roda o gerador por ``rounds`` voltas com carimbos e respostas de netload simulados."""
+    stamps = iter(stamps)
+    chamadas = []
+
+    async def fake_stamp(engine, datasets):
+        return next(stamps)
+
+    async def fake_cursor(engine, subsistema):
+        return T0
+
+    async def fake_updates(engine, subsistema, distribuidora, distribuidora_id, desde, limite):
+        chamadas.append(desde)
+        return updates.pop(0)
+
+    monkeypatch.setattr(live_stream, "data_version_stamp", fake_stamp)
+    monkeypatch.setattr(live_stream, "fetch_netload_cursor", fake_cursor)
+    monkeypatch.setattr(live_stream, "fetch_hidden_load_updates", fake_updates)
+
+    voltas = iter(range(rounds + 1))
+
+    async def is_disconnected():
+        return next(voltas) == rounds
+
+    async def run():
+        eventos = netload_events(
+            None, is_disconnected=is_disconnected, intervalo_s=0, margem=timedelta(seconds=60), limite=3
+        )
+        return [evento async for evento in eventos]
+
+    return asyncio.run(run()), chamadas
+
+
+def test_format_sse_writes_event_id_and_compact_json():
+    assert format_sse("horas", [{"x": 1}], event_id="c1") == 'event: horas\nid: c1\ndata: [{"x":1}]\n\n'
+
+
+def test_stream_queries_netload_only_when_hour_datasets_change(monkeypatch):
+    cursor = T0 + timedelta(hours=1)
+    eventos, chamadas = _collect(
+        monkeypatch,
+        stamps=[(1, 1, 1), (1, 1, 1), (2, 1, 1), (2, 1, 1)],
+        updates=[(_horas(2), cursor)],
+        rounds=3,
+    )
+
+    assert eventos[0].startswith("retry:")
+    assert eventos[1] == ": ping\n\n"
+    assert eventos[2].startswith(f"event: horas\nid: {cursor.isoformat()}\n")
+    assert len(json.loads(eventos[2].split("data: ", 1)[1])) == 2
+    assert eventos[3] == ": ping\n\n"
+    # O cursor inicial volta a margem para pegar cargas que gravaram antes do commit.
+    assert chamadas == [T0 - timedelta(seconds=60)]
+
+
+def test_stream_asks_for_reload_on_gd_change_or_large_rewrite(monkeypatch):
+    eventos, chamadas = _collect(
+        monkeypatch,
+        stamps=[(1, 1, 1), (1, 1, 2), (1, 2, 2)],
+        updates=[(_horas(4), T0 + timedelta(days=1))],
+        rounds=2,
+    )
+
+    assert [e.split("\n", 1)[0] for e in eventos[1:]] == ["event: recarregar", "event: recarregar"]
+    assert '"motivo":"gd_detalhada"' in eventos[1]
+    assert '"motivo":"horas"' in eventos[2]
+    assert len(chamadas) == 1
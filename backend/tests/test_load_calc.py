@@ -0,0 +1,142 @@
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from src.services.downsampling import downsample_frame, lttb_indices
+from src.services.load_calc import (
+    _build_audit_filter,
+    _build_batch_frame,
+    _build_capacity_by_distributor_query,
+    _build_distrib_filter,
+    compute_hidden_load,
+    corrigir_sol,
+)
+
+
+def _corrigir_sol_linha(hora: int, sol: float) -> float:
+    if 6 <= hora <= 18 and sol < 10:
+        return np.sin(np.pi * (hora - 6) / 12) * 800
+    return sol
+
+
+def test_corrigir_sol_matches_row_wise_rule():
+    horas = np.arange(24).repeat(2)
+    sol = np.tile([0.0, 450.0], 24)
+
+    esperado = [_corrigir_sol_linha(h, s) for h, s in zip(horas, sol)]
+
+    np.testing.assert_allclose(corrigir_sol(horas, sol), esperado)
+
+
+def test_compute_hidden_load_scales_capacity():
+    df = pd.DataFrame(
+        {
+            "hora": pd.date_range("2024-01-01 10:00", periods=3, freq="h"),
+            "carga_ons": [30000.0, 31000.0, 32000.0],
+            "sol_wm2": [500.0, 0.0, 1000.0],
+        }
+    )
+
+    out = compute_hidden_load(df, cap_solar_mw=1000.0)
+
+    assert list(out.columns[-3:]) == ["sol_wm2_final", "estimativa_solar_mw", "carga_real_estimada"]
+    assert out["estimativa_solar_mw"].iloc[0] == 1000.0 * 0.5 * 0.85
+    assert out["sol_wm2_final"].iloc[1] == np.sin(np.pi * 5 / 12) * 800
+    assert out["carga_real_estimada"].iloc[2] == 32000.0 + 850.0
+
+
+def test_downsample_frame_keeps_budget_and_extremes():
+    horas = pd.date_range("2024-01-01", periods=24 * 365, freq="h")
+    dia = horas.hour.to_numpy()
+    solar = np.clip(np.sin(np.pi * (dia - 6) / 12), 0, None) * 8000
+    carga = 40000 + 5000 * np.sin(np.arange(len(horas)) / 50.0)
+    carga[4000] = 60000.0
+    df = pd.DataFrame(
+        {
+            "hora": horas,
+            "carga_ons": carga - solar,
+            "estimativa_solar_mw": solar,
+            "carga_real_estimada": carga,
+        }
+    )
+
+    out = downsample_frame(
+        df, 500, x_col="hora", y_col="carga_ons", preservar=("carga_real_estimada", "estimativa_solar_mw")
+    )
+
+    assert len(out) <= 500
+    assert out["hora"].is_monotonic_increasing
+    assert out["carga_real_estimada"].max() == 60000.0
+    assert out["carga_ons"].min() == df["carga_ons"].min()
+    assert out["estimativa_solar_mw"].max() == df["estimativa_solar_mw"].max()
+    assert len(downsample_frame(df.head(100), 500, x_col="hora", y_col="carga_ons")) == 100
+
+
+def test_lttb_indices_keeps_endpoints_and_spike():
+    y = np.zeros(1000)
+    y[321] = 10.0
+
+    indices = lttb_indices(np.arange(1000), y, 50)
+
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert 321 in indices
+
+
+def test_distrib_filter_prefers_exact_id_and_resolves_names_on_the_dimension():
+    assert _build_distrib_filter("cemig", 7) == ("WHERE distribuidora_id = :dist_id", {"dist_id": 7})
+
+    clause, params = _build_distrib_filter("  cemig ")
+    assert clause.startswith("WHERE distribuidora_id IN (SELECT id FROM distribuidoras")
+    assert params == {"dist": "%cemig%"}
+
+    assert _build_distrib_filter("  ") == ("", {})
+
+
+def test_audit_filter_does_not_depend_on_the_id_column():
+    clause, params = _build_audit_filter(None, 7)
+    assert "distribuidora_id =" not in clause
+    assert "FROM distribuidoras WHERE id = :dist_id" in clause
+    assert params == {"dist_id": 7}
+
+    assert _build_audit_filter(" cemig ") == ("WHERE distribuidora ILIKE :dist", {"dist": "%cemig%"})
+    assert _build_audit_filter(None) == ("", {})
+
+
+def test_batch_frame_matches_single_distributor_computation():
+    Row = namedtuple("Row", ["id", "nome", "potencia_mw"])
+    df = pd.DataFrame(
+        {
+            "hora": pd.date_range("2024-01-01 05:00", periods=6, freq="h", tz="America/Sao_Paulo"),
+            "carga_ons": np.linspace(30000.0, 35000.0, 6),
+            "sol_wm2": [0.0, 0.0, 300.0, 0.0, 900.0, 50.0],
+        }
+    )
+    capacidades = [Row(1, "A", 1200.0), Row(2, "B", 450.5), Row(3, "C", None)]
+
+    out = _build_batch_frame(df, capacidades)
+
+    assert len(out) == 3 * 6
+    assert out["hora"].dt.tz is not None
+    for row in capacidades:
+        esperado = compute_hidden_load(df.copy(), row.potencia_mw or 3000.0)
+        lote = out[out["distribuidora_id"] == row.id].reset_index(drop=True)
+        np.testing.assert_array_equal(lote["estimativa_solar_mw"], esperado["estimativa_solar_mw"])
+        np.testing.assert_array_equal(lote["carga_real_estimada"], esperado["carga_real_estimada"])
+        assert (lote["hora"] == esperado["hora"]).all()
+
+
+def test_capacity_query_returns_every_requested_id():
+    query, params = _build_capacity_by_distributor_query(list(range(60)), 50)
+    assert "LIMIT" not in str(query)
+    assert params == {"ids": list(range(60))}
+
+    query, params = _build_capacity_by_distributor_query(None, 50)
+    assert "LIMIT :limite" in str(query)
+    assert params == {"limite": 50}
@@ -0,0 +1,49 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from src.core.responses import ARROW_MEDIA_TYPE, frame_response, frame_to_arrow
+
+FRAME = pd.DataFrame(
+    {
+        "hora": pd.date_range("2024-01-01 10:00", periods=3, freq="h", tz="UTC"),
+        "carga_ons": [30000.0, 31000.0, 32000.0],
+    }
+)
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/serie")
+    def serie(request: Request):
+        return frame_response(request, FRAME)
+
+    return TestClient(app)
+
+
+def test_frame_to_arrow_round_trips_types():
+    with pa.ipc.open_stream(io.BytesIO(frame_to_arrow(FRAME))) as reader:
+        decoded = reader.read_pandas()
+
+    pd.testing.assert_frame_equal(decoded, FRAME)
+    assert len(frame_to_arrow(pd.DataFrame())) > 0
+
+
+def test_frame_response_negotiates_on_accept():
+    client = _client()
+
+    arrow = client.get("/serie", headers={"Accept": ARROW_MEDIA_TYPE})
+    as_json = client.get("/serie")
+
+    assert arrow.headers["content-type"] == ARROW_MEDIA_TYPE
+    assert as_json.headers["content-type"] == "application/json"
+    assert as_json.json()[0] == {"hora": "2024-01-01T10:00:00+00:00", "carga_ons": 30000.0}
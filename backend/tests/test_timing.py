@@ -0,0 +1,78 @@
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from src.core.profiler import ProfilerMiddleware, profile_requested
+from src.core.timing import ServerTimingMiddleware, timed
+
+
+def _busy(seconds: float) -> None:
+    until = time.perf_counter() + seconds
+    while time.perf_counter() < until:
+        pass
+
+
+def _app(**profiler) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ServerTimingMiddleware)
+    if profiler:
+        app.add_middleware(ProfilerMiddleware, **profiler)
+
+    @app.get("/lento")
+    async def lento():
+        with timed("db"):
+            _busy(0.02)
+        with timed("compute"):
+            _busy(0.01)
+        return {"ok": True}
+
+    return app
+
+
+def _metrics(header: str) -> dict:
+    metrics = {}
+    for part in header.split(", "):
+        name, duration = part.split(";dur=")
+        metrics[name] = float(duration)
+    return metrics
+
+
+def test_server_timing_header_splits_request_time():
+    response = TestClient(_app()).get("/lento")
+
+    metrics = _metrics(response.headers["server-timing"])
+    assert set(metrics) == {"db", "compute", "total"}
+    assert metrics["db"] >= 20
+    assert metrics["total"] >= metrics["db"] + metrics["compute"]
+
+
+def test_timed_outside_a_request_is_a_no_op():
+    with timed("db"):
+        pass
+
+
+def test_profiler_writes_folded_stacks_only_with_the_token(tmp_path):
+    client = TestClient(_app(token="segredo", interval_ms=1, directory=tmp_path))
+
+    assert "x-profile-file" not in client.get("/lento", headers={"X-Profile": "errado"}).headers
+    response = client.get("/lento", params={"profile": "segredo"})
+
+    path = Path(response.headers["x-profile-file"])
+    assert path.parent == tmp_path
+    lines = path.read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+    assert any("_busy" in line for line in lines)
+
+
+def test_profile_requested_is_disabled_without_token():
+    scope = {"headers": [(b"x-profile", b"")], "query_string": b"profile="}
+
+    assert not profile_requested(scope, token="")
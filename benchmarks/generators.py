@@ -0,0 +1,130 @@
+"""Geradores de dados sinteticos nos formatos das fontes reais (ANEEL, ONS, Open-Meteo).
+
+Os CSVs grandes sao escritos em blocos de ``BLOCO_LINHAS`` para que gerar 10M
+linhas nao precise da tabela inteira em memoria. Mesma semente, mesmos dados.
+"""
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+BLOCO_LINHAS = 1_000_000
+SUBSISTEMAS_ONS = np.array(["SUDESTE/CENTRO-OESTE", "SUL", "NORDESTE", "NORTE"])
+COLUNAS_EXTRAS_GD = 20
+
+
+def _kw_br(valores: np.ndarray) -> np.ndarray:
+    """Formata numeros como no CSV da ANEEL: milhar com ponto e decimal com virgula."""
+    texto = pd.Series(valores).map("{:,.2f}".format)
+    return texto.str.replace(",", "_").str.replace(".", ",").str.replace("_", ".").to_numpy()
+
+
+def _escrever_em_blocos(
+    path: Path,
+    linhas: int,
+    seed: int,
+    gerar_bloco: Callable[[np.random.Generator, int, int], pd.DataFrame],
+    **to_csv,
+) -> Path:
+    rng = np.random.default_rng(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".partial")
+    for inicio in range(0, linhas, BLOCO_LINHAS):
+        tamanho = min(BLOCO_LINHAS, linhas - inicio)
+        bloco = gerar_bloco(rng, inicio, tamanho)
+        bloco.to_csv(tmp_path, mode="w" if inicio == 0 else "a", header=inicio == 0, index=False, **to_csv)
+    tmp_path.replace(path)
+    return path
+
+
+def _bloco_gd(rng: np.random.Generator, inicio: int, tamanho: int) -> pd.DataFrame:
+    agentes = np.array([f"Distribuidora {i:02d}" for i in range(60)])
+    classes = np.array(["Residencial", "Comercial", "Rural", "Industrial", "Poder Publico"])
+    ufs = np.array(["SP", "RJ", "MG", "RS", "PR", "BA", "PE", "CE", "GO", "PA"])
+    fontes = np.array(["Radiacao solar", "Eolica", "Hidraulica", "Biogas"])
+    df = pd.DataFrame(
+        {
+            "DatGeracaoConjuntoDados": "2024-01-01",
+            "NomAgente": agentes[rng.integers(0, len(agentes), tamanho)],
+            "SigUF": ufs[rng.integers(0, len(ufs), tamanho)],
+            "DscClasseConsumo": classes[rng.integers(0, len(classes), tamanho)],
+            "DscFonteGeracao": fontes[rng.choice(len(fontes), tamanho, p=[0.97, 0.01, 0.01, 0.01])],
+            "MdaPotenciaInstaladaKW": _kw_br(rng.uniform(1, 5000, tamanho)),
+        }
+    )
+    for index in range(COLUNAS_EXTRAS_GD):
+        df[f"Extra{index:02d}"] = rng.integers(0, 1_000_000, tamanho)
+    return df
+
+
+def _bloco_ons(rng: np.random.Generator, inicio: int, tamanho: int) -> pd.DataFrame:
+    posicao = np.arange(inicio, inicio + tamanho)
+    horas = pd.Timestamp("2000-01-01") + pd.to_timedelta(posicao // len(SUBSISTEMAS_ONS), unit="h")
+    carga = rng.uniform(5000, 45000, tamanho).round(3).astype(str)
+    return pd.DataFrame(
+        {
+            "id_subsistema": "SE",
+            "nom_subsistema": SUBSISTEMAS_ONS[posicao % len(SUBSISTEMAS_ONS)],
+            "din_instante": horas.strftime("%Y-%m-%d %H:%M:%S"),
+            "val_cargaenergiamwmed": np.char.replace(carga, ".", ","),
+        }
+    )
+
+
+def _bloco_siga(rng: np.random.Generator, inicio: int, tamanho: int) -> pd.DataFrame:
+    posicao = np.arange(inicio, inicio + tamanho)
+    latitude = rng.uniform(-33.0, 5.0, tamanho)
+    longitude = rng.uniform(-73.0, -35.0, tamanho)
+    # ~2% sem coordenada, como no arquivo real.
+    latitude[rng.random(tamanho) < 0.02] = np.nan
+    return pd.DataFrame(
+        {
+            "IdeNucleoCEG": [f"CEG{i}" for i in posicao],
+            "NomEmpreendimento": [f"Usina {i}" for i in posicao],
+            "SigTipoGeracao": np.array(["UFV", "EOL", "UHE", "UTE"])[rng.integers(0, 4, tamanho)],
+            "DscOrigemCombustivel": "Solar",
+            "MdaPotenciaOutorgadaKw": rng.uniform(10, 500_000, tamanho).round(2),
+            "NumCoordNEmpreendimento": latitude,
+            "NumCoordEEmpreendimento": longitude,
+        }
+    )
+
+
+def gerar_gd_csv(path: Path, linhas: int, seed: int = 42) -> Path:
+    return _escrever_em_blocos(path, linhas, seed, _bloco_gd, sep=";", encoding="latin-1")
+
+
+def gerar_ons_csv(path: Path, linhas: int, seed: int = 42) -> Path:
+    return _escrever_em_blocos(path, linhas, seed, _bloco_ons, sep=";")
+
+
+def gerar_siga_csv(path: Path, linhas: int, seed: int = 42) -> Path:
+    return _escrever_em_blocos(
+        path, linhas, seed, _bloco_siga, sep=";", decimal=",", encoding="ISO-8859-1"
+    )
+
+
+def gerar_weather_payload(linhas: int, seed: int = 42) -> Dict:
+    """Payload no formato do archive da Open-Meteo (listas em ``hourly``)."""
+    rng = np.random.default_rng(seed)
+    horas = pd.date_range("2000-01-01", periods=linhas, freq="h")
+    sol = np.clip(np.sin(np.pi * (horas.hour.to_numpy() - 6) / 12), 0, None) * 900
+    return {
+        "hourly": {
+            "time": horas.strftime("%Y-%m-%dT%H:%M").tolist(),
+            "shortwave_radiation": (sol * rng.uniform(0.6, 1.0, linhas)).round(1).tolist(),
+            "temperature_2m": rng.uniform(10, 35, linhas).round(1).tolist(),
+        }
+    }
+
+
+def gerar_linhas_serie_horaria(linhas: int, seed: int = 42) -> List[Tuple]:
+    """Linhas (hora, carga_ons, sol_wm2) como as devolvidas pela consulta a netload_horaria."""
+    rng = np.random.default_rng(seed)
+    horas = pd.date_range("2000-01-01", periods=linhas, freq="h")
+    hour = horas.hour.to_numpy()
+    sol = np.clip(np.sin(np.pi * (hour - 6) / 12), 0, None) * 900
+    sol[rng.random(linhas) < 0.1] = 0.0
+    carga = 35000 + 5000 * np.sin(np.pi * hour / 24) + rng.uniform(-500, 500, linhas)
+    return list(zip(horas.to_pydatetime(), carga.tolist(), sol.tolist()))
@@ -0,0 +1,216 @@
+"""Suite de benchmarks dos transforms do ETL e do calculo de carga oculta.
+
+Gera dados sinteticos (10k, 1M e 10M linhas por padrao), roda cada caso em um
+processo separado e mede linhas/s (melhor de N repeticoes, sem tracemalloc),
+pico de memoria alocada (tracemalloc, uma execucao a parte) e pico de RSS do
+processo. O resultado vai para um JSON com o commit atual, para comparar
+execucoes entre commits. Nao precisa de banco. Uso:
+
+    python benchmarks/run_suite.py [--tamanhos 10000 1000000] [--casos gd ons]
+    python benchmarks/run_suite.py --comparar benchmarks/resultados/<commit>.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+BENCH_DIR = ROOT / "benchmarks"
+for path in (ROOT / "etl_pipeline" / "src", ROOT / "backend", BENCH_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import generators
+
+TAMANHOS_PADRAO = [10_000, 1_000_000, 10_000_000]
+CAPACIDADE_MW = 15000.0
+
+
+def _logger() -> logging.Logger:
+    return logging.getLogger("bench.suite")
+
+
+def _caso_gd(path: Path, workers: int) -> Callable[[], int]:
+    from extractors.gd_client import iter_gd_chunks, transform_gd_chunks
+
+    return lambda: len(transform_gd_chunks(iter_gd_chunks(path), _logger()))
+
+
+def _caso_gd_paralelo(path: Path, workers: int) -> Callable[[], int]:
+    from extractors.gd_client import transform_gd_parallel
+
+    return lambda: len(transform_gd_parallel(path, _logger(), workers=workers))
+
+
+def _caso_ons(path: Path, workers: int) -> Callable[[], int]:
+    from extractors.ons_client import transform_carga_ons_csv
+
+    return lambda: len(transform_carga_ons_csv(path.read_bytes(), _logger()))
+
+
+def _caso_siga(path: Path, workers: int) -> Callable[[], int]:
+    from extractors.aneel_client import transform_siga_csv
+
+    return lambda: len(transform_siga_csv(path.read_bytes(), _logger()))
+
+
+def _caso_weather(linhas: int, workers: int) -> Callable[[], int]:
+    from extractors.inpe_weather_client import OFFSET_ANOS, transform_weather_payload
+
+    payload = generators.gerar_weather_payload(linhas)
+    return lambda: len(transform_weather_payload(payload, "SUDESTE", OFFSET_ANOS))
+
+
+def _caso_carga_oculta(linhas: int, workers: int) -> Callable[[], int]:
+    from src.services.load_calc import _build_hidden_load_dataframe, compute_hidden_load
+
+    result = generators.gerar_linhas_serie_horaria(linhas)
+    return lambda: len(compute_hidden_load(_build_hidden_load_dataframe(result), CAPACIDADE_MW))
+
+
+# nome -> (gerador do arquivo de entrada ou None para dados em memoria, preparo do caso)
+CASOS: Dict[str, Tuple[Optional[Callable[[Path, int], Path]], Callable]] = {
+    "gd": (generators.gerar_gd_csv, _caso_gd),
+    "gd_paralelo": (generators.gerar_gd_csv, _caso_gd_paralelo),
+    "ons": (generators.gerar_ons_csv, _caso_ons),
+    "siga": (generators.gerar_siga_csv, _caso_siga),
+    "weather": (None, _caso_weather),
+    "carga_oculta": (None, _caso_carga_oculta),
+}
+ARQUIVOS = {"gd": "gd", "gd_paralelo": "gd", "ons": "ons", "siga": "siga"}
+
+
+def preparar_entrada(caso: str, linhas: int, dados_dir: Path):
+    """Caminho do CSV sintetico (gerado uma vez e reaproveitado) ou o numero de linhas."""
+    gerador, _ = CASOS[caso]
+    if gerador is None:
+        return linhas
+    path = dados_dir / f"{ARQUIVOS[caso]}_{linhas}.csv"
+    if not path.exists():
+        gerador(path, linhas)
+    return path
+
+
+def executar_caso(caso: str, linhas: int, entrada, repeticoes: int, workers: int) -> Dict:
+    """Roda dentro do processo filho: tempo sem tracemalloc, depois uma execucao com tracemalloc."""
+    logging.disable(logging.INFO)
+    rodar = CASOS[caso][1](entrada, workers)
+
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        saida = rodar()
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    rodar()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    segundos = min(tempos)
+    return {
+        "caso": caso,
+        "linhas": linhas,
+        "linhas_saida": saida,
+        "repeticoes": repeticoes,
+        "segundos": round(segundos, 6),
+        "linhas_por_s": round(linhas / segundos, 1) if segundos else None,
+        "pico_tracemalloc_mb": round(pico / 1e6, 2),
+        # ru_maxrss vem em KB no Linux; inclui a geracao dos dados em memoria do caso.
+        "pico_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3, 2),
+    }
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def ambiente() -> Dict:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "alteracoes_locais": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def comparar(base: Dict, atual: Dict) -> List[str]:
+    """Linhas de texto com a razao de throughput e de pico de memoria (atual / base)."""
+    anteriores = {(r["caso"], r["linhas"]): r for r in base["resultados"]}
+    linhas = [
+        f"base {str(base.get('commit'))[:10]} -> atual {str(atual.get('commit'))[:10]}",
+        f"{'caso':>14} {'linhas':>10} {'linhas/s':>10} {'memoria':>10}",
+    ]
+    for resultado in atual["resultados"]:
+        anterior = anteriores.get((resultado["caso"], resultado["linhas"]))
+        if anterior is None:
+            continue
+        taxa = (resultado["linhas_por_s"] or 0) / (anterior["linhas_por_s"] or float("nan"))
+        memoria = resultado["pico_tracemalloc_mb"] / (anterior["pico_tracemalloc_mb"] or float("nan"))
+        linhas.append(f"{resultado['caso']:>14} {resultado['linhas']:>10} {taxa:>9.2f}x {memoria:>9.2f}x")
+    return linhas
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS_PADRAO)
+    parser.add_argument("--casos", nargs="+", choices=sorted(CASOS), default=list(CASOS))
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos do caso gd_paralelo")
+    parser.add_argument("--dados", type=Path, default=BENCH_DIR / ".dados", help="cache dos CSVs sinteticos")
+    parser.add_argument("--saida", type=Path, help="JSON de resultados (padrao: benchmarks/resultados/<commit>.json)")
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execucao anterior para comparar")
+    args = parser.parse_args(argv)
+
+    relatorio = {**ambiente(), "resultados": []}
+    print(f"{'caso':>14} {'linhas':>10} {'linhas/s':>14} {'pico (MB)':>10} {'RSS (MB)':>10}")
+    # spawn: cada caso comeca com um processo limpo, sem heranca de memoria do anterior.
+    contexto = get_context("spawn")
+    for linhas in args.tamanhos:
+        for caso in args.casos:
+            entrada = preparar_entrada(caso, linhas, args.dados)
+            with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+                resultado = pool.submit(
+                    executar_caso, caso, linhas, entrada, args.repeticoes, args.workers
+                ).result()
+            relatorio["resultados"].append(resultado)
+            print(
+                f"{caso:>14} {linhas:>10} {resultado['linhas_por_s']:>14,.0f} "
+                f"{resultado['pico_tracemalloc_mb']:>10.1f} {resultado['pico_rss_mb']:>10.1f}"
+            )
+
+    saida = args.saida or BENCH_DIR / "resultados" / f"{(relatorio['commit'] or 'sem-git')[:12]}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(relatorio, indent=2), encoding="utf-8")
+    print(f"Resultados em {saida}")
+
+    if args.comparar:
+        base = json.loads(args.comparar.read_text(encoding="utf-8"))
+        print("\n".join(comparar(base, relatorio)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark de carga: df.to_sql(method="multi") vs core.db.copy_dataframe (COPY).
+
+Cria tabelas temporarias no banco de DATABASE_URL com o schema de carga_ons e
+mede linhas/s de cada caminho. Uso:
+
+    DATABASE_URL=postgresql://... python benchmarks/bench_copy_loader.py [--linhas 100000 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from core import create_db_engine
+from core.db import copy_dataframe
+from extractors.contracts import ColumnSpec, DatasetSchema, ONS_CARGA_SCHEMA
+
+BENCH_TABLE = "bench_carga_ons"
+
+
+def gerar_carga(linhas: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    subsistemas = np.array(["SUDESTE/CENTRO-OESTE", "SUL", "NORDESTE", "NORTE"])
+    return pd.DataFrame(
+        {
+            "time": pd.Timestamp("2020-01-01") + pd.to_timedelta(np.arange(linhas), unit="min"),
+            "subsistema": subsistemas[rng.integers(0, len(subsistemas), linhas)],
+            "carga_mw": rng.uniform(5000, 45000, linhas),
+        }
+    )
+
+
+def _recriar_tabela(engine) -> None:
+    columns = ", ".join(f'"{c.name}" {c.dtype}' for c in ONS_CARGA_SCHEMA.columns)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+        conn.execute(text(f"CREATE UNLOGGED TABLE {BENCH_TABLE} ({columns})"))
+
+
+def carregar_to_sql(engine, df: pd.DataFrame) -> None:
+    df.to_sql(BENCH_TABLE, engine, if_exists="append", index=False, method="multi", chunksize=10000)
+
+
+def carregar_copy(engine, df: pd.DataFrame) -> None:
+    schema = DatasetSchema(
+        name=BENCH_TABLE,
+        table=BENCH_TABLE,
+        columns=[ColumnSpec(c.name, c.dtype, c.nullable) for c in ONS_CARGA_SCHEMA.columns],
+    )
+    with engine.begin() as conn:
+        copy_dataframe(conn, schema, df)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise SystemExit("DATABASE_URL nao configurada.")
+    engine = create_db_engine(db_url)
+
+    print(f"{'linhas':>10} {'to_sql (linhas/s)':>18} {'COPY (linhas/s)':>16} {'ganho':>8}")
+    try:
+        for linhas in args.linhas:
+            df = gerar_carga(linhas)
+            taxas = []
+            for carregar in (carregar_to_sql, carregar_copy):
+                _recriar_tabela(engine)
+                inicio = time.perf_counter()
+                carregar(engine, df)
+                taxas.append(linhas / (time.perf_counter() - inicio))
+            print(f"{linhas:>10} {taxas[0]:>18,.0f} {taxas[1]:>16,.0f} {taxas[1] / taxas[0]:>7.1f}x")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {BENCH_TABLE}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark da agregacao GD: transform_gd_chunks (legado) vs transform_gd_parallel.
+
+Gera um CSV sintetico no formato da ANEEL (com colunas extras, como o arquivo
+real) e mede linhas/s do caminho legado e do caminho por blocos com 1 e N
+processos. Nao precisa de banco. Uso:
+
+    python benchmarks/bench_gd_transform.py [--linhas 200000 2000000] [--workers 4]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.gd_client import iter_gd_chunks, transform_gd_chunks, transform_gd_parallel
+
+COLUNAS_EXTRAS = 20
+
+
+def _kw_br(valor: float) -> str:
+    return f"{valor:,.2f}".translate(str.maketrans(",.", ".,"))
+
+
+def gerar_csv(path: Path, linhas: int, seed: int = 42) -> Path:
+    rng = np.random.default_rng(seed)
+    agentes = np.array([f"Distribuidora {i:02d}" for i in range(60)])
+    classes = np.array(["Residencial", "Comercial", "Rural", "Industrial", "Poder Publico"])
+    ufs = np.array(["SP", "RJ", "MG", "RS", "PR", "BA", "PE", "CE", "GO", "PA"])
+    fontes = np.array(["Radiacao solar", "Eolica", "Hidraulica", "Biogas"])
+    kw = rng.uniform(1, 5000, linhas).round(2)
+
+    df = pd.DataFrame(
+        {
+            "DatGeracaoConjuntoDados": "2024-01-01",
+            "NomAgente": agentes[rng.integers(0, len(agentes), linhas)],
+            "SigUF": ufs[rng.integers(0, len(ufs), linhas)],
+            "DscClasseConsumo": classes[rng.integers(0, len(classes), linhas)],
+            "DscFonteGeracao": fontes[rng.choice(len(fontes), linhas, p=[0.97, 0.01, 0.01, 0.01])],
+            "MdaPotenciaInstaladaKW": pd.Series(kw).map(_kw_br),
+        }
+    )
+    for index in range(COLUNAS_EXTRAS):
+        df[f"Extra{index:02d}"] = rng.integers(0, 1_000_000, linhas).astype(str)
+    df.to_csv(path, sep=";", index=False, encoding="latin-1")
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[200_000, 1_000_000])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench.gd")
+    caminhos = [
+        ("legado", lambda path: transform_gd_chunks(iter_gd_chunks(path), logger)),
+        ("blocos x1", lambda path: transform_gd_parallel(path, logger, workers=1)),
+        (f"blocos x{args.workers}", lambda path: transform_gd_parallel(path, logger, workers=args.workers)),
+    ]
+
+    print(f"{'linhas':>10} " + " ".join(f"{nome + ' (linhas/s)':>22}" for nome, _ in caminhos) + f" {'ganho':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for linhas in args.linhas:
+            path = gerar_csv(Path(tmp) / f"gd_{linhas}.csv", linhas)
+            taxas = []
+            for _, transformar in caminhos:
+                inicio = time.perf_counter()
+                transformar(path)
+                taxas.append(linhas / (time.perf_counter() - inicio))
+            colunas = " ".join(f"{taxa:>22,.0f}" for taxa in taxas)
+            print(f"{linhas:>10} {colunas} {taxas[-1] / taxas[0]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
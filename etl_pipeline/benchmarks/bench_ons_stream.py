@@ -0,0 +1,76 @@
+"""Benchmark de memoria do parse ONS: transform_carga_ons_csv (arquivo inteiro) vs iter_carga_ons_csv.
+
+Gera CSVs sinteticos no formato do ONS e mede o pico de memoria alocada
+(tracemalloc) de cada caminho. O caminho por blocos deve ficar estavel com o
+tamanho do arquivo. Nao precisa de banco. Uso:
+
+    python benchmarks/bench_ons_stream.py [--linhas 100000 1000000]
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.ons_client import iter_carga_ons_csv, transform_carga_ons_csv
+
+
+def gerar_csv(path: Path, linhas: int, seed: int = 42) -> Path:
+    rng = np.random.default_rng(seed)
+    subsistemas = np.array(["SUDESTE/CENTRO-OESTE", "SUL", "NORDESTE", "NORTE"])
+    horas = np.arange(linhas) // len(subsistemas)
+    carga = rng.uniform(5000, 45000, linhas).round(3).astype(str)
+    df = pd.DataFrame(
+        {
+            "id_subsistema": "SE",
+            "nom_subsistema": subsistemas[np.arange(linhas) % len(subsistemas)],
+            "din_instante": (pd.Timestamp("2000-01-01") + pd.to_timedelta(horas, unit="h")).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "val_cargaenergiamwmed": np.char.replace(carga, ".", ","),
+        }
+    )
+    df.to_csv(path, sep=";", index=False)
+    return path
+
+
+def _inteiro(path: Path, logger) -> int:
+    return len(transform_carga_ons_csv(path.read_bytes(), logger))
+
+
+def _blocos(path: Path, logger) -> int:
+    return sum(len(chunk) for chunk in iter_carga_ons_csv(path, logger))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    logger = logging.getLogger("bench.ons")
+    print(f"{'linhas':>10} {'caminho':>8} {'pico (MB)':>10} {'tempo (s)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for linhas in args.linhas:
+            path = gerar_csv(Path(tmp) / f"ons_{linhas}.csv", linhas)
+            for nome, parse in (("inteiro", _inteiro), ("blocos", _blocos)):
+                tracemalloc.start()
+                inicio = time.perf_counter()
+                parse(path, logger)
+                duracao = time.perf_counter() - inicio
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{linhas:>10} {nome:>8} {pico / 1e6:>10.1f} {duracao:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
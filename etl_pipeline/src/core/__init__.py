@@ -1,18 +1,75 @@
-from .config import DatabaseSettings, HttpSettings, PathsSettings, Settings, load_settings
-from .db import create_db_engine, delete_all_rows, delete_time_window, make_upsert_method, table_exists
-from .http import create_session, request
+from .config import (
+    DatabaseSettings,
+    HttpSettings,
+    PathsSettings,
+    ProcessingSettings,
+    Settings,
+    load_settings,
+)
+from .db import (
+    begin,
+    bulk_load,
+    bump_data_version,
+    copy_dataframe,
+    create_db_engine,
+    delete_all_rows,
+    delete_time_window,
+    make_upsert_method,
+    merge_dataframe,
+    record_etl_run,
+    table_exists,
+)
+from .http import (
+    CachedDownload,
+    TokenBucket,
+    create_rate_limiter,
+    create_session,
+    download_cached,
+    mark_loaded,
+    request,
+)
+from .dimensions import (
+    ensure_distribuidoras_table,
+    link_auditoria_distribuidoras,
+    upsert_distribuidoras,
+)
+from .rollups import (
+    canonical_subsistema,
+    ensure_netload_hourly_table,
+    refresh_gd_summary,
+    refresh_netload_hourly,
+)
 
 __all__ = [
     "DatabaseSettings",
     "HttpSettings",
     "PathsSettings",
+    "ProcessingSettings",
     "Settings",
     "load_settings",
+    "begin",
+    "bulk_load",
+    "bump_data_version",
+    "copy_dataframe",
     "create_db_engine",
     "delete_all_rows",
     "delete_time_window",
     "make_upsert_method",
+    "merge_dataframe",
+    "record_etl_run",
     "table_exists",
+    "CachedDownload",
+    "TokenBucket",
+    "create_rate_limiter",
     "create_session",
+    "download_cached",
+    "mark_loaded",
     "request",
+    "ensure_distribuidoras_table",
+    "link_auditoria_distribuidoras",
+    "upsert_distribuidoras",
+    "canonical_subsistema",
+    "ensure_netload_hourly_table",
+    "refresh_gd_summary",
+    "refresh_netload_hourly",
 ]
\ No newline at end of file
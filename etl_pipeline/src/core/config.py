@@ -9,6 +9,9 @@ class HttpSettings:
     retries: int
     backoff_factor: float
     log_level: str
+    max_concurrency: int = 4
+    rate_limit_per_s: float = 0.0
+    rate_burst: int = 1
 
 
 @dataclass(frozen=True)
@@ -22,11 +25,17 @@ class PathsSettings:
     raw_dir: Path
 
 
+@dataclass(frozen=True)
+class ProcessingSettings:
+    workers: int
+
+
 @dataclass(frozen=True)
 class Settings:
     http: HttpSettings
     database: DatabaseSettings
     paths: PathsSettings
+    processing: ProcessingSettings = ProcessingSettings(workers=1)
 
 
 def _env_int(name: str, default: int) -> int:
@@ -47,7 +56,11 @@ def load_settings() -> Settings:
         retries=_env_int("ETL_HTTP_RETRIES", 3),
         backoff_factor=_env_float("ETL_HTTP_BACKOFF", 0.5),
         log_level=os.getenv("ETL_HTTP_LOG_LEVEL", "INFO"),
+        max_concurrency=_env_int("ETL_HTTP_MAX_CONCURRENCY", 4),
+        rate_limit_per_s=_env_float("ETL_HTTP_RATE_LIMIT", 5.0),
+        rate_burst=_env_int("ETL_HTTP_RATE_BURST", 5),
     )
     database = DatabaseSettings(url=os.getenv("DATABASE_URL", ""))
     paths = PathsSettings(data_dir=data_dir, raw_dir=raw_dir)
-    return Settings(http=http, database=database, paths=paths)
\ No newline at end of file
+    processing = ProcessingSettings(workers=_env_int("ETL_WORKERS", os.cpu_count() or 1))
+    return Settings(http=http, database=database, paths=paths, processing=processing)
\ No newline at end of file
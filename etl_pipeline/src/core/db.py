@@ -1,14 +1,36 @@
-from typing import Iterable, Mapping, Optional, Sequence
+import io
+import re
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Mapping, Optional, Sequence, Union
 
+import numpy as np
+import pandas as pd
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+
+COPY_CHUNK_ROWS = 100_000
+
+_GEOMETRY_SRID = re.compile(r"geometry\(\s*\w+\s*,\s*(\d+)\s*\)", re.IGNORECASE)
+
+FrameSource = Union[pd.DataFrame, Iterable[pd.DataFrame]]
+Bind = Union[Engine, Connection]
 
 
 def create_db_engine(db_url: str, *, echo: bool = False) -> Engine:
     return create_engine(db_url, echo=echo)
 
 
+@contextmanager
+def begin(bind: Bind) -> Iterator[Connection]:
+    """Abre uma transacao no engine ou reaproveita a da conexao recebida."""
+    if isinstance(bind, Connection):
+        yield bind
+        return
+    with bind.begin() as conn:
+        yield conn
+
+
 def table_exists(engine: Engine, table: str) -> bool:
     inspector = inspect(engine)
     return bool(inspector.has_table(table))
@@ -78,4 +100,210 @@ def make_upsert_method(
         result = conn.execute(upsert_stmt)
         return int(result.rowcount or 0)
 
-    return _upsert
\ No newline at end of file
+    return _upsert
+
+
+def copy_dataframe(
+    conn: Connection,
+    schema,
+    data: FrameSource,
+    *,
+    table: Optional[str] = None,
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> int:
+    """Envia um DataFrame (ou iterador de chunks) via COPY FROM STDIN em formato CSV.
+
+    ``schema`` e um ``contracts.DatasetSchema``: define a tabela, a ordem das colunas
+    e a conversao de cada uma (ex.: geometry vira EWKB hex com o SRID do tipo).
+    Roda na transacao de ``conn``; cada chunk passa por um buffer em memoria.
+    ``table`` permite apontar para outra tabela com as mesmas colunas (staging).
+    """
+    column_list = _column_list(schema)
+    statement = f"COPY {table or schema.table} ({column_list}) FROM STDIN WITH (FORMAT csv)"
+
+    total = 0
+    cursor = conn.connection.cursor()
+    try:
+        for frame in _iter_frames(data, chunk_rows):
+            if frame.empty:
+                continue
+            buffer = io.StringIO()
+            _to_copy_frame(frame, schema.columns).to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+            total += len(frame)
+    finally:
+        cursor.close()
+    return total
+
+
+def bulk_load(
+    bind: Bind,
+    schema,
+    data: FrameSource,
+    *,
+    replace: bool = False,
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> int:
+    """COPY em uma unica transacao; com ``replace`` a tabela e esvaziada antes."""
+    with begin(bind) as conn:
+        if replace:
+            conn.execute(text(f"DELETE FROM {schema.table}"))
+        return copy_dataframe(conn, schema, data, chunk_rows=chunk_rows)
+
+
+def merge_dataframe(
+    bind: Bind,
+    schema,
+    data: FrameSource,
+    *,
+    conflict_columns: Optional[Sequence[str]] = None,
+    chunk_rows: int = COPY_CHUNK_ROWS,
+) -> int:
+    """Upsert via staging: COPY numa tabela temporaria e um INSERT ... ON CONFLICT.
+
+    As colunas de conflito vem de ``schema.unique`` (contracts.py) salvo se
+    informadas. Linhas repetidas no staging sao reduzidas a uma por chave.
+    Retorna o numero de linhas enviadas ao staging.
+    """
+    conflict = tuple(conflict_columns or schema.unique or ())
+    if not conflict:
+        raise ValueError(f"{schema.table}: merge exige colunas unicas.")
+
+    # Qualificado com pg_temp: os DROPs nunca alcancam uma tabela comum de mesmo nome.
+    staging = f"pg_temp._stg_{schema.table}"
+    column_list = _column_list(schema)
+    conflict_list = ", ".join(f'"{name}"' for name in conflict)
+    updates = [column.name for column in schema.columns if column.name not in conflict]
+    if updates:
+        on_conflict = "DO UPDATE SET " + ", ".join(f'"{name}" = EXCLUDED."{name}"' for name in updates)
+    else:
+        on_conflict = "DO NOTHING"
+
+    with begin(bind) as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+        conn.execute(
+            text(f"CREATE TEMP TABLE {staging} (LIKE {schema.table} INCLUDING DEFAULTS) ON COMMIT DROP")
+        )
+        staged = copy_dataframe(conn, schema, data, table=staging, chunk_rows=chunk_rows)
+        if staged:
+            conn.execute(
+                text(
+                    f"""
+                INSERT INTO {schema.table} ({column_list})
+                SELECT DISTINCT ON ({conflict_list}) {column_list}
+                FROM {staging}
+                ORDER BY {conflict_list}
+                ON CONFLICT ({conflict_list}) {on_conflict}
+            """
+                )
+            )
+        conn.execute(text(f"DROP TABLE {staging}"))
+    return staged
+
+
+def _column_list(schema) -> str:
+    return ", ".join(f'"{column.name}"' for column in schema.columns)
+
+
+def _iter_frames(data: FrameSource, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    for frame in frames:
+        for start in range(0, len(frame), chunk_rows):
+            yield frame.iloc[start : start + chunk_rows]
+
+
+def _to_copy_frame(frame: pd.DataFrame, columns) -> pd.DataFrame:
+    missing = [column.name for column in columns if column.name not in frame.columns]
+    if missing:
+        raise ValueError(f"Colunas ausentes para COPY: {missing}")
+
+    out = pd.DataFrame(index=frame.index)
+    for column in columns:
+        values = frame[column.name]
+        dtype = column.dtype.lower()
+        if dtype.startswith("geometry"):
+            values = _geometry_to_ewkb(values, dtype)
+        elif dtype.startswith("timestamp"):
+            values = pd.to_datetime(values)
+        elif dtype in ("integer", "bigint", "smallint"):
+            values = pd.to_numeric(values, errors="coerce").astype("Int64")
+        elif dtype in ("double precision", "float", "real", "numeric"):
+            values = pd.to_numeric(values, errors="coerce")
+        out[column.name] = values
+    return out
+
+
+def _geometry_to_ewkb(values: pd.Series, dtype: str) -> pd.Series:
+    import shapely
+
+    match = _GEOMETRY_SRID.search(dtype)
+    geometries = np.asarray(values.values, dtype=object)
+    if match:
+        geometries = shapely.set_srid(geometries, int(match.group(1)))
+    encoded = shapely.to_wkb(geometries, hex=True, include_srid=bool(match))
+    return pd.Series(encoded, index=values.index)
+
+
+DATA_VERSION_TABLE = "etl_data_version"
+
+
+def bump_data_version(bind: Bind, dataset: str) -> None:
+    """Incrementa o carimbo de versao lido pelo cache de respostas da API."""
+    with begin(bind) as conn:
+        conn.execute(
+            text(
+                f"""
+            CREATE TABLE IF NOT EXISTS {DATA_VERSION_TABLE} (
+                dataset TEXT PRIMARY KEY,
+                versao BIGINT NOT NULL DEFAULT 1,
+                atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+        """
+            )
+        )
+        conn.execute(
+            text(
+                f"""
+            INSERT INTO {DATA_VERSION_TABLE} (dataset, versao, atualizado_em)
+            VALUES (:dataset, 1, now())
+            ON CONFLICT (dataset) DO UPDATE
+            SET versao = {DATA_VERSION_TABLE}.versao + 1, atualizado_em = now()
+        """
+            ),
+            {"dataset": dataset},
+        )
+
+
+ETL_RUNS_TABLE = "etl_runs"
+
+
+def record_etl_run(bind: Bind, row: Mapping[str, object]) -> None:
+    """Grava uma execucao de extrator (ver extractors.base.RunStats.as_row) no ledger etl_runs."""
+    with begin(bind) as conn:
+        conn.execute(
+            text(
+                f"""
+            CREATE TABLE IF NOT EXISTS {ETL_RUNS_TABLE} (
+                id BIGSERIAL PRIMARY KEY,
+                execucao TEXT,
+                extrator TEXT NOT NULL,
+                status TEXT NOT NULL,
+                inicio TIMESTAMPTZ NOT NULL,
+                fim TIMESTAMPTZ,
+                extract_s DOUBLE PRECISION,
+                transform_s DOUBLE PRECISION,
+                load_s DOUBLE PRECISION,
+                bytes_lidos BIGINT,
+                linhas_lidas BIGINT,
+                linhas_carregadas BIGINT,
+                pico_rss_processo_mb DOUBLE PRECISION,
+                erro TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_etl_runs_extrator_inicio ON {ETL_RUNS_TABLE} (extrator, inicio DESC);
+        """
+            )
+        )
+        columns = ", ".join(row)
+        values = ", ".join(f":{column}" for column in row)
+        conn.execute(text(f"INSERT INTO {ETL_RUNS_TABLE} ({columns}) VALUES ({values})"), dict(row))
\ No newline at end of file
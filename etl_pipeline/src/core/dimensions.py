@@ -0,0 +1,104 @@
+from typing import Dict, Iterable, List
+
+from sqlalchemy import text
+
+from .db import Bind, begin
+
+DISTRIBUIDORAS_TABLE = "distribuidoras"
+# Tabelas de fatos que referenciam a dimensao; auditoria_visual vem do notebook e pode nao existir.
+DISTRIBUIDORA_ID_TABLES = ("gd_detalhada", "auditoria_visual")
+
+
+def ensure_distribuidoras_table(bind: Bind) -> None:
+    """Cria a dimensao e, se faltarem, as colunas distribuidora_id (indices ficam no schema.sql).
+
+    ALTER TABLE pede lock ACCESS EXCLUSIVE mesmo quando a coluna ja existe, entao o
+    DDL so roda se information_schema mostrar a coluna ausente. Chame com o engine,
+    fora da transacao da carga, para um eventual lock durar so o DDL.
+    """
+    with begin(bind) as conn:
+        conn.execute(
+            text(
+                f"""
+            CREATE TABLE IF NOT EXISTS {DISTRIBUIDORAS_TABLE} (
+                id SERIAL PRIMARY KEY,
+                nome TEXT NOT NULL UNIQUE
+            );
+        """
+            )
+        )
+        for table in _missing_distribuidora_id(conn, DISTRIBUIDORA_ID_TABLES):
+            conn.execute(
+                text(
+                    f"ALTER TABLE {table} "
+                    f"ADD COLUMN IF NOT EXISTS distribuidora_id INTEGER REFERENCES {DISTRIBUIDORAS_TABLE} (id)"
+                )
+            )
+
+
+def upsert_distribuidoras(bind: Bind, nomes: Iterable[str]) -> Dict[str, int]:
+    """Garante uma linha por nome (ja em maiusculas) e devolve nome -> id."""
+    nomes = sorted({str(nome) for nome in nomes if nome})
+    if not nomes:
+        return {}
+    with begin(bind) as conn:
+        conn.execute(
+            text(
+                f"""
+            INSERT INTO {DISTRIBUIDORAS_TABLE} (nome)
+            SELECT UNNEST(CAST(:nomes AS TEXT[]))
+            ON CONFLICT (nome) DO NOTHING
+        """
+            ),
+            {"nomes": nomes},
+        )
+        rows = conn.execute(
+            text(f"SELECT id, nome FROM {DISTRIBUIDORAS_TABLE} WHERE nome = ANY(:nomes)"),
+            {"nomes": nomes},
+        ).fetchall()
+    return {row.nome: int(row.id) for row in rows}
+
+
+def link_auditoria_distribuidoras(bind: Bind) -> int:
+    """Preenche auditoria_visual.distribuidora_id pelo nome; sem a tabela ou sem a coluna nao faz nada."""
+    with begin(bind) as conn:
+        # O notebook reescreve a tabela com to_sql(replace), que descarta a coluna.
+        if not _table_exists(conn, "auditoria_visual") or _missing_distribuidora_id(conn, ("auditoria_visual",)):
+            return 0
+        result = conn.execute(
+            text(
+                f"""
+            UPDATE auditoria_visual a SET distribuidora_id = d.id
+            FROM {DISTRIBUIDORAS_TABLE} d
+            WHERE d.nome = UPPER(TRIM(a.distribuidora))
+              AND a.distribuidora_id IS DISTINCT FROM d.id
+        """
+            )
+        )
+    return int(result.rowcount or 0)
+
+
+def _table_exists(conn, table: str) -> bool:
+    return conn.execute(text("SELECT to_regclass(:table)"), {"table": table}).scalar() is not None
+
+
+def _missing_distribuidora_id(conn, tables: Iterable[str]) -> List[str]:
+    """Tabelas existentes, entre ``tables``, ainda sem a coluna distribuidora_id."""
+    rows = conn.execute(
+        text(
+            """
+        SELECT t.nome
+        FROM UNNEST(CAST(:tables AS TEXT[])) AS t(nome)
+        WHERE to_regclass(t.nome) IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM information_schema.columns c
+              WHERE c.table_schema = current_schema()
+                AND c.table_name = t.nome
+                AND c.column_name = 'distribuidora_id'
+          )
+        ORDER BY t.nome
+    """
+        ),
+        {"tables": list(tables)},
+    ).fetchall()
+    return [row.nome for row in rows]
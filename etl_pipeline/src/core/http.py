@@ -1,5 +1,11 @@
+import hashlib
+import json
 import logging
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
 
 import requests
 from requests.adapters import HTTPAdapter
@@ -8,6 +14,48 @@ from urllib3.util.retry import Retry
 from .config import HttpSettings
 
 
+class TokenBucket:
+    """Limitador de taxa thread-safe: ``rate_per_s`` fichas/s, ate ``capacity`` acumuladas."""
+
+    def __init__(
+        self,
+        rate_per_s: float,
+        capacity: int = 1,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate_per_s = rate_per_s
+        self.capacity = max(1, capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.capacity)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Bloqueia ate haver uma ficha; devolve o tempo esperado em segundos."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                elapsed = now - self._updated_at
+                self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_s)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate_per_s
+            self._sleep(delay)
+            waited += delay
+
+
+def create_rate_limiter(settings: HttpSettings) -> Optional[TokenBucket]:
+    if settings.rate_limit_per_s <= 0:
+        return None
+    return TokenBucket(settings.rate_limit_per_s, settings.rate_burst)
+
+
 def create_session(settings: HttpSettings, logger: Optional[logging.Logger] = None) -> requests.Session:
     session = requests.Session()
     retry = Retry(
@@ -17,7 +65,8 @@ def create_session(settings: HttpSettings, logger: Optional[logging.Logger] = No
         allowed_methods=("GET", "POST", "PUT", "DELETE", "PATCH"),
         raise_on_status=False,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    pool_size = max(10, settings.max_concurrency)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     if logger is not None:
@@ -32,13 +81,133 @@ def request(
     *,
     settings: Optional[HttpSettings] = None,
     logger: Optional[logging.Logger] = None,
+    rate_limiter: Optional[TokenBucket] = None,
     **kwargs,
 ) -> requests.Response:
     if settings is not None and "timeout" not in kwargs:
         kwargs["timeout"] = settings.timeout_s
+    if rate_limiter is not None:
+        waited = rate_limiter.acquire()
+        if logger and waited:
+            logger.info("Limite de taxa: aguardou %.2fs para %s", waited, url)
     if logger:
         logger.info("Requisicao HTTP %s %s", method.upper(), url)
     response = session.request(method, url, **kwargs)
     if logger:
         logger.info("Resposta HTTP %s %s -> %s", method.upper(), url, response.status_code)
-    return response
\ No newline at end of file
+    return response
+
+
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CachedDownload:
+    path: Path
+    sha256: str
+    changed: bool
+    not_modified: bool = False
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_name(path.name + ".meta.json")
+
+
+def _read_meta(path: Path) -> Dict:
+    meta_path = _meta_path(path)
+    if not path.exists() or not meta_path.exists():
+        return {}
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_meta(path: Path, meta: Dict) -> None:
+    meta_path = _meta_path(path)
+    tmp_path = meta_path.with_suffix(".partial")
+    tmp_path.write_text(json.dumps(meta, indent=2, sort_keys=True), encoding="utf-8")
+    tmp_path.replace(meta_path)
+
+
+def download_cached(
+    session: requests.Session,
+    url: str,
+    path: Path,
+    *,
+    settings: Optional[HttpSettings] = None,
+    logger: Optional[logging.Logger] = None,
+    rate_limiter: Optional[TokenBucket] = None,
+    force: bool = False,
+) -> CachedDownload:
+    """Baixa ``url`` para ``path`` com GET condicional (ETag/Last-Modified).
+
+    Ao lado do arquivo fica ``<nome>.meta.json`` com os validadores, o sha256 do
+    conteudo e o sha256 da ultima versao carregada no banco (``mark_loaded``).
+    ``changed`` so e verdadeiro quando o conteudo ainda nao foi carregado, entao
+    uma carga que falhou e refeita na execucao seguinte mesmo com 304.
+    ``force`` ignora os validadores e baixa o arquivo de novo.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    meta = {} if force else _read_meta(path)
+    headers = {}
+    if meta.get("url") == url:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = request(
+        session,
+        "GET",
+        url,
+        settings=settings,
+        logger=logger,
+        rate_limiter=rate_limiter,
+        headers=headers,
+        stream=True,
+    )
+    if response.status_code == 304 and meta.get("sha256"):
+        response.close()
+        if logger:
+            logger.info("Fonte inalterada (304): %s", path)
+        sha256 = meta["sha256"]
+        return CachedDownload(path, sha256, changed=meta.get("loaded_sha256") != sha256, not_modified=True)
+    response.raise_for_status()
+
+    digest = hashlib.sha256()
+    size = 0
+    tmp_path = path.with_suffix(path.suffix + ".partial")
+    with open(tmp_path, "wb") as handle:
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+            if chunk:
+                digest.update(chunk)
+                size += len(chunk)
+                handle.write(chunk)
+    tmp_path.replace(path)
+
+    sha256 = digest.hexdigest()
+    _write_meta(
+        path,
+        {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": sha256,
+            "size": size,
+            "downloaded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "loaded_sha256": meta.get("loaded_sha256"),
+        },
+    )
+    if logger:
+        logger.info("Download concluido: %s (%s bytes, sha256 %s)", path, size, sha256[:12])
+    return CachedDownload(path, sha256, changed=meta.get("loaded_sha256") != sha256)
+
+
+def mark_loaded(download: CachedDownload) -> None:
+    """Registra que o conteudo de ``download`` foi carregado com sucesso."""
+    meta = _read_meta(download.path)
+    if meta.get("sha256") != download.sha256:
+        return
+    meta["loaded_sha256"] = download.sha256
+    _write_meta(download.path, meta)
@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import text
+
+from .db import Bind, begin
+
+NETLOAD_HOURLY_TABLE = "netload_horaria"
+
+_SUBSISTEMA_CANONICO_SQL = (
+    "CASE WHEN UPPER(subsistema) LIKE '%SUDESTE%' THEN 'SUDESTE' ELSE UPPER(subsistema) END"
+)
+
+
+def canonical_subsistema(nome: str) -> str:
+    """Mapeia nomes do ONS (ex.: SUDESTE/CENTRO-OESTE) para a chave usada em clima_real."""
+    nome_upper = str(nome).strip().upper()
+    return "SUDESTE" if "SUDESTE" in nome_upper else nome_upper
+
+
+def hourly_bounds(start, end) -> Tuple[datetime, datetime]:
+    """Expande [start, end] para horas cheias, com fim exclusivo."""
+    start_hour = pd.Timestamp(start).floor("h")
+    end_hour = pd.Timestamp(end).floor("h") + timedelta(hours=1)
+    return start_hour.to_pydatetime(), end_hour.to_pydatetime()
+
+
+def ensure_netload_hourly_table(bind: Bind) -> None:
+    """Cria netload_horaria e, so se faltar, a coluna atualizado_em com seu indice.
+
+    ALTER TABLE pede lock ACCESS EXCLUSIVE mesmo com ADD COLUMN IF NOT EXISTS: o DDL
+    so roda quando information_schema mostra a coluna ausente. Chame com o engine,
+    antes da transacao da carga (refresh_netload_hourly nao cria nada).
+    """
+    with begin(bind) as conn:
+        conn.execute(
+            text(
+                f"""
+            CREATE TABLE IF NOT EXISTS {NETLOAD_HOURLY_TABLE} (
+                hora TIMESTAMPTZ NOT NULL,
+                subsistema TEXT NOT NULL,
+                carga_mw DOUBLE PRECISION,
+                irradiancia_wm2 DOUBLE PRECISION,
+                amostras_carga INTEGER,
+                atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now(),
+                PRIMARY KEY (subsistema, hora)
+            );
+        """
+            )
+        )
+        has_column = conn.execute(
+            text(
+                """
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :table AND column_name = 'atualizado_em'
+        """
+            ),
+            {"table": NETLOAD_HOURLY_TABLE},
+        ).scalar()
+        if has_column:
+            return
+        conn.execute(
+            text(
+                f"ALTER TABLE {NETLOAD_HOURLY_TABLE} "
+                "ADD COLUMN IF NOT EXISTS atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now()"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS idx_netload_horaria_atualizado "
+                f"ON {NETLOAD_HOURLY_TABLE} (subsistema, atualizado_em)"
+            )
+        )
+
+
+def refresh_netload_hourly(
+    bind: Bind,
+    start,
+    end,
+    *,
+    subsistemas: Optional[Iterable[str]] = None,
+) -> int:
+    """Recalcula o agregado horario carga_ons x clima_real apenas no intervalo afetado.
+
+    As linhas sao gravadas em ordem de chave para que cargas concorrentes (ONS e
+    clima no runner) travem as mesmas linhas na mesma ordem, sem deadlock.
+    ``atualizado_em`` recebe o relogio da instrucao (``clock_timestamp()``, nao o
+    inicio da transacao): o stream da API usa a coluna como cursor. A tabela deve
+    existir (schema.sql ou ``ensure_netload_hourly_table`` fora da transacao).
+    """
+    start_hour, end_hour = hourly_bounds(start, end)
+    params = {"start": start_hour, "end": end_hour}
+
+    filter_clause = ""
+    if subsistemas is not None:
+        params["subsistemas"] = sorted({canonical_subsistema(s) for s in subsistemas})
+        filter_clause = "WHERE c.subsistema = ANY(:subsistemas)"
+
+    query = f"""
+        INSERT INTO {NETLOAD_HOURLY_TABLE} (
+            hora, subsistema, carga_mw, irradiancia_wm2, amostras_carga, atualizado_em
+        )
+        SELECT c.hora, c.subsistema, c.carga_mw, cl.irradiancia_wm2, c.amostras, clock_timestamp()
+        FROM (
+            SELECT
+                date_trunc('hour', time) AS hora,
+                {_SUBSISTEMA_CANONICO_SQL} AS subsistema,
+                AVG(carga_mw) AS carga_mw,
+                COUNT(*) AS amostras
+            FROM carga_ons
+            WHERE time >= :start AND time < :end
+            GROUP BY 1, 2
+        ) c
+        LEFT JOIN (
+            SELECT date_trunc('hour', time) AS hora, subsistema, AVG(irradiancia_wm2) AS irradiancia_wm2
+            FROM clima_real
+            WHERE time >= :start AND time < :end
+            GROUP BY 1, 2
+        ) cl ON cl.hora = c.hora AND cl.subsistema = c.subsistema
+        {filter_clause}
+        ORDER BY c.subsistema, c.hora
+        ON CONFLICT (subsistema, hora) DO UPDATE SET
+            carga_mw = EXCLUDED.carga_mw,
+            irradiancia_wm2 = EXCLUDED.irradiancia_wm2,
+            amostras_carga = EXCLUDED.amostras_carga,
+            atualizado_em = EXCLUDED.atualizado_em
+    """
+    with begin(bind) as conn:
+        result = conn.execute(text(query), params)
+    return int(result.rowcount or 0)
+
+
+GD_SUMMARY_TABLE = "gd_resumo"
+
+# GROUPING(distribuidora_id, classe, sigla_uf): bit 1 = coluna agregada.
+_GD_SUMMARY_NIVEL_SQL = """
+    CASE GROUPING(distribuidora_id, classe, sigla_uf)
+        WHEN 7 THEN 'total'
+        WHEN 3 THEN 'distribuidora'
+        WHEN 5 THEN 'classe'
+        WHEN 6 THEN 'uf'
+        WHEN 1 THEN 'distribuidora_classe'
+    END
+"""
+
+
+def ensure_gd_summary_table(bind: Bind) -> None:
+    with begin(bind) as conn:
+        conn.execute(
+            text(
+                f"""
+            CREATE TABLE IF NOT EXISTS {GD_SUMMARY_TABLE} (
+                nivel TEXT NOT NULL,
+                distribuidora_id INTEGER,
+                classe TEXT,
+                sigla_uf TEXT,
+                potencia_mw DOUBLE PRECISION NOT NULL
+            );
+        """
+            )
+        )
+
+
+def refresh_gd_summary(bind: Bind) -> int:
+    """Reescreve os totais de gd_detalhada (geral, por distribuidora, classe, UF e distribuidora x classe).
+
+    Chamado na mesma transacao da carga de gd_detalhada: quem le o resumo nunca
+    ve totais de uma carga diferente da do detalhe. Com gd_detalhada vazia o resumo
+    fica vazio (o total do grouping set vazio seria NULL).
+    """
+    ensure_gd_summary_table(bind)
+    query = f"""
+        INSERT INTO {GD_SUMMARY_TABLE} (nivel, distribuidora_id, classe, sigla_uf, potencia_mw)
+        SELECT {_GD_SUMMARY_NIVEL_SQL}, distribuidora_id, classe, sigla_uf, SUM(potencia_mw)
+        FROM gd_detalhada
+        GROUP BY GROUPING SETS ((), (distribuidora_id), (classe), (sigla_uf), (distribuidora_id, classe))
+        HAVING COUNT(*) > 0
+    """
+    with begin(bind) as conn:
+        conn.execute(text(f"DELETE FROM {GD_SUMMARY_TABLE}"))
+        result = conn.execute(text(query))
+    return int(result.rowcount or 0)
@@ -2,6 +2,7 @@ import io
 import logging
 import sys
 from pathlib import Path
+from typing import Optional, Tuple
 
 import geopandas as gpd
 import pandas as pd
@@ -12,13 +13,18 @@ if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
 from core import (
+    CachedDownload,
+    bulk_load,
+    bump_data_version,
     create_db_engine,
     create_session,
-    delete_all_rows,
+    download_cached,
     load_settings,
-    request,
+    mark_loaded,
     table_exists,
 )
+from extractors.base import Extractor, count_csv_rows
+from extractors.contracts import ANEEL_SIGA_SCHEMA
 
 SIGA_URL = (
     "https://dadosabertos.aneel.gov.br/dataset/siga-sistema-de-informacoes-de-geracao-da-aneel/"
@@ -26,10 +32,9 @@ SIGA_URL = (
 )
 
 
-def extract_siga_csv(session, settings, logger: logging.Logger) -> bytes:
-    response = request(session, "GET", SIGA_URL, settings=settings.http, logger=logger)
-    response.raise_for_status()
-    return response.content
+def extract_siga_csv(session, settings, logger: logging.Logger, *, force: bool = False) -> CachedDownload:
+    path = settings.paths.raw_dir / "siga_empreendimentos.csv"
+    return download_cached(session, SIGA_URL, path, settings=settings.http, logger=logger, force=force)
 
 
 def transform_siga_csv(content: bytes, logger: logging.Logger) -> gpd.GeoDataFrame:
@@ -61,7 +66,10 @@ def transform_siga_csv(content: bytes, logger: logging.Logger) -> gpd.GeoDataFra
     return gdf
 
 
-def _has_registered_srid(engine, table: str, column: str = "geometry", schema: str = "public") -> bool:
+GEOM_COLUMN = "geom"
+
+
+def _has_registered_srid(engine, table: str, column: str = GEOM_COLUMN, schema: str = "public") -> bool:
     try:
         with engine.begin() as conn:
             result = conn.execute(
@@ -73,23 +81,64 @@ def _has_registered_srid(engine, table: str, column: str = "geometry", schema: s
         return False
 
 
+def create_spatial_index_if_not_exists(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"CREATE INDEX IF NOT EXISTS usinas_siga_geom_gist ON usinas_siga USING GIST ({GEOM_COLUMN})")
+        )
+
+
 def load_siga_data(gdf: gpd.GeoDataFrame, engine, logger: logging.Logger) -> int:
     if gdf.empty:
         logger.info("Sem linhas para carregar.")
         return 0
 
+    # A API e o schema.sql leem a coluna "geom"; tabelas antigas com "geometry" sao recriadas.
+    gdf = gdf.rename_geometry(GEOM_COLUMN)
     if not table_exists(engine, "usinas_siga") or not _has_registered_srid(engine, "usinas_siga"):
-        gdf.to_postgis("usinas_siga", engine, if_exists="replace", index=False)
+        # to_postgis so cria a tabela com o tipo geometry; a carga em si vai por COPY.
+        gdf.head(1).to_postgis("usinas_siga", engine, if_exists="replace", index=False)
         logger.info("Tabela usinas_siga criada/recriada com metadata PostGIS.")
-    else:
-        delete_all_rows(engine, "usinas_siga")
-        gdf.to_postgis("usinas_siga", engine, if_exists="append", index=False)
+    create_spatial_index_if_not_exists(engine)
+
+    bulk_load(engine, ANEEL_SIGA_SCHEMA, gdf, replace=True)
+    bump_data_version(engine, "usinas_siga")
 
     logger.info("Carregadas %s linhas em usinas_siga.", len(gdf))
     return int(len(gdf))
 
 
-def run_extraction(session=None, engine=None, settings=None, logger=None) -> int:
+class AneelSigaExtractor(Extractor):
+    name = "aneel"
+
+    def __init__(self, session, engine, settings, logger: logging.Logger, *, force: bool = False):
+        self.session = session
+        self.engine = engine
+        self.settings = settings
+        self.logger = logger
+        self.force = force
+
+    def extract(self) -> Optional[CachedDownload]:
+        self.logger.info("Iniciando extracao ANEEL SIGA.")
+        download = extract_siga_csv(self.session, self.settings, self.logger, force=self.force)
+        if not download.changed:
+            self.logger.info("CSV do SIGA inalterado desde a ultima carga; nada a fazer.")
+            return None
+        self.record(bytes_in=download.path.stat().st_size)
+        return download
+
+    def transform(self, raw: CachedDownload) -> Tuple[CachedDownload, gpd.GeoDataFrame]:
+        self.record(rows_in=count_csv_rows(raw.path))
+        return raw, transform_siga_csv(raw.path.read_bytes(), self.logger)
+
+    def load(self, data: Tuple[CachedDownload, gpd.GeoDataFrame]) -> int:
+        download, gdf = data
+        loaded = load_siga_data(gdf, self.engine, self.logger)
+        mark_loaded(download)
+        return loaded
+
+
+def run_extraction(session=None, engine=None, settings=None, logger=None, force: bool = False) -> int:
     logger = logger or logging.getLogger("etl.aneel")
     if settings is None:
         settings = load_settings()
@@ -100,10 +149,7 @@ def run_extraction(session=None, engine=None, settings=None, logger=None) -> int
     engine = engine or create_db_engine(settings.database.url)
     session = session or create_session(settings.http, logger=logger)
 
-    logger.info("Iniciando extracao ANEEL SIGA.")
-    content = extract_siga_csv(session, settings, logger)
-    gdf = transform_siga_csv(content, logger)
-    return load_siga_data(gdf, engine, logger)
+    return AneelSigaExtractor(session, engine, settings, logger, force=force).run()
 
 
 def main() -> None:
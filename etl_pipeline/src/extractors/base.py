@@ -1,15 +1,110 @@
+import logging
+import resource
+import sys
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from core import record_etl_run
+
+STAGES = ("extract", "transform", "load")
+
+
+@dataclass
+class RunStats:
+    """Uma execucao de um extrator: tempo por etapa, volumes e pico de memoria.
+
+    Etapas preguicosas (iteradores de blocos) tem o custo do transform contado
+    no load, onde os blocos sao consumidos. ``process_peak_rss_mb`` e o pico de
+    RSS do processo (e dos filhos ja encerrados) ate o fim da execucao, nao deste
+    extrator: no runner as tarefas dividem o processo e o pico pode ser de outra.
+    """
+
+    extractor: str
+    run_id: Optional[str] = None
+    status: str = "running"
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: Optional[datetime] = None
+    seconds: Dict[str, float] = field(default_factory=dict)
+    bytes_in: Optional[int] = None
+    rows_in: Optional[int] = None
+    rows_out: int = 0
+    process_peak_rss_mb: Optional[float] = None
+    error: Optional[str] = None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - started
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.now(timezone.utc)
+        self.process_peak_rss_mb = _process_peak_rss_mb()
+
+    def as_row(self) -> Dict[str, Any]:
+        """Linha da tabela etl_runs."""
+        return {
+            "execucao": self.run_id,
+            "extrator": self.extractor,
+            "status": self.status,
+            "inicio": self.started_at,
+            "fim": self.finished_at,
+            **{f"{stage}_s": self.seconds.get(stage) for stage in STAGES},
+            "bytes_lidos": self.bytes_in,
+            "linhas_lidas": self.rows_in,
+            "linhas_carregadas": self.rows_out,
+            "pico_rss_processo_mb": self.process_peak_rss_mb,
+            "erro": self.error,
+        }
+
+
+def _process_peak_rss_mb() -> float:
+    # ru_maxrss vem em KB no Linux.
+    peak_kb = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return round(peak_kb / 1024, 1)
+
+
+def count_csv_rows(path: Path, block_bytes: int = 8 * 1024 * 1024) -> int:
+    """Linhas de dados do CSV (quebras de linha menos o cabecalho), lendo em blocos."""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as handle:
+        while True:
+            block = handle.read(block_bytes)
+            if not block:
+                break
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
 
 
 class Extractor(ABC):
     """Base contract for extractor pipelines."""
 
     name: str
+    stats: Optional[RunStats] = None
 
     @abstractmethod
     def extract(self) -> Any:
-        """Fetch raw data from the source."""
+        """Fetch raw data from the source. None means nothing new to load."""
 
     @abstractmethod
     def transform(self, raw: Any) -> Any:
@@ -19,7 +114,42 @@ class Extractor(ABC):
     def load(self, data: Any) -> int:
         """Persist normalized data. Returns row count."""
 
-    def run(self) -> int:
-        raw = self.extract()
-        data = self.transform(raw)
-        return self.load(data)
\ No newline at end of file
+    def record(self, **counters: int) -> None:
+        """Soma contadores (bytes_in, rows_in) na execucao corrente; fora de run() nao faz nada."""
+        if self.stats is None:
+            return
+        for key, value in counters.items():
+            setattr(self.stats, key, (getattr(self.stats, key) or 0) + int(value))
+
+    def run(self, run_id: Optional[str] = None) -> int:
+        """Executa extract -> transform -> load e grava a execucao em etl_runs (se houver engine)."""
+        self.stats = stats = RunStats(self.name, run_id=run_id)
+        try:
+            with stats.stage("extract"):
+                raw = self.extract()
+            if raw is None:
+                stats.finish("unchanged")
+                return 0
+            with stats.stage("transform"):
+                data = self.transform(raw)
+            with stats.stage("load"):
+                stats.rows_out = int(self.load(data) or 0)
+        except Exception as exc:
+            stats.finish("failed", error=str(exc))
+            raise
+        else:
+            stats.finish("ok")
+        finally:
+            self._save_stats()
+        return stats.rows_out
+
+    def _save_stats(self) -> None:
+        engine = getattr(self, "engine", None)
+        if engine is None:
+            return
+        try:
+            record_etl_run(engine, self.stats.as_row())
+        except Exception as exc:
+            # O ledger e diagnostico: falhar ao grava-lo nao derruba a carga.
+            logger = getattr(self, "logger", None) or logging.getLogger("etl")
+            logger.warning("Nao foi possivel registrar a execucao em etl_runs: %s", exc)
\ No newline at end of file
@@ -41,7 +41,7 @@ ANEEL_SIGA_SCHEMA = DatasetSchema(
         ColumnSpec("latitude", "double precision", nullable=False),
         ColumnSpec("longitude", "double precision", nullable=False),
         ColumnSpec(
-            "geometry",
+            "geom",
             "geometry(Point,4326)",
             nullable=False,
             description="Derived from latitude/longitude in EPSG:4326.",
@@ -59,6 +59,12 @@ GD_SCHEMA = DatasetSchema(
         ColumnSpec("sigla_uf", "text", nullable=False),
         ColumnSpec("fonte", "text", nullable=False),
         ColumnSpec("potencia_mw", "double precision", nullable=False),
+        ColumnSpec(
+            "distribuidora_id",
+            "integer",
+            nullable=False,
+            description="FK to distribuidoras.id, resolved from the upper-cased NomAgente.",
+        ),
     ],
     notes="Aggregated by distribuidora/classe/uf with solar filter only.",
 )
@@ -84,6 +90,7 @@ ONS_CARGA_SCHEMA = DatasetSchema(
         ColumnSpec("subsistema", "text", nullable=False),
         ColumnSpec("carga_mw", "double precision", nullable=False),
     ],
+    unique=("time", "subsistema"),
 )
 
 EXTRACTOR_CONTRACTS = [
@@ -93,9 +100,13 @@ EXTRACTOR_CONTRACTS = [
         source="https://dadosabertos.aneel.gov.br/dataset/siga-sistema-de-informacoes-de-geracao-da-aneel",
         inputs=[
             "CSV at SIGA_URL; sep=';'; encoding='ISO-8859-1'; decimal=','.",
+            "Cached at /app/data/raw/siga_empreendimentos.csv (conditional GET).",
         ],
         output=ANEEL_SIGA_SCHEMA,
-        notes="Downloaded via HTTP and loaded as GeoDataFrame to PostGIS.",
+        notes=(
+            "Downloaded via HTTP; table bootstrapped with to_postgis, rows loaded via COPY. "
+            "Geometry column renamed to geom (GiST index usinas_siga_geom_gist)."
+        ),
     ),
     ExtractorContract(
         name="gd_aneel",
@@ -103,10 +114,14 @@ EXTRACTOR_CONTRACTS = [
         source="https://dadosabertos.aneel.gov.br/dataset/relacao-de-empreendimentos-de-geracao-distribuida",
         inputs=[
             "CSV at GD_URL; sep=';'; encoding='latin-1'.",
-            "Cached at /app/data/raw/gd_temp.csv.",
+            "Cached at /app/data/raw/gd_temp.csv (conditional GET).",
         ],
         output=GD_SCHEMA,
-        notes="Filters solar rows and aggregates by distribuidora/classe/uf.",
+        notes=(
+            "Filters solar rows and aggregates by distribuidora/classe/uf. "
+            "Upserts the distribuidoras dimension and rewrites the gd_resumo totals "
+            "in the same transaction as the load."
+        ),
     ),
     ExtractorContract(
         name="clima_open_meteo",
@@ -125,6 +140,7 @@ EXTRACTOR_CONTRACTS = [
         inputs=[
             "CKAN API to locate CSV (current or previous year).",
             "CSV sep=';'; decimal=','; carga column resolved dynamically.",
+            "Cached at /app/data/raw/carga_ons.csv (conditional GET).",
         ],
         output=ONS_CARGA_SCHEMA,
     ),
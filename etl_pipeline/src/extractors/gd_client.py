@@ -1,39 +1,57 @@
+import io
 import logging
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 from pathlib import Path
-from typing import Dict, Iterable, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 SRC_DIR = Path(__file__).resolve().parents[1]
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from core import create_db_engine, create_session, delete_all_rows, load_settings, request
+from core import (
+    CachedDownload,
+    bulk_load,
+    bump_data_version,
+    create_db_engine,
+    create_session,
+    download_cached,
+    ensure_distribuidoras_table,
+    link_auditoria_distribuidoras,
+    load_settings,
+    mark_loaded,
+    refresh_gd_summary,
+    upsert_distribuidoras,
+)
+from extractors.base import Extractor, count_csv_rows
+from extractors.contracts import GD_SCHEMA
 
 GD_URL = (
     "https://dadosabertos.aneel.gov.br/dataset/relacao-de-empreendimentos-de-geracao-distribuida/"
     "resource/b1bd71e7-d0ad-4214-9053-cbd58e9564a7/download/empreendimento-geracao-distribuida.csv"
 )
 
+GD_REQUIRED_COLUMNS = [
+    "NomAgente",
+    "DscClasseConsumo",
+    "SigUF",
+    "DscFonteGeracao",
+    "MdaPotenciaInstaladaKW",
+]
+GD_GROUP_COLUMNS = ["NomAgente", "DscClasseConsumo", "SigUF"]
+GD_BLOCK_BYTES = 32 * 1024 * 1024
 
-def download_gd_csv(session, settings, path: Path, logger: logging.Logger) -> Path:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    if path.exists():
-        logger.info("Usando cache: %s", path)
-        return path
 
-    tmp_path = path.with_suffix(path.suffix + ".partial")
-    logger.info("Baixando CSV de GD.")
-    response = request(session, "GET", GD_URL, settings=settings.http, logger=logger, stream=True)
-    response.raise_for_status()
-    with open(tmp_path, "wb") as handle:
-        for chunk in response.iter_content(chunk_size=1024 * 1024):
-            if chunk:
-                handle.write(chunk)
-    tmp_path.replace(path)
-    logger.info("Download concluido: %s", path)
-    return path
+def download_gd_csv(
+    session, settings, path: Path, logger: logging.Logger, *, force: bool = False
+) -> CachedDownload:
+    logger.info("Verificando CSV de GD.")
+    return download_cached(session, GD_URL, path, settings=settings.http, logger=logger, force=force)
 
 
 def _clean_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -63,13 +81,7 @@ def iter_gd_chunks(path: Path, chunk_size: int = 50000) -> Iterable[pd.DataFrame
 
 def transform_gd_chunks(chunks: Iterable[pd.DataFrame], logger: logging.Logger) -> Dict[Tuple[str, str, str], float]:
     aggregated: Dict[Tuple[str, str, str], float] = {}
-    required_cols = [
-        "NomAgente",
-        "DscClasseConsumo",
-        "SigUF",
-        "DscFonteGeracao",
-        "MdaPotenciaInstaladaKW",
-    ]
+    required_cols = GD_REQUIRED_COLUMNS
 
     for index, chunk in enumerate(chunks):
         if index % 20 == 0:
@@ -100,6 +112,92 @@ def transform_gd_chunks(chunks: Iterable[pd.DataFrame], logger: logging.Logger)
     return aggregated
 
 
+def iter_gd_blocks(path: Path, block_bytes: int = GD_BLOCK_BYTES) -> Iterator[bytes]:
+    """Fatia o CSV em blocos de linhas inteiras, cada um com o cabecalho na frente."""
+    with open(path, "rb") as handle:
+        header = handle.readline()
+        while True:
+            block = handle.read(block_bytes)
+            if not block:
+                break
+            yield header + block + handle.readline()
+
+
+def aggregate_gd_block(block: bytes) -> pd.Series:
+    """Le so as 5 colunas necessarias como categorias e devolve o agregado parcial em kW."""
+    chunk = pd.read_csv(
+        io.BytesIO(block),
+        sep=";",
+        encoding="latin-1",
+        on_bad_lines="skip",
+        usecols=lambda col: col.strip() in GD_REQUIRED_COLUMNS,
+        dtype="category",
+    )
+    chunk.columns = chunk.columns.str.strip()
+    if not all(col in chunk.columns for col in GD_REQUIRED_COLUMNS):
+        return _empty_gd_partial()
+
+    # Filtro e conversao rodam sobre as categorias (valores distintos), nao sobre as linhas.
+    fonte = chunk["DscFonteGeracao"]
+    solar = fonte.cat.categories.str.contains("Solar", case=False)
+    chunk = chunk[np.isin(fonte.cat.codes.to_numpy(), np.flatnonzero(solar))]
+    if chunk.empty:
+        return _empty_gd_partial()
+
+    potencia = chunk["MdaPotenciaInstaladaKW"]
+    kw_por_categoria = pd.to_numeric(
+        _normalize_kw(pd.Series(potencia.cat.categories, dtype=str)), errors="coerce"
+    ).to_numpy()
+    codes = potencia.cat.codes.to_numpy()
+    kw = np.where(codes >= 0, kw_por_categoria[codes], np.nan)
+
+    # Como no groupby legado, linhas com chave nula ficam de fora.
+    frame = pd.DataFrame({"kw": np.nan_to_num(kw)})
+    valid = np.ones(len(chunk), dtype=bool)
+    for col in GD_GROUP_COLUMNS:
+        key_codes = chunk[col].cat.codes.to_numpy()
+        upper = np.asarray(chunk[col].cat.categories.astype(str).str.upper(), dtype=object)
+        frame[col] = upper[np.maximum(key_codes, 0)] if len(upper) else ""
+        valid &= key_codes >= 0
+    return frame[valid].groupby(GD_GROUP_COLUMNS)["kw"].sum()
+
+
+def transform_gd_parallel(
+    path: Path,
+    logger: logging.Logger,
+    *,
+    workers: int = 1,
+    block_bytes: int = GD_BLOCK_BYTES,
+) -> Dict[Tuple[str, str, str], float]:
+    """Agrega o CSV de GD em paralelo: blocos de bytes vao para um pool de processos."""
+    partials: List[pd.Series] = []
+    blocks = iter_gd_blocks(path, block_bytes)
+    if workers <= 1:
+        partials.extend(aggregate_gd_block(block) for block in blocks)
+    else:
+        # spawn: o runner chama isto de uma thread, e fork de processo com threads pode herdar locks presos.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            pending = deque()
+            for index, block in enumerate(blocks):
+                if index % 20 == 0:
+                    logger.info("Processando bloco %s", index)
+                pending.append(pool.submit(aggregate_gd_block, block))
+                if len(pending) >= 2 * workers:
+                    partials.append(pending.popleft().result())
+            partials.extend(future.result() for future in pending)
+
+    partials = [partial for partial in partials if not partial.empty]
+    if not partials:
+        return {}
+    merged = pd.concat(partials).groupby(level=[0, 1, 2]).sum()
+    return {key: float(value) for key, value in merged.items()}
+
+
+def _empty_gd_partial() -> pd.Series:
+    index = pd.MultiIndex.from_arrays([[], [], []], names=GD_GROUP_COLUMNS)
+    return pd.Series([], index=index, dtype=float, name="kw")
+
+
 def build_gd_dataframe(aggregated: Dict[Tuple[str, str, str], float]) -> pd.DataFrame:
     rows = [
         {
@@ -118,13 +216,56 @@ def load_gd_data(df: pd.DataFrame, engine, logger: logging.Logger) -> int:
     if df.empty:
         logger.info("Sem linhas para carregar.")
         return 0
-    delete_all_rows(engine, "gd_detalhada")
-    df.to_sql("gd_detalhada", engine, if_exists="append", index=False)
-    logger.info("Carregadas %s linhas em gd_detalhada.", len(df))
+    # DDL fora da transacao da carga: o lock de um ALTER nao segura as leituras durante o COPY.
+    ensure_distribuidoras_table(engine)
+    with engine.begin() as conn:
+        ids = upsert_distribuidoras(conn, df["distribuidora"].unique())
+        df = df.assign(distribuidora_id=df["distribuidora"].map(ids))
+        bulk_load(conn, GD_SCHEMA, df, replace=True)
+        linked = link_auditoria_distribuidoras(conn)
+        refresh_gd_summary(conn)
+        bump_data_version(conn, "gd_detalhada")
+    logger.info(
+        "Carregadas %s linhas em gd_detalhada (%s distribuidoras, %s auditorias vinculadas).",
+        len(df),
+        len(ids),
+        linked,
+    )
     return int(len(df))
 
 
-def run_extraction(session=None, engine=None, settings=None, logger=None) -> int:
+class GdExtractor(Extractor):
+    name = "gd"
+
+    def __init__(self, session, engine, settings, logger: logging.Logger, *, force: bool = False):
+        self.session = session
+        self.engine = engine
+        self.settings = settings
+        self.logger = logger
+        self.force = force
+
+    def extract(self) -> Optional[CachedDownload]:
+        raw_path = self.settings.paths.raw_dir / "gd_temp.csv"
+        download = download_gd_csv(self.session, self.settings, raw_path, self.logger, force=self.force)
+        if not download.changed:
+            self.logger.info("CSV de GD inalterado desde a ultima carga; nada a fazer.")
+            return None
+        self.record(bytes_in=download.path.stat().st_size)
+        return download
+
+    def transform(self, raw: CachedDownload) -> Tuple[CachedDownload, pd.DataFrame]:
+        self.record(rows_in=count_csv_rows(raw.path))
+        aggregated = transform_gd_parallel(raw.path, self.logger, workers=self.settings.processing.workers)
+        return raw, build_gd_dataframe(aggregated)
+
+    def load(self, data: Tuple[CachedDownload, pd.DataFrame]) -> int:
+        download, df_final = data
+        loaded = load_gd_data(df_final, self.engine, self.logger)
+        mark_loaded(download)
+        return loaded
+
+
+def run_extraction(session=None, engine=None, settings=None, logger=None, force: bool = False) -> int:
     logger = logger or logging.getLogger("etl.gd")
     if settings is None:
         settings = load_settings()
@@ -134,12 +275,7 @@ def run_extraction(session=None, engine=None, settings=None, logger=None) -> int
 
     engine = engine or create_db_engine(settings.database.url)
     session = session or create_session(settings.http, logger=logger)
-
-    raw_path = settings.paths.raw_dir / "gd_temp.csv"
-    path = download_gd_csv(session, settings, raw_path, logger)
-    aggregated = transform_gd_chunks(iter_gd_chunks(path), logger)
-    df_final = build_gd_dataframe(aggregated)
-    return load_gd_data(df_final, engine, logger)
+    return GdExtractor(session, engine, settings, logger, force=force).run()
 
 
 def main() -> None:
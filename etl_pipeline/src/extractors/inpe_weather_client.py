@@ -1,8 +1,9 @@
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Mapping, Optional, Tuple
 
 import pandas as pd
 from sqlalchemy import text
@@ -11,7 +12,19 @@ SRC_DIR = Path(__file__).resolve().parents[1]
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from core import create_db_engine, create_session, delete_time_window, load_settings, request
+from core import (
+    bump_data_version,
+    create_db_engine,
+    create_rate_limiter,
+    create_session,
+    ensure_netload_hourly_table,
+    load_settings,
+    merge_dataframe,
+    refresh_netload_hourly,
+    request,
+)
+from extractors.base import Extractor
+from extractors.contracts import CLIMA_REAL_SCHEMA
 
 OFFSET_ANOS = 2
 DIAS_ATRAS = 7
@@ -75,6 +88,7 @@ def fetch_weather_payload(
     start_date: str,
     end_date: str,
     logger: logging.Logger,
+    rate_limiter=None,
 ) -> Dict:
     url = "https://archive-api.open-meteo.com/v1/archive"
     params = {
@@ -85,11 +99,52 @@ def fetch_weather_payload(
         "hourly": "shortwave_radiation,temperature_2m",
         "timezone": "America/Sao_Paulo",
     }
-    response = request(session, "GET", url, params=params, settings=settings.http, logger=logger)
+    response = request(
+        session,
+        "GET",
+        url,
+        params=params,
+        settings=settings.http,
+        logger=logger,
+        rate_limiter=rate_limiter,
+    )
     response.raise_for_status()
     return response.json()
 
 
+def extract_regions(
+    session,
+    settings,
+    start_date: str,
+    end_date: str,
+    logger: logging.Logger,
+    regioes: Optional[Mapping[str, Dict[str, float]]] = None,
+) -> List[pd.DataFrame]:
+    """Busca e transforma cada regiao em paralelo, respeitando o limite de taxa."""
+    regioes = REGIOES if regioes is None else regioes
+    if not regioes:
+        return []
+    rate_limiter = create_rate_limiter(settings.http)
+    max_workers = max(1, min(settings.http.max_concurrency, len(regioes)))
+
+    def _extract(nome_sub: str, coords: Dict[str, float]) -> pd.DataFrame:
+        payload = fetch_weather_payload(
+            session, settings, coords, start_date, end_date, logger, rate_limiter=rate_limiter
+        )
+        return transform_weather_payload(payload, nome_sub, OFFSET_ANOS)
+
+    frames = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_extract, nome, coords): nome for nome, coords in regioes.items()}
+        for future in as_completed(futures):
+            nome_sub = futures[future]
+            try:
+                frames.append(future.result())
+            except Exception as exc:
+                logger.warning("Erro ao extrair %s: %s", nome_sub, exc)
+    return frames
+
+
 def transform_weather_payload(payload: Dict, subsistema: str, offset_anos: int) -> pd.DataFrame:
     if "hourly" not in payload:
         return pd.DataFrame(columns=["time", "subsistema", "irradiancia_wm2", "temperatura_c"])
@@ -112,28 +167,61 @@ def load_weather_data(
     df: pd.DataFrame,
     engine,
     *,
-    subsistema: str,
-    start_time: datetime,
-    end_time: datetime,
     logger: logging.Logger,
 ) -> int:
+    """Merge em clima_real e recalculo de netload_horaria so nas horas presentes em ``df``."""
     if df.empty:
-        logger.info("%s: sem linhas para carregar.", subsistema)
+        logger.info("Sem linhas de clima para carregar.")
         return 0
 
-    delete_time_window(
-        engine,
-        "clima_real",
-        "time",
-        start_time,
-        end_time,
-        filters={"subsistema": subsistema},
-    )
-    df.to_sql("clima_real", engine, if_exists="append", index=False, method="multi")
-    logger.info("%s: carregadas %s linhas.", subsistema, len(df))
+    subsistemas = df["subsistema"].unique().tolist()
+    ensure_netload_hourly_table(engine)
+    with engine.begin() as conn:
+        merge_dataframe(conn, CLIMA_REAL_SCHEMA, df)
+        refresh_netload_hourly(conn, df["time"].min(), df["time"].max(), subsistemas=subsistemas)
+        bump_data_version(conn, "clima_real")
+    logger.info("Carregadas %s linhas de clima (%s).", len(df), ", ".join(sorted(subsistemas)))
     return int(len(df))
 
 
+class WeatherExtractor(Extractor):
+    name = "weather"
+
+    def __init__(self, session, engine, settings, logger: logging.Logger, *, now: Optional[datetime] = None):
+        self.session = session
+        self.engine = engine
+        self.settings = settings
+        self.logger = logger
+        self.now = now
+
+    def extract(self) -> Optional[List[pd.DataFrame]]:
+        create_table_if_not_exists(self.engine)
+        data_inicio_sim, data_fim_sim, real_start_date, real_end_date = compute_date_window(
+            self.now or datetime.now(), DIAS_ATRAS, OFFSET_ANOS
+        )
+        self.logger.info(
+            "Janela %s a %s (API %s a %s).",
+            data_inicio_sim,
+            data_fim_sim,
+            real_start_date,
+            real_end_date,
+        )
+
+        frames = extract_regions(self.session, self.settings, real_start_date, real_end_date, self.logger)
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            self.logger.info("Nenhuma regiao retornou dados.")
+            return None
+        self.record(rows_in=sum(len(df) for df in frames))
+        return frames
+
+    def transform(self, raw: List[pd.DataFrame]) -> pd.DataFrame:
+        return pd.concat(raw, ignore_index=True)
+
+    def load(self, data: pd.DataFrame) -> int:
+        return load_weather_data(data, self.engine, logger=self.logger)
+
+
 def run_extraction(session=None, engine=None, settings=None, logger=None, now=None) -> int:
     logger = logger or logging.getLogger("etl.weather")
     if settings is None:
@@ -144,37 +232,7 @@ def run_extraction(session=None, engine=None, settings=None, logger=None, now=No
 
     engine = engine or create_db_engine(settings.database.url)
     session = session or create_session(settings.http, logger=logger)
-    create_table_if_not_exists(engine)
-
-    now = now or datetime.now()
-    data_inicio_sim, data_fim_sim, real_start_date, real_end_date = compute_date_window(
-        now, DIAS_ATRAS, OFFSET_ANOS
-    )
-    logger.info(
-        "Janela %s a %s (API %s a %s).",
-        data_inicio_sim,
-        data_fim_sim,
-        real_start_date,
-        real_end_date,
-    )
-
-    total_rows = 0
-    for nome_sub, coords in REGIOES.items():
-        try:
-            payload = fetch_weather_payload(session, settings, coords, real_start_date, real_end_date, logger)
-            df_final = transform_weather_payload(payload, nome_sub, OFFSET_ANOS)
-            total_rows += load_weather_data(
-                df_final,
-                engine,
-                subsistema=nome_sub,
-                start_time=data_inicio_sim,
-                end_time=data_fim_sim,
-                logger=logger,
-            )
-        except Exception as exc:
-            logger.warning("Erro ao carregar %s: %s", nome_sub, exc)
-
-    return total_rows
+    return WeatherExtractor(session, engine, settings, logger, now=now).run()
 
 
 def main() -> None:
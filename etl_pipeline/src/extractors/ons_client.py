@@ -1,25 +1,37 @@
+import argparse
 import io
 import logging
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import IO, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
 
 import pandas as pd
+from sqlalchemy import text
 
 SRC_DIR = Path(__file__).resolve().parents[1]
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from core import create_db_engine, create_session, delete_time_window, load_settings, request
+from core import (
+    CachedDownload,
+    bump_data_version,
+    create_db_engine,
+    create_session,
+    download_cached,
+    ensure_netload_hourly_table,
+    load_settings,
+    mark_loaded,
+    merge_dataframe,
+    refresh_netload_hourly,
+    request,
+)
+from core.db import FrameSource
+from extractors.base import Extractor
+from extractors.contracts import ONS_CARGA_SCHEMA
 
 CKAN_API_URL = "https://dados.ons.org.br/api/3/action/package_show?id=carga-energia"
-
-
-def _normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [c.strip().lower() for c in df.columns]
-    return df
+ONS_CHUNK_ROWS = 100_000
 
 
 def find_carga_column(columns: Iterable[str]) -> Optional[str]:
@@ -65,63 +77,225 @@ def get_dynamic_url(session, settings, logger: logging.Logger) -> Optional[str]:
         return None
 
 
-def transform_carga_ons_csv(content: bytes, logger: logging.Logger) -> pd.DataFrame:
-    df = pd.read_csv(io.BytesIO(content), sep=";", decimal=",")
-    df = _normalize_columns(df)
-    df = df.rename(
-        columns={
-            "din_instante": "time",
-            "nom_subsistema": "subsistema",
-            "subsistema": "subsistema",
-            "time": "time",
-        }
-    )
+def resolve_carga_columns(columns: Iterable[str]) -> Optional[Dict[str, str]]:
+    """Mapeia as colunas originais do CSV para time/subsistema/carga_mw (None se faltar alguma)."""
+    normalized = {c.strip().lower(): c for c in columns}
+    renames = {
+        "din_instante": "time",
+        "time": "time",
+        "nom_subsistema": "subsistema",
+        "subsistema": "subsistema",
+    }
+    mapping = {original: renames[name] for name, original in normalized.items() if name in renames}
+
+    carga_col = find_carga_column(normalized)
+    if carga_col:
+        mapping[normalized[carga_col]] = "carga_mw"
+    if set(mapping.values()) != {"time", "subsistema", "carga_mw"}:
+        return None
+    return mapping
+
+
+def iter_carga_ons_csv(
+    source: Union[str, Path, IO[bytes]],
+    logger: logging.Logger,
+    *,
+    chunk_rows: int = ONS_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """Le o CSV em blocos de ``chunk_rows`` linhas, so com as 3 colunas usadas.
+
+    As colunas sao resolvidas uma vez, pelo cabecalho. Duplicatas entre blocos
+    ficam para o merge (DISTINCT ON no staging).
+    """
+    header = pd.read_csv(source, sep=";", nrows=0)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    mapping = resolve_carga_columns(header.columns)
+    if mapping is None:
+        logger.warning("Coluna de carga nao encontrada. Colunas: %s", list(header.columns))
+        return
+
+    reader = pd.read_csv(source, sep=";", decimal=",", usecols=list(mapping), chunksize=chunk_rows)
+    for chunk in reader:
+        chunk = chunk.rename(columns=mapping)
+        chunk["time"] = pd.to_datetime(chunk["time"])
+        chunk["carga_mw"] = pd.to_numeric(chunk["carga_mw"], errors="coerce")
+        chunk = chunk[["time", "subsistema", "carga_mw"]].dropna()
+        yield chunk.drop_duplicates(subset=["time", "subsistema"])
 
-    carga_col = find_carga_column(df.columns)
-    if not carga_col:
-        logger.warning("Coluna de carga nao encontrada. Colunas: %s", list(df.columns))
+
+def transform_carga_ons_csv(content: bytes, logger: logging.Logger) -> pd.DataFrame:
+    chunks = list(iter_carga_ons_csv(io.BytesIO(content), logger))
+    if not chunks:
         return pd.DataFrame(columns=["time", "subsistema", "carga_mw"])
+    df_final = pd.concat(chunks, ignore_index=True)
+    return df_final.drop_duplicates(subset=["time", "subsistema"])
 
-    df = df.rename(columns={carga_col: "carga_mw"})
-    df["time"] = pd.to_datetime(df["time"])
-    df["carga_mw"] = pd.to_numeric(df["carga_mw"], errors="coerce")
 
-    df_final = df[["time", "subsistema", "carga_mw"]].dropna()
-    return df_final.drop_duplicates(subset=["time", "subsistema"])
+def create_unique_index_if_not_exists(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS carga_ons_time_subsistema_key "
+                "ON carga_ons (time, subsistema)"
+            )
+        )
 
 
-def load_carga_ons(df: pd.DataFrame, engine, logger: logging.Logger) -> int:
-    if df.empty:
+def fetch_watermarks(engine) -> Dict[str, datetime]:
+    """Ultimo instante ja carregado em carga_ons, por subsistema.
+
+    O cast para ``timestamp`` devolve o horario no fuso da sessao, o mesmo usado
+    pelo Postgres para interpretar os horarios sem fuso do CSV na carga.
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT subsistema, MAX(time)::timestamp AS max_time FROM carga_ons GROUP BY subsistema")
+        ).fetchall()
+    return {row.subsistema: row.max_time for row in rows if row.max_time is not None}
+
+
+def filter_new_rows(df: pd.DataFrame, watermarks: Dict[str, datetime]) -> pd.DataFrame:
+    """Mantem so as linhas posteriores ao watermark do subsistema (subsistemas novos entram inteiros).
+
+    Watermarks com fuso sao comparados no fuso de ``time``; com ``time`` sem fuso
+    (o caso do CSV do ONS), sao convertidos para UTC sem fuso, o fuso da sessao do banco.
+    """
+    if df.empty or not watermarks:
+        return df
+    tz = df["time"].dt.tz
+    limites = {subsistema: _align_watermark(value, tz) for subsistema, value in watermarks.items()}
+    limite = pd.to_datetime(df["subsistema"].map(limites))
+    mask = limite.isna() | (df["time"] > limite)
+    return df[mask]
+
+
+def _align_watermark(value, tz) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    if tz is None:
+        return ts.tz_convert("UTC").tz_localize(None) if ts.tzinfo is not None else ts
+    return ts.tz_convert(tz) if ts.tzinfo is not None else ts.tz_localize("UTC").tz_convert(tz)
+
+
+class _LoadWindow:
+    """Acompanha linhas, intervalo de tempo e subsistemas dos blocos que passam pelo merge."""
+
+    def __init__(self):
+        self.rows = 0
+        self.min_time = None
+        self.max_time = None
+        self.subsistemas = set()
+
+    def track(self, frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        for frame in frames:
+            if frame.empty:
+                continue
+            self.rows += len(frame)
+            frame_min, frame_max = frame["time"].min(), frame["time"].max()
+            self.min_time = frame_min if self.min_time is None else min(self.min_time, frame_min)
+            self.max_time = frame_max if self.max_time is None else max(self.max_time, frame_max)
+            self.subsistemas.update(frame["subsistema"].dropna().unique().tolist())
+            yield frame
+
+
+def load_carga_ons(data: FrameSource, engine, logger: logging.Logger) -> int:
+    """Merge de um DataFrame ou de um iterador de blocos, numa unica transacao."""
+    if isinstance(data, pd.DataFrame):
+        if data.empty:
+            logger.info("Sem linhas para carregar.")
+            return 0
+        data = [data]
+
+    window = _LoadWindow()
+    ensure_netload_hourly_table(engine)
+    with engine.begin() as conn:
+        merge_dataframe(conn, ONS_CARGA_SCHEMA, window.track(data))
+        if window.rows:
+            refresh_netload_hourly(conn, window.min_time, window.max_time, subsistemas=window.subsistemas)
+            bump_data_version(conn, "carga_ons")
+    if not window.rows:
         logger.info("Sem linhas para carregar.")
         return 0
+    logger.info("Carregadas %s linhas em carga_ons.", window.rows)
+    return window.rows
 
-    min_time = df["time"].min()
-    max_time = df["time"].max()
-    subsistemas = df["subsistema"].dropna().unique().tolist()
-
-    if subsistemas:
-        delete_time_window(
-            engine,
-            "carga_ons",
-            "time",
-            min_time,
-            max_time,
-            filters={"subsistema": subsistemas},
-        )
 
-    df.to_sql(
-        "carga_ons",
-        engine,
-        if_exists="append",
-        index=False,
-        method="multi",
-        chunksize=10000,
-    )
-    logger.info("Carregadas %s linhas em carga_ons.", len(df))
-    return int(len(df))
+class OnsCargaExtractor(Extractor):
+    name = "ons"
 
-
-def run_extraction(session=None, engine=None, settings=None, logger=None) -> int:
+    def __init__(
+        self,
+        session,
+        engine,
+        settings,
+        logger: logging.Logger,
+        *,
+        force: bool = False,
+        full: bool = False,
+    ):
+        self.session = session
+        self.engine = engine
+        self.settings = settings
+        self.logger = logger
+        self.force = force
+        self.full = full
+
+    def extract(self) -> Optional[CachedDownload]:
+        create_unique_index_if_not_exists(self.engine)
+        self.logger.info("Iniciando extracao ONS.")
+        target_url = get_dynamic_url(self.session, self.settings, self.logger)
+        if not target_url:
+            self.logger.warning("Nenhum link CSV encontrado.")
+            return None
+
+        download = download_cached(
+            self.session,
+            target_url,
+            self.settings.paths.raw_dir / "carga_ons.csv",
+            settings=self.settings.http,
+            logger=self.logger,
+            force=self.force,
+        )
+        if not download.changed:
+            self.logger.info("CSV do ONS inalterado desde a ultima carga; nada a fazer.")
+            return None
+        self.record(bytes_in=download.path.stat().st_size)
+        return download
+
+    def transform(self, raw: CachedDownload) -> Tuple[CachedDownload, Iterator[pd.DataFrame]]:
+        chunks = self._count_rows_in(iter_carga_ons_csv(raw.path, self.logger))
+        if not self.full:
+            watermarks = fetch_watermarks(self.engine)
+            self.logger.info("Modo incremental: watermarks %s", watermarks)
+            chunks = (filter_new_rows(chunk, watermarks) for chunk in chunks)
+        return raw, chunks
+
+    def _count_rows_in(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        # Linhas validas lidas do CSV, antes do filtro por watermark.
+        for chunk in chunks:
+            self.record(rows_in=len(chunk))
+            yield chunk
+
+    def load(self, data: Tuple[CachedDownload, Iterator[pd.DataFrame]]) -> int:
+        download, chunks = data
+        loaded = load_carga_ons(chunks, self.engine, self.logger)
+        mark_loaded(download)
+        return loaded
+
+
+def run_extraction(
+    session=None,
+    engine=None,
+    settings=None,
+    logger=None,
+    force: bool = False,
+    full: bool = False,
+) -> int:
+    """Carga incremental por padrao: so entram linhas apos o max(time) de cada subsistema.
+
+    ``full`` recarrega (merge) o arquivo inteiro, o que tambem corrige valores
+    revisados pelo ONS em horas ja carregadas.
+    """
     logger = logger or logging.getLogger("etl.ons")
     if settings is None:
         settings = load_settings()
@@ -131,25 +305,22 @@ def run_extraction(session=None, engine=None, settings=None, logger=None) -> int
 
     engine = engine or create_db_engine(settings.database.url)
     session = session or create_session(settings.http, logger=logger)
+    return OnsCargaExtractor(session, engine, settings, logger, force=force, full=full).run()
 
-    logger.info("Iniciando extracao ONS.")
-    target_url = get_dynamic_url(session, settings, logger)
-    if not target_url:
-        logger.warning("Nenhum link CSV encontrado.")
-        return 0
-
-    response = request(session, "GET", target_url, settings=settings.http, logger=logger)
-    response.raise_for_status()
-
-    df_final = transform_carga_ons_csv(response.content, logger)
-    return load_carga_ons(df_final, engine, logger)
 
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Extracao de carga do ONS.")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Baixa e recarrega o arquivo inteiro em vez de so as linhas novas.",
+    )
+    args = parser.parse_args(argv)
 
-def main() -> None:
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger("etl.ons")
     try:
-        run_extraction(logger=logger)
+        run_extraction(logger=logger, force=args.full, full=args.full)
     except Exception:
         logger.exception("Falha na extracao ONS.")
         raise
@@ -0,0 +1,274 @@
+"""Executa as extracoes como um DAG: fontes independentes em paralelo.
+
+Todas as tarefas compartilham a mesma sessao HTTP e o mesmo engine. Uma tarefa
+so comeca quando suas dependencias terminam com sucesso; se uma dependencia
+falha, as dependentes sao puladas. Cada extrator grava sua execucao em
+``etl_runs`` com o id da execucao do runner. ``fix_data`` grava dados sinteticos
+e so roda quando pedido (``--only ... fix_data`` ou ``--demo``). Uso:
+
+    python src/runner.py [--only ons fix_data] [--skip gd] [--full] [--force] [--demo]
+"""
+import argparse
+import logging
+import sys
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+SRC_DIR = Path(__file__).resolve().parent
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from core import create_db_engine, create_session, load_settings
+from extractors.aneel_client import AneelSigaExtractor
+from extractors.base import Extractor, RunStats
+from extractors.gd_client import GdExtractor
+from extractors.inpe_weather_client import WeatherExtractor
+from extractors.ons_client import OnsCargaExtractor
+
+
+@dataclass
+class RunContext:
+    session: object
+    engine: object
+    settings: object
+    force: bool = False
+    full: bool = False
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+@dataclass(frozen=True)
+class Task:
+    name: str
+    run: Callable[[RunContext], Union[int, RunStats]]
+    depends_on: Tuple[str, ...] = ()
+    opt_in: bool = False
+
+
+@dataclass
+class TaskResult:
+    name: str
+    status: str
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    stats: Optional[RunStats] = None
+
+
+@dataclass
+class RunReport:
+    results: Dict[str, TaskResult] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return all(result.status == "ok" for result in self.results.values())
+
+
+def _run_extractor(extractor: Extractor, ctx: RunContext) -> RunStats:
+    extractor.run(run_id=ctx.run_id)
+    return extractor.stats
+
+
+def _fix_data(ctx: RunContext) -> int:
+    from fix_data import gerar_dados_fake_realistas
+
+    return int(gerar_dados_fake_realistas(ctx.engine) or 0)
+
+
+TASKS: List[Task] = [
+    Task(
+        "aneel",
+        lambda ctx: _run_extractor(
+            AneelSigaExtractor(
+                ctx.session, ctx.engine, ctx.settings, logging.getLogger("etl.aneel"), force=ctx.force
+            ),
+            ctx,
+        ),
+    ),
+    Task(
+        "gd",
+        lambda ctx: _run_extractor(
+            GdExtractor(ctx.session, ctx.engine, ctx.settings, logging.getLogger("etl.gd"), force=ctx.force),
+            ctx,
+        ),
+    ),
+    Task(
+        "ons",
+        lambda ctx: _run_extractor(
+            OnsCargaExtractor(
+                ctx.session,
+                ctx.engine,
+                ctx.settings,
+                logging.getLogger("etl.ons"),
+                force=ctx.force or ctx.full,
+                full=ctx.full,
+            ),
+            ctx,
+        ),
+    ),
+    Task(
+        "weather",
+        lambda ctx: _run_extractor(
+            WeatherExtractor(ctx.session, ctx.engine, ctx.settings, logging.getLogger("etl.weather")),
+            ctx,
+        ),
+    ),
+    # fix_data troca as ultimas horas reais de carga_ons por dados sinteticos (demo):
+    # fora da selecao padrao e, quando pedido, depois do ONS.
+    Task("fix_data", _fix_data, depends_on=("ons",), opt_in=True),
+]
+
+
+def select_tasks(
+    tasks: Sequence[Task],
+    only: Optional[Iterable[str]] = None,
+    skip: Optional[Iterable[str]] = None,
+    *,
+    include_opt_in: bool = False,
+) -> List[Task]:
+    """Filtra as tarefas; dependencias fora da selecao sao tratadas como ja satisfeitas.
+
+    Sem ``only``, tarefas ``opt_in`` ficam de fora, a menos que ``include_opt_in``.
+    """
+    names = {task.name for task in tasks}
+    defaults = {task.name for task in tasks if include_opt_in or not task.opt_in}
+    requested = set(only or defaults) - set(skip or ())
+    unknown = requested - names
+    if unknown:
+        raise ValueError(f"Tarefas desconhecidas: {sorted(unknown)}")
+    selected = [task for task in tasks if task.name in requested]
+    return [
+        replace(task, depends_on=tuple(dep for dep in task.depends_on if dep in requested))
+        for task in selected
+    ]
+
+
+def _check_acyclic(tasks: Sequence[Task]) -> None:
+    pending = {task.name: set(task.depends_on) for task in tasks}
+    while pending:
+        ready = [name for name, deps in pending.items() if not deps]
+        if not ready:
+            raise ValueError(f"Dependencias ciclicas entre: {sorted(pending)}")
+        for name in ready:
+            del pending[name]
+        for deps in pending.values():
+            deps.difference_update(ready)
+
+
+def run_dag(
+    tasks: Sequence[Task],
+    ctx: RunContext,
+    *,
+    max_workers: int,
+    logger: Optional[logging.Logger] = None,
+) -> RunReport:
+    logger = logger or logging.getLogger("etl.runner")
+    _check_acyclic(tasks)
+    report = RunReport()
+    waiting = {task.name: task for task in tasks}
+    running: Dict[Future, Tuple[Task, float]] = {}
+
+    def _skip_blocked() -> None:
+        changed = True
+        while changed:
+            changed = False
+            for name, task in list(waiting.items()):
+                failed = [
+                    dep
+                    for dep in task.depends_on
+                    if dep in report.results and report.results[dep].status != "ok"
+                ]
+                if failed:
+                    report.results[name] = TaskResult(name, "skipped", error=f"dependencia falhou: {failed}")
+                    logger.warning("Tarefa %s pulada (dependencia %s falhou).", name, failed)
+                    del waiting[name]
+                    changed = True
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="etl") as pool:
+        while waiting or running:
+            _skip_blocked()
+            for name, task in list(waiting.items()):
+                if all(dep in report.results for dep in task.depends_on):
+                    logger.info("Iniciando tarefa %s.", name)
+                    running[pool.submit(task.run, ctx)] = (task, time.perf_counter())
+                    del waiting[name]
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, started = running.pop(future)
+                seconds = time.perf_counter() - started
+                try:
+                    outcome = future.result()
+                except Exception as exc:
+                    logger.exception("Tarefa %s falhou.", task.name)
+                    report.results[task.name] = TaskResult(
+                        task.name, "failed", seconds=seconds, error=str(exc)
+                    )
+                else:
+                    stats = outcome if isinstance(outcome, RunStats) else None
+                    rows = stats.rows_out if stats else int(outcome or 0)
+                    logger.info("Tarefa %s concluida: %s linhas em %.1fs.", task.name, rows, seconds)
+                    report.results[task.name] = TaskResult(
+                        task.name, "ok", rows=rows, seconds=seconds, stats=stats
+                    )
+    return report
+
+
+def _format_stages(stats: Optional[RunStats]) -> str:
+    if stats is None:
+        return ""
+    stages = " ".join(f"{name}={seconds:.1f}s" for name, seconds in stats.seconds.items())
+    return f"[{stages} status={stats.status} pico_rss_processo={stats.process_peak_rss_mb}MB]"
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Executa as extracoes do ETL em paralelo.")
+    parser.add_argument("--only", nargs="+", help="Roda so estas tarefas.")
+    parser.add_argument("--skip", nargs="+", help="Nao roda estas tarefas.")
+    parser.add_argument(
+        "--full", action="store_true", help="Recarga completa do ONS (ver ons_client --full)."
+    )
+    parser.add_argument("--force", action="store_true", help="Ignora o cache de downloads.")
+    parser.add_argument(
+        "--demo", action="store_true", help="Inclui o fix_data (dados sinteticos em carga_ons)."
+    )
+    parser.add_argument("--workers", type=int, help="Tarefas simultaneas (default: uma por tarefa).")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(threadName)s %(name)s %(message)s")
+    logger = logging.getLogger("etl.runner")
+    settings = load_settings()
+    if not settings.database.url:
+        raise ValueError("DATABASE_URL is not configured.")
+
+    tasks = select_tasks(TASKS, args.only, args.skip, include_opt_in=args.demo)
+    ctx = RunContext(
+        session=create_session(settings.http, logger=logger),
+        engine=create_db_engine(settings.database.url),
+        settings=settings,
+        force=args.force,
+        full=args.full,
+    )
+    started = time.perf_counter()
+    report = run_dag(tasks, ctx, max_workers=args.workers or len(tasks), logger=logger)
+    logger.info("Execucao %s concluida em %.1fs.", ctx.run_id, time.perf_counter() - started)
+    for result in report.results.values():
+        logger.info(
+            "  %-8s %-7s %8s linhas %6.1fs %s %s",
+            result.name,
+            result.status,
+            result.rows,
+            result.seconds,
+            _format_stages(result.stats),
+            result.error or "",
+        )
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import os
+import sys
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Testes de SQL rodam num Postgres de verdade quando ha URL (ex.: o banco do docker-compose);
+# sem ela sao pulados. Cada teste usa um schema proprio, apagado no fim.
+TEST_DATABASE_URL = os.getenv("ETL_TEST_DATABASE_URL")
+
+# Subconjunto de infrastructure/database/schema.sql sem extensoes (PostGIS, pg_trgm).
+FACT_TABLES_DDL = """
+CREATE TABLE carga_ons (
+    time TIMESTAMPTZ NOT NULL,
+    subsistema TEXT,
+    carga_mw DOUBLE PRECISION
+);
+CREATE UNIQUE INDEX carga_ons_time_subsistema_key ON carga_ons (time, subsistema);
+CREATE TABLE clima_real (
+    time TIMESTAMPTZ NOT NULL,
+    subsistema VARCHAR(20),
+    irradiancia_wm2 DOUBLE PRECISION,
+    temperatura_c DOUBLE PRECISION,
+    CONSTRAINT clima_real_unique UNIQUE (time, subsistema)
+);
+CREATE TABLE gd_detalhada (
+    distribuidora TEXT,
+    classe TEXT,
+    sigla_uf TEXT,
+    fonte TEXT,
+    potencia_mw DOUBLE PRECISION
+);
+"""
+
+
+class FakeResult:
+    def __init__(self, rows=(), scalar=None, rowcount=0):
+        self.rows = list(rows)
+        self._scalar = scalar
+        self.rowcount = rowcount
+
+    def fetchall(self):
+        return self.rows
+
+    def scalar(self):
+        return self._scalar
+
+
+class FakeConnection:
+    """Engine/conexao sincrona em memoria.
+
+    Registra cada instrucao (SQL normalizado, parametros) em ``calls`` e devolve os
+    ``results`` na ordem; sem resultados programados devolve ``FakeResult()``.
+    ``copy_expert`` guarda o COPY e o CSV enviado em ``copies``.
+    """
+
+    def __init__(self, results=None):
+        self.results = None if results is None else list(results)
+        self.calls = []
+        self.copies = []
+        self.connection = self
+
+    @property
+    def statements(self):
+        return [sql for sql, _ in self.calls]
+
+    @contextmanager
+    def begin(self):
+        yield self
+
+    def execute(self, statement, params=None):
+        self.calls.append((" ".join(str(statement).split()), params))
+        if self.results is None:
+            return FakeResult()
+        return self.results.pop(0)
+
+    def cursor(self):
+        return self
+
+    def copy_expert(self, statement, buffer):
+        self.copies.append((statement, buffer.read()))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_conn():
+    return FakeConnection
+
+
+@pytest.fixture
+def fake_result():
+    return FakeResult
+
+
+@pytest.fixture
+def pg_engine():
+    """Engine num schema temporario com carga_ons, clima_real e gd_detalhada vazias."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("ETL_TEST_DATABASE_URL nao configurada.")
+    from sqlalchemy import create_engine, text
+
+    schema = f"etl_test_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(FACT_TABLES_DDL))
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
@@ -0,0 +1,39 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from core.db import copy_dataframe
+from extractors.contracts import CLIMA_REAL_SCHEMA
+
+
+def test_copy_dataframe_streams_schema_columns_in_chunks(fake_conn):
+    df = pd.DataFrame(
+        {
+            "temperatura_c": [25.0, None, 27.5],
+            "subsistema": ["SUL", "SUL", "SUL"],
+            "irradiancia_wm2": [100.0, 0.0, None],
+            "time": pd.date_range("2024-01-01", periods=3, freq="h"),
+            "extra": [1, 2, 3],
+        }
+    )
+    conn = fake_conn()
+
+    total = copy_dataframe(conn, CLIMA_REAL_SCHEMA, df, chunk_rows=2)
+
+    assert total == 3
+    statements = [call[0] for call in conn.copies]
+    assert statements == [
+        'COPY clima_real ("time", "subsistema", "irradiancia_wm2", "temperatura_c") FROM STDIN WITH (FORMAT csv)'
+    ] * 2
+    payload = "".join(call[1] for call in conn.copies)
+    assert payload.splitlines() == [
+        "2024-01-01 00:00:00,SUL,100.0,25.0",
+        "2024-01-01 01:00:00,SUL,0.0,",
+        "2024-01-01 02:00:00,SUL,,27.5",
+    ]
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from core.db import merge_dataframe
+from extractors.contracts import ONS_CARGA_SCHEMA
+
+
+def _carga(pg_engine):
+    with pg_engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT time AT TIME ZONE 'UTC' AS time, subsistema, carga_mw FROM carga_ons ORDER BY time")
+        ).fetchall()
+    return [(row.time, row.subsistema, row.carga_mw) for row in rows]
+
+
+def test_merge_dataframe_upserts_on_unique_columns(pg_engine):
+    primeira = pd.DataFrame(
+        {
+            "time": pd.to_datetime(["2024-01-01 00:00", "2024-01-01 01:00"]).tz_localize("UTC"),
+            "subsistema": ["SUL", "SUL"],
+            "carga_mw": [10000.0, 11000.0],
+        }
+    )
+    revisao = pd.DataFrame(
+        {
+            "time": pd.to_datetime(["2024-01-01 01:00", "2024-01-01 02:00"]).tz_localize("UTC"),
+            "subsistema": ["SUL", "SUL"],
+            "carga_mw": [11500.0, 12000.0],
+        }
+    )
+
+    assert merge_dataframe(pg_engine, ONS_CARGA_SCHEMA, primeira) == 2
+    assert merge_dataframe(pg_engine, ONS_CARGA_SCHEMA, revisao) == 2
+
+    assert [carga for _, _, carga in _carga(pg_engine)] == [10000.0, 11500.0, 12000.0]
+
+
+def test_merge_dataframe_keeps_one_row_per_key_from_a_batch(pg_engine):
+    df = pd.DataFrame(
+        {
+            "time": pd.to_datetime(["2024-01-01 00:00"] * 3).tz_localize("UTC"),
+            "subsistema": ["SUL", "SUL", "NORTE"],
+            "carga_mw": [1.0, 1.0, 2.0],
+        }
+    )
+
+    assert merge_dataframe(pg_engine, ONS_CARGA_SCHEMA, df) == 3
+
+    assert sorted(sub for _, sub, _ in _carga(pg_engine)) == ["NORTE", "SUL"]
+
+
+def test_merge_dataframe_never_drops_a_regular_table_named_like_the_staging(pg_engine):
+    with pg_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE _stg_carga_ons (id INTEGER)"))
+    df = pd.DataFrame(
+        {"time": pd.to_datetime(["2024-01-01 00:00"]).tz_localize("UTC"), "subsistema": ["SUL"], "carga_mw": [1.0]}
+    )
+
+    assert merge_dataframe(pg_engine, ONS_CARGA_SCHEMA, df) == 1
+
+    with pg_engine.connect() as conn:
+        assert conn.execute(text("SELECT to_regclass('_stg_carga_ons') IS NOT NULL")).scalar()
@@ -0,0 +1,78 @@
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from core.dimensions import ensure_distribuidoras_table, link_auditoria_distribuidoras, upsert_distribuidoras
+
+Table = namedtuple("Table", ["nome"])
+
+
+def _columns(pg_engine, table):
+    with pg_engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_schema = current_schema() AND table_name = :table"
+            ),
+            {"table": table},
+        ).fetchall()
+    return {row.column_name for row in rows}
+
+
+def test_upsert_distribuidoras_keeps_ids_stable_across_loads(pg_engine):
+    ensure_distribuidoras_table(pg_engine)
+
+    primeira = upsert_distribuidoras(pg_engine, ["ENEL SP", "CEMIG", "CEMIG", None])
+    segunda = upsert_distribuidoras(pg_engine, ["CEMIG", "COPEL"])
+
+    assert set(primeira) == {"CEMIG", "ENEL SP"}
+    assert segunda["CEMIG"] == primeira["CEMIG"]
+    assert segunda["COPEL"] not in primeira.values()
+    assert upsert_distribuidoras(pg_engine, []) == {}
+
+
+def test_ensure_distribuidoras_table_adds_missing_columns_once(pg_engine):
+    with pg_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE auditoria_visual (distribuidora TEXT)"))
+
+    ensure_distribuidoras_table(pg_engine)
+    ensure_distribuidoras_table(pg_engine)
+
+    assert "distribuidora_id" in _columns(pg_engine, "gd_detalhada")
+    assert "distribuidora_id" in _columns(pg_engine, "auditoria_visual")
+
+
+def test_ensure_distribuidoras_table_skips_ddl_when_columns_exist(fake_conn, fake_result):
+    conn = fake_conn([fake_result(), fake_result([])])
+    ensure_distribuidoras_table(conn)
+    assert not any(sql.startswith("ALTER TABLE") for sql in conn.statements)
+
+    conn = fake_conn([fake_result(), fake_result([Table("auditoria_visual")]), fake_result()])
+    ensure_distribuidoras_table(conn)
+    assert conn.statements[-1].startswith("ALTER TABLE auditoria_visual ADD COLUMN")
+
+
+def test_link_auditoria_distribuidoras_matches_trimmed_upper_names(pg_engine):
+    assert link_auditoria_distribuidoras(pg_engine) == 0
+
+    with pg_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE auditoria_visual (distribuidora TEXT)"))
+        conn.execute(text("INSERT INTO auditoria_visual VALUES (' cemig '), ('OUTRA')"))
+    # Tabela reescrita pelo notebook, ainda sem a coluna de id.
+    assert link_auditoria_distribuidoras(pg_engine) == 0
+
+    ensure_distribuidoras_table(pg_engine)
+    ids = upsert_distribuidoras(pg_engine, ["CEMIG"])
+
+    assert link_auditoria_distribuidoras(pg_engine) == 1
+    assert link_auditoria_distribuidoras(pg_engine) == 0
+    with pg_engine.connect() as conn:
+        vinculos = dict(conn.execute(text("SELECT distribuidora, distribuidora_id FROM auditoria_visual")).fetchall())
+    assert vinculos == {" cemig ": ids["CEMIG"], "OUTRA": None}
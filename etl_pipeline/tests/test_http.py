@@ -0,0 +1,98 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from core.http import TokenBucket, download_cached, mark_loaded
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_s=2.0, capacity=2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.5
+    assert clock.now == 0.5
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        self.calls.append(kwargs.get("headers", {}))
+        return self.responses.pop(0)
+
+
+def test_download_cached_sends_validators_and_skips_loaded_content(tmp_path):
+    path = tmp_path / "fonte.csv"
+    session = FakeSession(
+        [
+            FakeResponse(200, b"a;b\n1;2\n", {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+            FakeResponse(304),
+            FakeResponse(200, b"a;b\n1;2\n", {"ETag": '"v2"'}),
+        ]
+    )
+
+    first = download_cached(session, "http://fonte/x.csv", path)
+    assert first.changed and path.read_bytes() == b"a;b\n1;2\n"
+    assert session.calls[0] == {}
+
+    # 304 antes de marcar a carga: o arquivo em cache ainda precisa ser carregado.
+    second = download_cached(session, "http://fonte/x.csv", path)
+    assert second.not_modified and second.changed
+    assert session.calls[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+
+    mark_loaded(second)
+    # Servidor sem suporte a 304: o hash igual ao ja carregado evita a recarga.
+    third = download_cached(session, "http://fonte/x.csv", path)
+    assert not third.changed and third.sha256 == first.sha256
+
+
+def test_download_cached_force_ignores_validators(tmp_path):
+    path = tmp_path / "fonte.csv"
+    session = FakeSession(
+        [FakeResponse(200, b"x", {"ETag": '"v1"'}), FakeResponse(200, b"x", {"ETag": '"v1"'})]
+    )
+    mark_loaded(download_cached(session, "http://fonte/x.csv", path))
+
+    forced = download_cached(session, "http://fonte/x.csv", path, force=True)
+    assert forced.changed
+    assert session.calls[1] == {}
@@ -0,0 +1,150 @@
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import text
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from core.db import merge_dataframe
+from core.dimensions import ensure_distribuidoras_table, upsert_distribuidoras
+from core.rollups import (
+    canonical_subsistema,
+    ensure_netload_hourly_table,
+    hourly_bounds,
+    refresh_gd_summary,
+    refresh_netload_hourly,
+)
+from extractors.contracts import CLIMA_REAL_SCHEMA, ONS_CARGA_SCHEMA
+
+
+def test_canonical_subsistema_matches_clima_keys():
+    assert canonical_subsistema("SUDESTE/CENTRO-OESTE") == "SUDESTE"
+    assert canonical_subsistema(" Sul ") == "SUL"
+    assert canonical_subsistema("NORDESTE") == "NORDESTE"
+
+
+def test_hourly_bounds_cover_partial_hours():
+    start, end = hourly_bounds(datetime(2024, 1, 1, 10, 30), datetime(2024, 1, 1, 12, 0))
+
+    assert start == datetime(2024, 1, 1, 10, 0)
+    assert end == datetime(2024, 1, 1, 13, 0)
+
+
+def test_ensure_netload_hourly_table_skips_alter_when_column_exists(fake_conn, fake_result):
+    conn = fake_conn([fake_result(), fake_result(scalar=1)])
+
+    ensure_netload_hourly_table(conn)
+
+    assert not any(sql.startswith(("ALTER", "CREATE INDEX")) for sql in conn.statements)
+
+
+def _utc(*values):
+    return pd.to_datetime(list(values)).tz_localize("UTC")
+
+
+def _netload(pg_engine):
+    with pg_engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                """
+            SELECT hora AT TIME ZONE 'UTC' AS hora, subsistema, carga_mw, irradiancia_wm2, amostras_carga, atualizado_em
+            FROM netload_horaria ORDER BY subsistema, hora
+        """
+            )
+        ).fetchall()
+    return {(row.subsistema, row.hora.hour): row for row in rows}
+
+
+def test_refresh_netload_hourly_averages_hours_and_joins_weather(pg_engine):
+    carga = pd.DataFrame(
+        {
+            "time": _utc("2024-01-01 10:00", "2024-01-01 10:30", "2024-01-01 11:00", "2024-01-01 10:00"),
+            "subsistema": ["SUDESTE/CENTRO-OESTE", "SUDESTE/CENTRO-OESTE", "SUDESTE/CENTRO-OESTE", "SUL"],
+            "carga_mw": [100.0, 200.0, 300.0, 50.0],
+        }
+    )
+    clima = pd.DataFrame(
+        {
+            "time": _utc("2024-01-01 10:00", "2024-01-01 10:00"),
+            "subsistema": ["SUDESTE", "SUL"],
+            "irradiancia_wm2": [400.0, 600.0],
+            "temperatura_c": [25.0, 20.0],
+        }
+    )
+    merge_dataframe(pg_engine, ONS_CARGA_SCHEMA, carga)
+    merge_dataframe(pg_engine, CLIMA_REAL_SCHEMA, clima)
+    ensure_netload_hourly_table(pg_engine)
+
+    inicio, fim = datetime(2024, 1, 1, 10, tzinfo=timezone.utc), datetime(2024, 1, 1, 11, tzinfo=timezone.utc)
+    assert refresh_netload_hourly(pg_engine, inicio, fim, subsistemas=["SUDESTE/CENTRO-OESTE"]) == 2
+
+    linhas = _netload(pg_engine)
+    assert set(linhas) == {("SUDESTE", 10), ("SUDESTE", 11)}
+    assert (linhas["SUDESTE", 10].carga_mw, linhas["SUDESTE", 10].amostras_carga) == (150.0, 2)
+    assert linhas["SUDESTE", 10].irradiancia_wm2 == 400.0
+    assert linhas["SUDESTE", 11].irradiancia_wm2 is None
+
+
+def test_refresh_netload_hourly_rewrites_only_the_window(pg_engine):
+    carga = pd.DataFrame(
+        {"time": _utc("2024-01-01 10:00", "2024-01-01 11:00"), "subsistema": ["SUL", "SUL"], "carga_mw": [1.0, 2.0]}
+    )
+    merge_dataframe(pg_engine, ONS_CARGA_SCHEMA, carga)
+    ensure_netload_hourly_table(pg_engine)
+    refresh_netload_hourly(pg_engine, datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11))
+    antes = _netload(pg_engine)
+
+    revisao = pd.DataFrame({"time": _utc("2024-01-01 11:00"), "subsistema": ["SUL"], "carga_mw": [5.0]})
+    merge_dataframe(pg_engine, ONS_CARGA_SCHEMA, revisao)
+    refresh_netload_hourly(pg_engine, datetime(2024, 1, 1, 11), datetime(2024, 1, 1, 11), subsistemas=["SUL"])
+    depois = _netload(pg_engine)
+
+    assert depois["SUL", 10] == antes["SUL", 10]
+    assert depois["SUL", 11].carga_mw == 5.0
+    assert depois["SUL", 11].atualizado_em > antes["SUL", 11].atualizado_em
+
+
+def test_refresh_gd_summary_totals_every_grouping_level(pg_engine):
+    ensure_distribuidoras_table(pg_engine)
+    ids = upsert_distribuidoras(pg_engine, ["CEMIG", "ENEL"])
+    rows = [
+        ("CEMIG", "RESIDENCIAL", "MG", 60.0),
+        ("CEMIG", "COMERCIAL", "MG", 10.0),
+        ("ENEL", "RESIDENCIAL", "SP", 20.0),
+        ("ENEL", "RESIDENCIAL", "RJ", 10.0),
+    ]
+    with pg_engine.begin() as conn:
+        for nome, classe, uf, mw in rows:
+            conn.execute(
+                text(
+                    "INSERT INTO gd_detalhada (distribuidora, classe, sigla_uf, fonte, potencia_mw, distribuidora_id) "
+                    "VALUES (:nome, :classe, :uf, 'Radiacao Solar', :mw, :id)"
+                ),
+                {"nome": nome, "classe": classe, "uf": uf, "mw": mw, "id": ids[nome]},
+            )
+
+    assert refresh_gd_summary(pg_engine) == 1 + 2 + 2 + 3 + 3
+    refresh_gd_summary(pg_engine)
+
+    with pg_engine.connect() as conn:
+        resumo = conn.execute(
+            text("SELECT nivel, distribuidora_id, classe, sigla_uf, potencia_mw FROM gd_resumo")
+        ).fetchall()
+    totais = {(r.nivel, r.distribuidora_id, r.classe, r.sigla_uf): r.potencia_mw for r in resumo}
+    assert len(totais) == len(resumo) == 11
+    assert totais["total", None, None, None] == 100.0
+    assert totais["distribuidora", ids["ENEL"], None, None] == 30.0
+    assert totais["classe", None, "RESIDENCIAL", None] == 90.0
+    assert totais["uf", None, None, "MG"] == 70.0
+    assert totais["distribuidora_classe", ids["CEMIG"], "COMERCIAL", None] == 10.0
+
+
+def test_refresh_gd_summary_leaves_summary_empty_without_detail(pg_engine):
+    ensure_distribuidoras_table(pg_engine)
+
+    assert refresh_gd_summary(pg_engine) == 0
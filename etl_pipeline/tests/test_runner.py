@@ -0,0 +1,153 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from extractors.base import Extractor
+from runner import RunContext, Task, _run_extractor, run_dag, select_tasks
+
+
+def _ctx():
+    return RunContext(session=None, engine=None, settings=None)
+
+
+def test_run_dag_runs_independent_tasks_in_parallel_and_respects_dependencies():
+    order = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def source(name):
+        def _run(ctx):
+            barrier.wait()
+            with lock:
+                order.append(name)
+            return 10
+
+        return _run
+
+    def after(ctx):
+        with lock:
+            order.append("fix")
+        return 1
+
+    tasks = [Task("a", source("a")), Task("b", source("b")), Task("fix", after, depends_on=("a",))]
+    report = run_dag(tasks, _ctx(), max_workers=3)
+
+    assert report.ok
+    assert order[-1] == "fix"
+    assert report.results["a"].rows == 10
+
+
+def test_run_dag_skips_dependents_of_failed_tasks():
+    def boom(ctx):
+        raise RuntimeError("fonte fora do ar")
+
+    tasks = [
+        Task("ons", boom),
+        Task("fix", lambda ctx: 1, depends_on=("ons",)),
+        Task("gd", lambda ctx: 2),
+    ]
+    report = run_dag(tasks, _ctx(), max_workers=2)
+
+    assert not report.ok
+    assert report.results["ons"].status == "failed"
+    assert report.results["fix"].status == "skipped"
+    assert report.results["gd"].status == "ok"
+
+
+def test_select_tasks_drops_unselected_dependencies_and_rejects_unknown():
+    tasks = [Task("ons", lambda ctx: 0), Task("fix", lambda ctx: 0, depends_on=("ons",))]
+
+    assert select_tasks(tasks, only=["fix"])[0].depends_on == ()
+    with pytest.raises(ValueError):
+        select_tasks(tasks, only=["nada"])
+    with pytest.raises(ValueError):
+        run_dag([Task("x", lambda ctx: 0, depends_on=("x",))], _ctx(), max_workers=1)
+
+
+def test_select_tasks_leaves_opt_in_tasks_out_unless_requested():
+    tasks = [Task("ons", lambda ctx: 0), Task("fix", lambda ctx: 0, depends_on=("ons",), opt_in=True)]
+
+    assert [task.name for task in select_tasks(tasks)] == ["ons"]
+    assert [task.name for task in select_tasks(tasks, only=["ons", "fix"])] == ["ons", "fix"]
+    assert [task.name for task in select_tasks(tasks, include_opt_in=True)] == ["ons", "fix"]
+
+
+def test_extractor_run_stops_when_extract_has_nothing_new():
+    class Unchanged(Extractor):
+        name = "unchanged"
+
+        def extract(self):
+            return None
+
+        def transform(self, raw):
+            raise AssertionError("nao deveria transformar")
+
+        def load(self, data):
+            raise AssertionError("nao deveria carregar")
+
+    assert Unchanged().run() == 0
+
+
+class Counting(Extractor):
+    name = "contagem"
+
+    def __init__(self, engine=None, fail=False):
+        self.engine = engine
+        self.fail = fail
+
+    def extract(self):
+        self.record(bytes_in=2048)
+        return [1, 2, 3]
+
+    def transform(self, raw):
+        self.record(rows_in=len(raw))
+        return raw[:2]
+
+    def load(self, data):
+        if self.fail:
+            raise RuntimeError("banco fora do ar")
+        return len(data)
+
+
+def test_extractor_run_records_stages_and_writes_ledger(fake_conn):
+    engine = fake_conn()
+    extractor = Counting(engine)
+
+    assert extractor.run(run_id="abc") == 2
+
+    stats = extractor.stats
+    assert stats.status == "ok"
+    assert set(stats.seconds) == {"extract", "transform", "load"}
+    assert (stats.bytes_in, stats.rows_in, stats.rows_out) == (2048, 3, 2)
+    assert stats.process_peak_rss_mb > 0
+    (row,) = [params for _, params in engine.calls if params]
+    assert row["execucao"] == "abc"
+    assert row["extrator"] == "contagem"
+    assert row["linhas_carregadas"] == 2
+
+
+def test_extractor_run_records_failures_before_raising(fake_conn):
+    engine = fake_conn()
+
+    with pytest.raises(RuntimeError):
+        Counting(engine, fail=True).run()
+
+    (row,) = [params for _, params in engine.calls if params]
+    assert row["status"] == "failed"
+    assert row["erro"] == "banco fora do ar"
+    assert row["load_s"] is not None
+
+
+def test_run_dag_returns_extractor_stats():
+    report = run_dag([Task("contagem", lambda ctx: _run_extractor(Counting(), ctx))], _ctx(), max_workers=1)
+
+    result = report.results["contagem"]
+    assert result.rows == 2
+    assert result.stats.rows_in == 3
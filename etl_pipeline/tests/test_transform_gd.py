@@ -7,7 +7,12 @@ SRC_DIR = ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from extractors.gd_client import build_gd_dataframe, iter_gd_chunks, transform_gd_chunks
+from extractors.gd_client import (
+    build_gd_dataframe,
+    iter_gd_chunks,
+    transform_gd_chunks,
+    transform_gd_parallel,
+)
 
 
 def test_transform_gd_chunks_aggregates_solar():
@@ -24,4 +29,32 @@ def test_transform_gd_chunks_aggregates_solar():
     assert round(float(row["potencia_mw"]), 4) == 1.5
 
     row_b = df[(df["distribuidora"] == "DISTRIBUIDORA B") & (df["sigla_uf"] == "RJ")].iloc[0]
-    assert round(float(row_b["potencia_mw"]), 4) == 0.25
\ No newline at end of file
+    assert round(float(row_b["potencia_mw"]), 4) == 0.25
+
+
+def _write_gd_csv(path: Path) -> Path:
+    header = "DatGeracaoConjuntoDados;NomAgente;SigUF;DscClasseConsumo;DscFonteGeracao;MdaPotenciaInstaladaKW"
+    rows = [
+        "2024-01-01;Distribuidora A;SP;Residencial;Radiacao solar;1.000,5",
+        "2024-01-01;DISTRIBUIDORA A;SP;Residencial;Radiacao solar;499,5",
+        "2024-01-01;Distribuidora A;SP;Comercial;Radiacao solar;10",
+        "2024-01-01;Distribuidora B;RJ;Residencial;Eolica;999",
+        "2024-01-01;Distribuidora B;RJ;Residencial;Radiacao Solar;250",
+        "2024-01-01;;RJ;Residencial;Radiacao Solar;5",
+    ]
+    path.write_text("\n".join([header] + rows * 40) + "\n", encoding="latin-1")
+    return path
+
+
+def test_transform_gd_parallel_matches_legacy(tmp_path):
+    path = _write_gd_csv(tmp_path / "gd.csv")
+    logger = logging.getLogger("test.gd")
+
+    expected = transform_gd_chunks(iter_gd_chunks(path, chunk_size=7), logger)
+    for workers in (1, 2):
+        aggregated = transform_gd_parallel(path, logger, workers=workers, block_bytes=256)
+        assert aggregated.keys() == expected.keys()
+        for key, value in expected.items():
+            assert round(aggregated[key], 6) == round(value, 6)
+
+    assert round(expected[("DISTRIBUIDORA A", "RESIDENCIAL", "SP")], 4) == 60000.0
@@ -1,13 +1,16 @@
+import logging
 import sys
 from datetime import datetime
 from pathlib import Path
 
+import pandas as pd
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from extractors.inpe_weather_client import transform_weather_payload
+from extractors.inpe_weather_client import load_weather_data, transform_weather_payload
 
 
 def test_transform_weather_payload_shifts_year_safely():
@@ -24,4 +27,66 @@ def test_transform_weather_payload_shifts_year_safely():
     assert len(df) == 2
     assert df["subsistema"].unique().tolist() == ["SUDESTE"]
     assert df["time"].iloc[0] == datetime(2026, 2, 28, 0, 0)
-    assert df["time"].iloc[1] == datetime(2026, 3, 1, 0, 0)
\ No newline at end of file
+    assert df["time"].iloc[1] == datetime(2026, 3, 1, 0, 0)
+
+
+def test_extract_regions_runs_all_regions_and_skips_failures():
+    from core.config import HttpSettings
+    from extractors.inpe_weather_client import extract_regions
+
+    class Response:
+        def __init__(self, payload):
+            self.status_code = 200
+            self._payload = payload
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return self._payload
+
+    class Session:
+        def request(self, method, url, params=None, **kwargs):
+            if params["latitude"] == 0:
+                raise RuntimeError("falha simulada")
+            return Response(
+                {
+                    "hourly": {
+                        "time": ["2024-01-01T12:00"],
+                        "shortwave_radiation": [500.0],
+                        "temperature_2m": [30.0],
+                    }
+                }
+            )
+
+    class Settings:
+        http = HttpSettings(timeout_s=5, retries=0, backoff_factor=0, log_level="INFO", rate_limit_per_s=0)
+
+    regioes = {
+        "SUL": {"lat": -30.0, "lon": -51.0},
+        "NORTE": {"lat": -1.0, "lon": -48.0},
+        "FALHA": {"lat": 0, "lon": 0},
+    }
+    logger = logging.getLogger("test.inpe")
+    frames = extract_regions(Session(), Settings(), "2022-01-01", "2022-01-02", logger, regioes)
+
+    assert sorted(df["subsistema"].iloc[0] for df in frames) == ["NORTE", "SUL"]
+
+
+def test_load_weather_data_refreshes_netload_over_the_loaded_hours(fake_conn):
+    conn = fake_conn()
+    df = pd.DataFrame(
+        {
+            "time": pd.to_datetime(["2024-01-01 10:30", "2024-01-01 12:00"]),
+            "subsistema": ["SUL", "SUL"],
+            "irradiancia_wm2": [100.0, 200.0],
+            "temperatura_c": [20.0, 21.0],
+        }
+    )
+
+    assert load_weather_data(df, conn, logger=logging.getLogger("test")) == 2
+
+    windows = [params for _, params in conn.calls if params and "start" in params]
+    assert windows and all(
+        (params["start"], params["end"]) == (datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 13)) for params in windows
+    )
@@ -1,13 +1,16 @@
 import logging
 import sys
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+import pandas as pd
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC_DIR = ROOT / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from extractors.ons_client import transform_carga_ons_csv
+from extractors.ons_client import filter_new_rows, iter_carga_ons_csv, transform_carga_ons_csv
 
 
 def test_transform_carga_ons_csv_dedupes():
@@ -19,4 +22,53 @@ def test_transform_carga_ons_csv_dedupes():
 
     assert list(df.columns) == ["time", "subsistema", "carga_mw"]
     assert len(df) == 2
-    assert set(df["subsistema"]) == {"SUDESTE", "SUL"}
\ No newline at end of file
+    assert set(df["subsistema"]) == {"SUDESTE", "SUL"}
+
+
+def test_filter_new_rows_keeps_rows_after_watermark():
+    df = pd.DataFrame(
+        {
+            "time": pd.to_datetime(
+                ["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00", "2024-01-01 00:00"]
+            ),
+            "subsistema": ["SUL", "SUL", "SUL", "NORTE"],
+            "carga_mw": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+
+    filtered = filter_new_rows(df, {"SUL": datetime(2024, 1, 1, 1, 0)})
+
+    assert filtered["carga_mw"].tolist() == [3.0, 4.0]
+    assert filter_new_rows(df, {}) is df
+
+
+def test_filter_new_rows_accepts_tz_aware_watermarks():
+    # MAX(time) de uma coluna TIMESTAMPTZ volta com fuso; o CSV do ONS vem sem.
+    df = pd.DataFrame(
+        {
+            "time": pd.to_datetime(["2024-01-01 00:00", "2024-01-01 01:00", "2024-01-01 02:00"]),
+            "subsistema": ["SUL", "SUL", "SUL"],
+            "carga_mw": [1.0, 2.0, 3.0],
+        }
+    )
+    utc = {"SUL": datetime(2024, 1, 1, 1, 0, tzinfo=timezone.utc)}
+    brasilia = {"SUL": datetime(2023, 12, 31, 22, 0, tzinfo=timezone(timedelta(hours=-3)))}
+
+    assert filter_new_rows(df, utc)["carga_mw"].tolist() == [3.0]
+    assert filter_new_rows(df, brasilia)["carga_mw"].tolist() == [3.0]
+
+
+def test_iter_carga_ons_csv_streams_chunks(tmp_path):
+    rows = ["din_instante;nom_subsistema;id_subsistema;val_cargaenergiamwmed"]
+    for hour in range(10):
+        rows.append(f"2024-01-01 {hour:02d}:00:00;SUL;S;{hour},5")
+    path = tmp_path / "carga.csv"
+    path.write_text("\n".join(rows) + "\n")
+    logger = logging.getLogger("test.ons")
+
+    chunks = list(iter_carga_ons_csv(path, logger, chunk_rows=4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    streamed = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, transform_carga_ons_csv(path.read_bytes(), logger))
+    assert streamed["carga_mw"].iloc[-1] == 9.5
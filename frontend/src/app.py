@@ -1,26 +1,81 @@
 
+import time
+
 import streamlit as st
 
-from components.alerts import fetch_alerta, render_alerta
+from components.alerts import fetch_alerta, render_alerta, request_alerta
 from components.audit import render_auditoria
-from components.charts import load_carga_data, render_carga_section, render_classes_consumo
+from components.charts import (
+    load_carga_data,
+    render_carga_live,
+    render_carga_section,
+    render_classes_consumo,
+    request_carga,
+    request_classes_consumo,
+)
 from components.sidebar import render_sidebar
-from config import API_URL, APP_TITLE, LAYOUT
+from config import (
+    API_CLIENT_CACHE_MAX_ENTRIES,
+    API_CLIENT_CACHE_TTL_BY_ENDPOINT,
+    API_CLIENT_CACHE_TTL_S,
+    API_MAX_CONCURRENCY,
+    API_TIMEOUT_S,
+    API_URL,
+    APP_TITLE,
+    LAYOUT,
+    LIVE_STREAM_ENABLED,
+)
 from services.api_client import ApiClient
 
 
+@st.cache_resource
+def get_client() -> ApiClient:
+    # Uma instancia por processo: pool de conexoes e cache TTL compartilhados entre sessoes.
+    return ApiClient(
+        API_URL,
+        timeout=API_TIMEOUT_S,
+        cache_ttl_s=API_CLIENT_CACHE_TTL_S,
+        endpoint_ttl_s=API_CLIENT_CACHE_TTL_BY_ENDPOINT,
+        max_concurrency=API_MAX_CONCURRENCY,
+        max_entries=API_CLIENT_CACHE_MAX_ENTRIES,
+    )
+
+
 st.set_page_config(page_title=APP_TITLE, layout=LAYOUT)
 st.title("Monitoramento Avançado de Carga Líquida")
 
-client = ApiClient(API_URL)
+client = get_client()
 state = render_sidebar(client)
 
+# As chamadas abaixo sao independentes: saem em paralelo e os componentes leem do cache.
+chamadas = [lambda: request_alerta(client, state.distribuidora)]
+if state.refresh:
+    chamadas += [
+        lambda: request_carga(client, state.subsistema, state.distribuidora, state.inicio, state.fim),
+        lambda: request_classes_consumo(client, state.distribuidora),
+    ]
+client.prefetch(chamadas)
+
 dados_ia = fetch_alerta(client, state.distribuidora)
 _, impacto_projecao_mw = render_alerta(dados_ia, state.multiplicador)
 
 if state.refresh:
-    df_carga = load_carga_data(client, state.subsistema, state.distribuidora)
-    render_carga_section(df_carga, impacto_projecao_mw, state.multiplicador, state.subsistema)
+    df_carga = load_carga_data(client, state.subsistema, state.distribuidora, state.inicio, state.fim)
+    if LIVE_STREAM_ENABLED:
+        # O fragmento segue acrescentando as horas que o ETL carregar, sem novo clique.
+        render_carga_live(
+            client,
+            df_carga,
+            time.monotonic(),
+            impacto_projecao_mw,
+            state.multiplicador,
+            state.subsistema,
+            state.distribuidora,
+            state.inicio,
+            state.fim,
+        )
+    else:
+        render_carga_section(df_carga, impacto_projecao_mw, state.multiplicador, state.subsistema)
     render_classes_consumo(client, state.distribuidora)
     render_auditoria(dados_ia, impacto_projecao_mw, state.multiplicador)
 else:
@@ -2,16 +2,19 @@ from typing import Any, Dict, Optional, Tuple
 
 import streamlit as st
 
-from services.api_client import ApiClient
+from services.api_client import ApiClient, ApiResult
 from utils.errors import show_error
 
 
-def fetch_alerta(client: ApiClient, distribuidora: str) -> Optional[Dict[str, Any]]:
+def request_alerta(client: ApiClient, distribuidora: str) -> ApiResult:
     params = {}
     if distribuidora:
         params["distribuidora"] = distribuidora
+    return client.get("/analise/alertas-fraude", params=params)
+
 
-    result = client.get("/analise/alertas-fraude", params=params)
+def fetch_alerta(client: ApiClient, distribuidora: str) -> Optional[Dict[str, Any]]:
+    result = request_alerta(client, distribuidora)
     if result.error:
         show_error(result.error)
         return None
@@ -1,31 +1,65 @@
-from typing import Any, Dict, Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
-from services.api_client import ApiClient
+from config import API_URL, CHART_WIDTH_PX, LIVE_REFRESH_S
+from services.api_client import ApiClient, ApiResult
+from services.live_feed import LiveFeed
 from utils.errors import show_error
 
 
-def load_carga_data(client: ApiClient, subsistema: str, distribuidora: str) -> pd.DataFrame:
-    params = {"subsistema": subsistema}
+def request_carga(
+    client: ApiClient,
+    subsistema: str,
+    distribuidora: str,
+    inicio: Optional[str] = None,
+    fim: Optional[str] = None,
+) -> ApiResult:
+    params = {"subsistema": subsistema, "max_pontos": CHART_WIDTH_PX}
     if distribuidora:
         params["distribuidora"] = distribuidora
+    if inicio and fim:
+        params["inicio"] = inicio
+        params["fim"] = fim
+    return client.get_frame("/analise/carga-oculta", params=params, parse_dates=["hora"])
+
+
+def merge_live_rows(df_carga: pd.DataFrame, rows: List[dict], duracao: timedelta) -> pd.DataFrame:
+    """Acrescenta (ou substitui, pela hora) as horas do stream e descarta o que saiu da janela."""
+    if not rows:
+        return df_carga
+    novas = pd.DataFrame(rows)
+    horas = pd.to_datetime(novas["hora"], utc=True)
+    tz = df_carga["hora"].dt.tz if not df_carga.empty else horas.dt.tz
+    novas["hora"] = horas.dt.tz_convert(tz)
+    merged = pd.concat([df_carga, novas], ignore_index=True)
+    merged = merged.drop_duplicates("hora", keep="last").sort_values("hora", ignore_index=True)
+    return merged[merged["hora"] > merged["hora"].max() - duracao].reset_index(drop=True)
+
+
+def request_classes_consumo(client: ApiClient, distribuidora: str) -> ApiResult:
+    return client.get("/analise/classes-consumo", params={"distribuidora": distribuidora})
 
-    result = client.get("/analise/carga-oculta", params=params)
+
+def load_carga_data(
+    client: ApiClient,
+    subsistema: str,
+    distribuidora: str,
+    inicio: Optional[str] = None,
+    fim: Optional[str] = None,
+) -> pd.DataFrame:
+    result = request_carga(client, subsistema, distribuidora, inicio, fim)
     if result.error:
         show_error(result.error)
         return pd.DataFrame()
 
-    if not result.data:
+    if result.data is None:
         return pd.DataFrame()
-
-    df = pd.DataFrame(result.data)
-    if not df.empty and "hora" in df.columns:
-        df["hora"] = pd.to_datetime(df["hora"])
-    return df
+    return result.data
 
 
 def render_carga_section(
@@ -112,7 +146,7 @@ def render_carga_section(
 
 
 def render_classes_consumo(client: ApiClient, distribuidora: str) -> None:
-    result = client.get("/analise/classes-consumo", params={"distribuidora": distribuidora})
+    result = request_classes_consumo(client, distribuidora)
     if result.error:
         show_error(result.error)
         return
@@ -132,4 +166,55 @@ def render_classes_consumo(client: ApiClient, distribuidora: str) -> None:
     with c2:
         fig_pie = px.pie(df_classes, values="mw", names="classe", hole=0.4, title="Perfil de Consumo")
         fig_pie.update_layout(template="plotly_dark")
-        st.plotly_chart(fig_pie, use_container_width=True)
\ No newline at end of file
+        st.plotly_chart(fig_pie, use_container_width=True)
+
+
+@st.fragment(run_every=LIVE_REFRESH_S)
+def render_carga_live(
+    client: ApiClient,
+    df_carga: pd.DataFrame,
+    carregado_em: float,
+    impacto_projecao_mw: float,
+    multiplicador: int,
+    subsistema: str,
+    distribuidora: str,
+    inicio: Optional[str] = None,
+    fim: Optional[str] = None,
+) -> None:
+    """Secao de carga que se redesenha sozinha com as horas empurradas pelo backend (SSE).
+
+    Cada rerun do fragmento so drena o buffer do ``LiveFeed``; a janela inteira so e
+    pedida de novo quando o backend manda ``recarregar`` (nova carga de GD).
+    """
+    params = {"subsistema": subsistema}
+    if distribuidora:
+        params["distribuidora"] = distribuidora
+    estado = st.session_state.get("carga_ao_vivo")
+    if estado is None or estado["carregado_em"] != carregado_em or estado["params"] != params:
+        if estado is not None:
+            estado["feed"].stop()
+        estado = {
+            "carregado_em": carregado_em,
+            "params": params,
+            "df": df_carga,
+            "feed": LiveFeed(API_URL, params).start(),
+        }
+        st.session_state["carga_ao_vivo"] = estado
+    elif not estado["feed"].alive:
+        estado["feed"] = LiveFeed(API_URL, params).start()
+
+    rows, recarregar = estado["feed"].drain()
+    if recarregar:
+        client.invalidate("/analise/carga-oculta")
+        estado["df"] = load_carga_data(client, subsistema, distribuidora, inicio, fim)
+    elif rows:
+        estado["df"] = merge_live_rows(estado["df"], rows, _duracao_janela(inicio, fim))
+
+    render_carga_section(estado["df"].copy(), impacto_projecao_mw, multiplicador, subsistema)
+
+
+def _duracao_janela(inicio: Optional[str], fim: Optional[str]) -> timedelta:
+    if inicio and fim:
+        return datetime.fromisoformat(fim) - datetime.fromisoformat(inicio)
+    # Sem janela o backend devolve as ultimas 24 horas.
+    return timedelta(hours=24)
\ No newline at end of file
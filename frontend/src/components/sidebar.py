@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 import streamlit as st
 
@@ -7,12 +8,22 @@ from services.api_client import ApiClient
 from utils.errors import show_error
 
 
+JANELAS = {
+    "Últimas 24 horas": None,
+    "Últimos 7 dias": timedelta(days=7),
+    "Últimos 30 dias": timedelta(days=30),
+    "Último ano": timedelta(days=365),
+}
+
+
 @dataclass
 class SidebarState:
     subsistema: str
     distribuidora: str
     multiplicador: int
     refresh: bool
+    inicio: Optional[str] = None
+    fim: Optional[str] = None
 
 
 def _load_distribuidoras(client: ApiClient) -> List[str]:
@@ -33,6 +44,9 @@ def render_sidebar(client: ApiClient) -> SidebarState:
         ["SUDESTE", "SUL", "NORDESTE", "NORTE"],
     )
 
+    janela = st.sidebar.selectbox("Janela", list(JANELAS))
+    inicio, fim = _janela_para_intervalo(JANELAS[janela])
+
     st.sidebar.subheader("Análise por Distribuidora")
     opcoes_distribuidoras = _load_distribuidoras(client)
     distribuidora = st.sidebar.selectbox("Concessão (GD):", opcoes_distribuidoras)
@@ -49,4 +63,14 @@ def render_sidebar(client: ApiClient) -> SidebarState:
         distribuidora=distribuidora,
         multiplicador=multiplicador,
         refresh=refresh,
-    )
\ No newline at end of file
+        inicio=inicio,
+        fim=fim,
+    )
+
+
+def _janela_para_intervalo(duracao: Optional[timedelta]):
+    if duracao is None:
+        return None, None
+    # Hora cheia: os parametros ficam iguais entre reruns e o cache do ApiClient e aproveitado.
+    fim = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return (fim - duracao).isoformat(), fim.isoformat()
\ No newline at end of file
@@ -2,4 +2,20 @@ import os
 
 API_URL = os.getenv("API_URL", "http://backend:8000")
 APP_TITLE = os.getenv("APP_TITLE", "Energy Monitor Pro")
-LAYOUT = os.getenv("APP_LAYOUT", "wide")
\ No newline at end of file
+LAYOUT = os.getenv("APP_LAYOUT", "wide")
+
+# Largura util do grafico de carga em pixels: o backend reduz a serie a um ponto por pixel.
+CHART_WIDTH_PX = int(os.getenv("CHART_WIDTH_PX", "1400"))
+
+API_TIMEOUT_S = float(os.getenv("API_TIMEOUT_S", "5"))
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "4"))
+API_CLIENT_CACHE_TTL_S = float(os.getenv("API_CLIENT_CACHE_TTL_S", "30"))
+API_CLIENT_CACHE_MAX_ENTRIES = int(os.getenv("API_CLIENT_CACHE_MAX_ENTRIES", "128"))
+API_CLIENT_CACHE_TTL_BY_ENDPOINT = {
+    "/auxiliar/distribuidoras": float(os.getenv("API_CLIENT_CACHE_TTL_DISTRIBUIDORAS_S", "600")),
+}
+
+# Atualizacao ao vivo do grafico de carga: o backend empurra as horas novas por SSE e o
+# grafico e redesenhado a cada LIVE_REFRESH_S segundos sem nova requisicao da janela.
+LIVE_STREAM_ENABLED = os.getenv("LIVE_STREAM_ENABLED", "true").lower() in ("1", "true", "yes")
+LIVE_REFRESH_S = float(os.getenv("LIVE_REFRESH_S", "5"))
\ No newline at end of file
@@ -1,10 +1,20 @@
+import io
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Callable, Hashable, Iterable, List, Mapping, Optional, Tuple
 
+import pandas as pd
+import pyarrow as pa
 import requests
+from requests.adapters import HTTPAdapter
 
 from utils.errors import parse_error_response
 
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
 
 @dataclass
 class ApiResult:
@@ -14,27 +24,163 @@ class ApiResult:
 
 
 class ApiClient:
-    def __init__(self, base_url: str, timeout: int = 2):
+    """Cliente HTTP do dashboard: sessao com pool de conexoes, cache TTL e prefetch concorrente.
+
+    Uma instancia e compartilhada por todas as sessoes do Streamlit (``st.cache_resource``),
+    entao o cache vale entre dashboards abertos. ``cache_ttl_s`` e o TTL padrao e
+    ``endpoint_ttl_s`` sobrescreve por caminho; TTL 0 desliga o cache do endpoint.
+    So respostas 200 sem erro sao guardadas. O processo vive muito e cada janela de
+    hora cheia gera chaves novas: a cada escrita as entradas vencidas saem e, acima
+    de ``max_entries``, as menos usadas (LRU).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 2,
+        *,
+        cache_ttl_s: float = 0.0,
+        endpoint_ttl_s: Optional[Mapping[str, float]] = None,
+        max_concurrency: int = 4,
+        max_entries: int = 128,
+        session: Optional[requests.Session] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.cache_ttl_s = cache_ttl_s
+        self.endpoint_ttl_s = dict(endpoint_ttl_s or {})
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_entries = max(1, max_entries)
+        self.session = session or _create_session(self.max_concurrency)
+        self._clock = clock
+        self._cache: "OrderedDict[Hashable, Tuple[float, ApiResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     def get(self, path: str, params: Optional[dict] = None) -> ApiResult:
+        return self._cached("json", path, params, lambda: self._get_json(path, params))
+
+    def get_frame(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        parse_dates: Iterable[str] = (),
+    ) -> ApiResult:
+        """Pede a resposta em Arrow IPC e devolve um DataFrame; aceita JSON (records) como fallback."""
+        parse_dates = tuple(parse_dates)
+        result = self._cached("frame", path, params, lambda: self._get_frame(path, params, parse_dates))
+        if isinstance(result.data, pd.DataFrame):
+            # Os componentes acrescentam colunas ao DataFrame; o cache guarda o original.
+            return ApiResult(data=result.data.copy(), error=result.error, status_code=result.status_code)
+        return result
+
+    def prefetch(self, calls: Iterable[Callable[[], ApiResult]]) -> List[ApiResult]:
+        """Executa chamadas independentes em paralelo; os resultados ficam no cache."""
+        calls = list(calls)
+        if len(calls) <= 1:
+            return [call() for call in calls]
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="api-client"
+                )
+            executor = self._executor
+        return list(executor.map(lambda call: call(), calls))
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def invalidate(self, path: str) -> None:
+        """Descarta as respostas em cache de um caminho (todas as combinacoes de parametros)."""
+        with self._lock:
+            for key in [key for key in self._cache if key[1] == path]:
+                del self._cache[key]
+
+    def _ttl_for(self, path: str) -> float:
+        return self.endpoint_ttl_s.get(path, self.cache_ttl_s)
+
+    def _cached(self, kind: str, path: str, params: Optional[dict], fetch: Callable[[], ApiResult]) -> ApiResult:
+        ttl = self._ttl_for(path)
+        if ttl <= 0:
+            return fetch()
+
+        key = (kind, path, tuple(sorted((params or {}).items())))
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._cache.move_to_end(key)
+                    return entry[1]
+                del self._cache[key]
+
+        result = fetch()
+        if result.error is None and result.status_code == 200:
+            with self._lock:
+                self._store(key, self._clock() + ttl, result)
+        return result
+
+    def _store(self, key: Hashable, expires_at: float, result: ApiResult) -> None:
+        now = self._clock()
+        for stale in [k for k, (expira, _) in self._cache.items() if expira <= now]:
+            del self._cache[stale]
+        self._cache[key] = (expires_at, result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def _request(self, path: str, params: Optional[dict], headers: Optional[dict] = None):
         url = f"{self.base_url}{path}"
         try:
-            resp = requests.get(url, params=params, timeout=self.timeout)
+            resp = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
         except requests.RequestException as exc:
-            return ApiResult(data=None, error=f"Falha ao conectar ao backend: {exc}", status_code=None)
+            return None, ApiResult(data=None, error=f"Falha ao conectar ao backend: {exc}", status_code=None)
 
         if resp.status_code >= 500:
             detail = parse_error_response(resp, "Erro interno do backend.")
-            return ApiResult(data=None, error=detail, status_code=resp.status_code)
+            return None, ApiResult(data=None, error=detail, status_code=resp.status_code)
 
         if resp.status_code != 200:
-            return ApiResult(data=None, error=None, status_code=resp.status_code)
+            return None, ApiResult(data=None, error=None, status_code=resp.status_code)
+        return resp, None
+
+    def _get_json(self, path: str, params: Optional[dict]) -> ApiResult:
+        resp, failure = self._request(path, params)
+        if failure is not None:
+            return failure
 
         try:
             data = resp.json()
         except ValueError:
             return ApiResult(data=None, error="Resposta inválida do backend.", status_code=resp.status_code)
 
-        return ApiResult(data=data, error=None, status_code=resp.status_code)
\ No newline at end of file
+        return ApiResult(data=data, error=None, status_code=resp.status_code)
+
+    def _get_frame(self, path: str, params: Optional[dict], parse_dates: Tuple[str, ...]) -> ApiResult:
+        headers = {"Accept": f"{ARROW_MEDIA_TYPE}, application/json;q=0.5"}
+        resp, failure = self._request(path, params, headers)
+        if failure is not None:
+            return failure
+
+        try:
+            if resp.headers.get("content-type", "").startswith(ARROW_MEDIA_TYPE):
+                with pa.ipc.open_stream(io.BytesIO(resp.content)) as reader:
+                    df = reader.read_pandas()
+            else:
+                df = pd.DataFrame(resp.json())
+                for column in parse_dates:
+                    if column in df.columns:
+                        df[column] = pd.to_datetime(df[column])
+        except (ValueError, pa.ArrowInvalid):
+            return ApiResult(data=None, error="Resposta inválida do backend.", status_code=resp.status_code)
+
+        return ApiResult(data=df, error=None, status_code=resp.status_code)
+
+
+def _create_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
\ No newline at end of file
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+STREAM_PATH = "/analise/carga-oculta/stream"
+
+
+def parse_sse(lines: Iterable[str]) -> Iterator[Tuple[str, Optional[str], str]]:
+    """(evento, id, dados) para cada evento SSE; comentarios (``: ping``) e ``retry`` sao ignorados."""
+    event, event_id, data = "message", None, []
+    for line in lines:
+        if not line:
+            if data:
+                yield event, event_id, "\n".join(data)
+            event, event_id, data = "message", None, []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if field == "event":
+            event = value
+        elif field == "id":
+            event_id = value
+        elif field == "data":
+            data.append(value)
+
+
+class LiveFeed:
+    """Assinatura do stream de carga oculta numa thread; o dashboard drena as horas acumuladas.
+
+    Uma instancia por sessao e filtro. A thread reconecta com ``Last-Event-ID`` se a
+    conexao cair e encerra sozinha quando ninguem chama ``drain`` por ``idle_timeout_s``
+    (sessao fechada ou filtro trocado).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        params: Dict[str, str],
+        *,
+        session: Optional[requests.Session] = None,
+        read_timeout_s: float = 30,
+        reconnect_s: float = 5,
+        idle_timeout_s: float = 120,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.url = f"{base_url.rstrip('/')}{STREAM_PATH}"
+        self.params = dict(params)
+        self.session = session or requests.Session()
+        self.read_timeout_s = read_timeout_s
+        self.reconnect_s = reconnect_s
+        self.idle_timeout_s = idle_timeout_s
+        self._clock = clock
+        self._rows: List[dict] = []
+        self._reload = False
+        self._last_event_id: Optional[str] = None
+        self._drained_at = clock()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "LiveFeed":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def drain(self) -> Tuple[List[dict], bool]:
+        """Horas recebidas desde a ultima chamada e se a serie inteira precisa ser recarregada."""
+        with self._lock:
+            rows, reload = self._rows, self._reload
+            self._rows, self._reload = [], False
+            self._drained_at = self._clock()
+        return rows, reload
+
+    def handle(self, event: str, event_id: Optional[str], data: str) -> None:
+        with self._lock:
+            if event == "horas":
+                self._rows.extend(json.loads(data))
+            elif event == "recarregar":
+                # As horas pendentes ja estao na serie que sera recarregada.
+                self._rows, self._reload = [], True
+            if event_id:
+                self._last_event_id = event_id
+
+    def _idle(self) -> bool:
+        with self._lock:
+            return self._clock() - self._drained_at > self.idle_timeout_s
+
+    def _run(self) -> None:
+        while not self._stop.is_set() and not self._idle():
+            headers = {"Accept": "text/event-stream"}
+            if self._last_event_id:
+                headers["Last-Event-ID"] = self._last_event_id
+            try:
+                with self.session.get(
+                    self.url, params=self.params, headers=headers, stream=True, timeout=(5, self.read_timeout_s)
+                ) as resp:
+                    resp.raise_for_status()
+                    lines = resp.iter_lines(decode_unicode=True)
+                    for event, event_id, data in parse_sse(self._until_stopped(lines)):
+                        self.handle(event, event_id, data)
+            except (requests.RequestException, ValueError):
+                pass
+            self._stop.wait(self.reconnect_s)
+        self._stop.set()
+
+    def _until_stopped(self, lines: Iterable[str]) -> Iterator[str]:
+        # O servidor manda ``: ping`` a cada poucos segundos: a checagem roda mesmo sem dados novos.
+        for line in lines:
+            if self._stop.is_set() or self._idle():
+                return
+            yield line
@@ -5,6 +5,8 @@ set -e
 psql -v ON_ERROR_STOP=1 --username "$POSTGRES_USER" --dbname "$POSTGRES_DB" <<-EOSQL
     CREATE EXTENSION IF NOT EXISTS postgis;
     CREATE EXTENSION IF NOT EXISTS timescaledb;
+    -- Busca aproximada de nomes (indice de trigramas em distribuidoras)
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
     -- Opcional: Topologia para análises avançadas
     CREATE EXTENSION IF NOT EXISTS postgis_topology;
 EOSQL
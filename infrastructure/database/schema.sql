@@ -23,12 +23,21 @@ CREATE TABLE IF NOT EXISTS clima_real (
     CONSTRAINT clima_real_unique UNIQUE (time, subsistema)
 );
 
+-- Dimensao de distribuidoras (NomAgente em maiusculas), mantida pelo gd_client.
+-- Os ids sao estaveis entre cargas: nomes novos entram, nenhum e apagado.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE TABLE IF NOT EXISTS distribuidoras (
+    id SERIAL PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE
+);
+
 CREATE TABLE IF NOT EXISTS gd_detalhada (
     distribuidora TEXT,
     classe TEXT,
     sigla_uf TEXT,
     fonte TEXT,
-    potencia_mw DOUBLE PRECISION
+    potencia_mw DOUBLE PRECISION,
+    distribuidora_id INTEGER REFERENCES distribuidoras (id)
 );
 
 CREATE TABLE IF NOT EXISTS auditoria_visual (
@@ -40,13 +49,113 @@ CREATE TABLE IF NOT EXISTS auditoria_visual (
     classe_estimada_ia TEXT,
     diferenca_fraude_kw DOUBLE PRECISION,
     potencia_oficial_kw DOUBLE PRECISION,
-    status TEXT
+    status TEXT,
+    distribuidora_id INTEGER REFERENCES distribuidoras (id)
+);
+
+-- Totais de gd_detalhada por GROUPING SETS, reescritos pelo gd_client na mesma transacao da carga.
+-- nivel: total, distribuidora, classe, uf ou distribuidora_classe.
+CREATE TABLE IF NOT EXISTS gd_resumo (
+    nivel TEXT NOT NULL,
+    distribuidora_id INTEGER,
+    classe TEXT,
+    sigla_uf TEXT,
+    potencia_mw DOUBLE PRECISION NOT NULL
+);
+
+-- Bancos criados antes da dimensao: adiciona as FKs e preenche a partir dos nomes.
+ALTER TABLE gd_detalhada ADD COLUMN IF NOT EXISTS distribuidora_id INTEGER REFERENCES distribuidoras (id);
+ALTER TABLE auditoria_visual ADD COLUMN IF NOT EXISTS distribuidora_id INTEGER REFERENCES distribuidoras (id);
+INSERT INTO distribuidoras (nome)
+SELECT DISTINCT UPPER(TRIM(distribuidora)) FROM gd_detalhada WHERE distribuidora IS NOT NULL
+ON CONFLICT (nome) DO NOTHING;
+UPDATE gd_detalhada g SET distribuidora_id = d.id
+FROM distribuidoras d
+WHERE g.distribuidora_id IS NULL AND d.nome = UPPER(TRIM(g.distribuidora));
+UPDATE auditoria_visual a SET distribuidora_id = d.id
+FROM distribuidoras d
+WHERE a.distribuidora_id IS NULL AND d.nome = UPPER(TRIM(a.distribuidora));
+
+-- Agregado horario carga_ons x clima_real por subsistema canonico (SUDESTE, SUL, ...).
+-- Mantido pelo ETL (core.rollups.refresh_netload_hourly) apenas nas janelas recarregadas.
+CREATE TABLE IF NOT EXISTS netload_horaria (
+    hora TIMESTAMPTZ NOT NULL,
+    subsistema TEXT NOT NULL,
+    carga_mw DOUBLE PRECISION,
+    irradiancia_wm2 DOUBLE PRECISION,
+    amostras_carga INTEGER,
+    atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (subsistema, hora)
+);
+
+-- Bancos criados antes do stream ao vivo (/analise/carga-oculta/stream, cursor por atualizado_em).
+ALTER TABLE netload_horaria ADD COLUMN IF NOT EXISTS atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now();
+CREATE INDEX IF NOT EXISTS idx_netload_horaria_atualizado ON netload_horaria (subsistema, atualizado_em);
+
+-- Backfill para bancos com carga_ons anterior ao agregado: preenche so as horas que faltam
+-- (mesma consulta de refresh_netload_hourly). As cargas incrementais so recalculam horas novas.
+INSERT INTO netload_horaria (hora, subsistema, carga_mw, irradiancia_wm2, amostras_carga)
+SELECT c.hora, c.subsistema, c.carga_mw, cl.irradiancia_wm2, c.amostras
+FROM (
+    SELECT
+        date_trunc('hour', time) AS hora,
+        CASE WHEN UPPER(subsistema) LIKE '%SUDESTE%' THEN 'SUDESTE' ELSE UPPER(subsistema) END AS subsistema,
+        AVG(carga_mw) AS carga_mw,
+        COUNT(*) AS amostras
+    FROM carga_ons
+    GROUP BY 1, 2
+) c
+LEFT JOIN (
+    SELECT date_trunc('hour', time) AS hora, subsistema, AVG(irradiancia_wm2) AS irradiancia_wm2
+    FROM clima_real
+    GROUP BY 1, 2
+) cl ON cl.hora = c.hora AND cl.subsistema = c.subsistema
+ORDER BY c.subsistema, c.hora
+ON CONFLICT (subsistema, hora) DO NOTHING;
+
+-- Carimbo de versao por dataset, incrementado pelo ETL apos cada carga.
+-- O cache de respostas da API (backend/src/core/cache.py) invalida por ele.
+CREATE TABLE IF NOT EXISTS etl_data_version (
+    dataset TEXT PRIMARY KEY,
+    versao BIGINT NOT NULL DEFAULT 1,
+    atualizado_em TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Ledger de execucoes do ETL: uma linha por execucao de extrator (extractors/base.py, RunStats).
+-- O backend expoe em /etl/runs.
+CREATE TABLE IF NOT EXISTS etl_runs (
+    id BIGSERIAL PRIMARY KEY,
+    execucao TEXT,
+    extrator TEXT NOT NULL,
+    status TEXT NOT NULL,
+    inicio TIMESTAMPTZ NOT NULL,
+    fim TIMESTAMPTZ,
+    extract_s DOUBLE PRECISION,
+    transform_s DOUBLE PRECISION,
+    load_s DOUBLE PRECISION,
+    bytes_lidos BIGINT,
+    linhas_lidas BIGINT,
+    linhas_carregadas BIGINT,
+    -- Pico de RSS do processo ETL (no runner, de todas as tarefas ate o fim desta).
+    pico_rss_processo_mb DOUBLE PRECISION,
+    erro TEXT
 );
+-- Ledgers criados com a coluna antiga pico_rss_mb.
+ALTER TABLE etl_runs ADD COLUMN IF NOT EXISTS pico_rss_processo_mb DOUBLE PRECISION;
 
 CREATE INDEX IF NOT EXISTS idx_carga_ons_time ON carga_ons (time);
 CREATE INDEX IF NOT EXISTS idx_carga_ons_subsistema ON carga_ons (subsistema);
+-- Chave do merge (INSERT ... ON CONFLICT) feito pelo ons_client.
+CREATE UNIQUE INDEX IF NOT EXISTS carga_ons_time_subsistema_key ON carga_ons (time, subsistema);
 CREATE INDEX IF NOT EXISTS idx_gd_detalhada_distribuidora ON gd_detalhada (distribuidora);
 CREATE INDEX IF NOT EXISTS idx_auditoria_visual_distribuidora ON auditoria_visual (distribuidora);
+-- Filtros por distribuidora: busca aproximada na dimensao (trigrama) e lookup exato por id nos fatos.
+CREATE INDEX IF NOT EXISTS distribuidoras_nome_trgm ON distribuidoras USING GIN (nome gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_gd_detalhada_distribuidora_id ON gd_detalhada (distribuidora_id);
+CREATE INDEX IF NOT EXISTS idx_auditoria_visual_distribuidora_id_data
+    ON auditoria_visual (distribuidora_id, data_inspecao DESC);
+CREATE INDEX IF NOT EXISTS usinas_siga_geom_gist ON usinas_siga USING GIST (geom);
+CREATE INDEX IF NOT EXISTS idx_etl_runs_extrator_inicio ON etl_runs (extrator, inicio DESC);
 
 SELECT create_hypertable('carga_ons', 'time', if_not_exists => TRUE);
 SELECT create_hypertable('clima_real', 'time', if_not_exists => TRUE);
\ No newline at end of file